@@ -0,0 +1,41 @@
+"""
+PropOS AI — shared LLM client layer (Gemini + Groq).
+"""
+
+from .client import (
+    GEMINI,
+    GROQ,
+    AIError,
+    AIRateLimited,
+    AITimeout,
+    AIUnavailable,
+    achat_completion,
+    achat_completion_message,
+    achat_completion_stream,
+    chat_completion,
+    chat_completion_stream,
+    embed_content,
+    generate_content,
+    get_metrics,
+    is_configured,
+    upload_file,
+)
+
+__all__ = [
+    'GEMINI',
+    'GROQ',
+    'AIError',
+    'AIRateLimited',
+    'AITimeout',
+    'AIUnavailable',
+    'achat_completion',
+    'achat_completion_message',
+    'achat_completion_stream',
+    'chat_completion',
+    'chat_completion_stream',
+    'embed_content',
+    'generate_content',
+    'get_metrics',
+    'is_configured',
+    'upload_file',
+]
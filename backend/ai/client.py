@@ -0,0 +1,615 @@
+"""
+Shared LLM client layer for PropOS AI.
+
+All Gemini / Groq traffic (chatbot, smart pricing, maintenance triage) goes
+through this module so that every call gets the same treatment:
+
+  1. Pooled clients  — one Groq client (keeps its HTTP connection pool) and one
+     GenerativeModel per model name, created lazily and reused across requests.
+     With AI_BACKEND='stub' a local fake provider is used instead (ai/stub.py).
+     The chatbot uses the async variants (AsyncGroq, acall()) from its ASGI view.
+  2. Rate limiting   — a process-wide token bucket per provider.
+  3. Circuit breaker — stop calling a provider that keeps failing.
+  4. Retries         — jittered exponential backoff on 429 / transient errors.
+  5. Timeouts        — every request carries a hard timeout.
+  6. Metrics         — latency, retries and token usage per provider/task.
+"""
+
+import asyncio
+import logging
+import os
+import weakref
+import random
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+GROQ = 'groq'
+GEMINI = 'gemini'
+
+API_KEYS = {
+    GROQ: os.environ.get("GROQ_API_KEY"),
+    GEMINI: os.environ.get("GENAI_API_KEY"),
+}
+
+
+class AIError(Exception):
+    """Base error for the AI client layer."""
+
+
+class AIUnavailable(AIError):
+    """Provider is not configured, or its circuit breaker is open."""
+
+
+class AIRateLimited(AIError):
+    """Provider kept rate-limiting us after all retries."""
+
+
+class AITimeout(AIError):
+    """Provider did not answer within AI_REQUEST_TIMEOUT."""
+
+
+# ═══════════════════════════════════════════════════
+# RATE LIMITER & CIRCUIT BREAKER
+# ═══════════════════════════════════════════════════
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate_per_minute` requests with a small burst."""
+
+    def __init__(self, rate_per_minute, burst=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst or max(1, rate_per_minute // 6))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Take a token, returning how long the caller must wait before using it."""
+        with self.lock:
+            self._refill()
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def _take(self, max_wait):
+        """Reserve a token; returns the wait, or None if it would exceed `max_wait`."""
+        wait = self.reserve()
+        if wait > max_wait:
+            with self.lock:
+                self.tokens += 1  # give the reservation back
+            return None
+        return wait
+
+    def acquire(self, max_wait):
+        wait = self._take(max_wait)
+        if wait is None:
+            return False
+        if wait:
+            time.sleep(wait)
+        return True
+
+    async def aacquire(self, max_wait):
+        """acquire() for the event loop: waits without blocking the thread."""
+        wait = self._take(max_wait)
+        if wait is None:
+            return False
+        if wait:
+            await asyncio.sleep(wait)
+        return True
+
+
+class CircuitBreaker:
+    """
+    CLOSED → OPEN after `failure_threshold` consecutive failures.
+    OPEN → HALF_OPEN after `reset_timeout` seconds (one trial call allowed).
+    HALF_OPEN → CLOSED on success, back to OPEN on failure. A trial that ends
+    without an answer either way (cancelled) is released: OPEN again, with the
+    next call allowed to try at once.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'CLOSED', 'OPEN', 'HALF_OPEN'
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """The call allowed by allow() ended without an outcome; free its trial slot."""
+        with self.lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic() - self.reset_timeout
+
+
+_guards = {}
+_guards_lock = threading.Lock()
+
+
+def _guard(provider):
+    """(TokenBucket, CircuitBreaker) for a provider, shared by the whole process."""
+    with _guards_lock:
+        if provider not in _guards:
+            breaker_conf = settings.AI_CIRCUIT_BREAKER
+            _guards[provider] = (
+                TokenBucket(settings.AI_RATE_LIMITS.get(provider, 30)),
+                CircuitBreaker(breaker_conf['failure_threshold'], breaker_conf['reset_timeout']),
+            )
+        return _guards[provider]
+
+
+# ═══════════════════════════════════════════════════
+# METRICS
+# ═══════════════════════════════════════════════════
+
+_metrics = defaultdict(lambda: defaultdict(float))
+_metrics_lock = threading.Lock()
+
+
+def _record(provider, task, **values):
+    with _metrics_lock:
+        bucket = _metrics[(provider, task)]
+        for key, value in values.items():
+            bucket[key] += value
+        if 'latency_seconds' in values:
+            bucket['latency_max_seconds'] = max(bucket['latency_max_seconds'], values['latency_seconds'])
+
+
+def get_metrics():
+    """Snapshot of per-(provider, task) counters, e.g. for a metrics endpoint."""
+    with _metrics_lock:
+        return {key: dict(values) for key, values in _metrics.items()}
+
+
+def reset_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+
+
+def reset_guards():
+    """Drop rate limiters / breakers so they are rebuilt from current settings."""
+    with _guards_lock:
+        _guards.clear()
+
+
+# ═══════════════════════════════════════════════════
+# BACKENDS
+# ═══════════════════════════════════════════════════
+
+class LiveBackend:
+    """Real Groq / Gemini SDKs, with clients pooled for the life of the process."""
+
+    def __init__(self):
+        self._clients = {}
+        self._async_groq = weakref.WeakKeyDictionary()  # event loop → AsyncGroq
+        self._lock = threading.Lock()
+
+    def _groq(self):
+        with self._lock:
+            if GROQ not in self._clients:
+                from groq import Groq
+                # SDK retries are disabled: backoff is handled by call().
+                self._clients[GROQ] = Groq(
+                    api_key=API_KEYS[GROQ],
+                    timeout=settings.AI_REQUEST_TIMEOUT,
+                    max_retries=0,
+                )
+            return self._clients[GROQ]
+
+    def _agroq(self):
+        # httpx async pools are bound to the event loop that created them:
+        # one client per loop (a single one under uvicorn).
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if loop not in self._async_groq:
+                from groq import AsyncGroq
+                self._async_groq[loop] = AsyncGroq(
+                    api_key=API_KEYS[GROQ],
+                    timeout=settings.AI_REQUEST_TIMEOUT,
+                    max_retries=0,
+                )
+            return self._async_groq[loop]
+
+    def _genai(self):
+        with self._lock:
+            if GEMINI not in self._clients:
+                import google.generativeai as genai
+                genai.configure(api_key=API_KEYS[GEMINI])
+                self._clients[GEMINI] = genai
+            return self._clients[GEMINI]
+
+    def _gemini_model(self, model_name):
+        genai = self._genai()
+        key = (GEMINI, model_name)
+        with self._lock:
+            if key not in self._clients:
+                self._clients[key] = genai.GenerativeModel(model_name)
+            return self._clients[key]
+
+    def groq_chat(self, task, **kwargs):
+        return self._groq().chat.completions.create(**kwargs)
+
+    async def agroq_chat(self, task, **kwargs):
+        return await self._agroq().chat.completions.create(**kwargs)
+
+    def gemini_generate(self, task, model, contents):
+        return self._gemini_model(model).generate_content(
+            contents,
+            request_options={'timeout': settings.AI_REQUEST_TIMEOUT},
+        )
+
+    def gemini_upload(self, task, path, display_name=None):
+        return self._genai().upload_file(path=path, display_name=display_name)
+
+    def gemini_embed(self, task, model, texts, dimensions):
+        return self._genai().embed_content(
+            model=model,
+            content=texts,
+            output_dimensionality=dimensions,
+            request_options={'timeout': settings.AI_REQUEST_TIMEOUT},
+        )
+
+
+_live_backend = LiveBackend()
+
+
+def get_backend():
+    """Backend selected by settings.AI_BACKEND ('live' or 'stub')."""
+    if settings.AI_BACKEND == 'stub':
+        from .stub import stub_backend
+        return stub_backend
+    return _live_backend
+
+
+def is_configured(provider):
+    return settings.AI_BACKEND == 'stub' or bool(API_KEYS.get(provider))
+
+
+# ═══════════════════════════════════════════════════
+# RESILIENT CALL
+# ═══════════════════════════════════════════════════
+
+def _classify(exc):
+    """'rate_limit', 'timeout', 'transient' (worth retrying) or 'fatal'."""
+    status = getattr(exc, 'status_code', None) or getattr(exc, 'code', None)
+    text = str(exc).lower()
+    name = type(exc).__name__
+
+    if status == 429 or '429' in text or 'rate_limit' in text or name in ('RateLimitError', 'ResourceExhausted'):
+        return 'rate_limit'
+    if name in ('APITimeoutError', 'DeadlineExceeded', 'TimeoutError', 'ReadTimeout'):
+        return 'timeout'
+    if isinstance(status, int) and status >= 500:
+        return 'transient'
+    if name in ('APIConnectionError', 'InternalServerError', 'ServiceUnavailable', 'ConnectionError'):
+        return 'transient'
+    return 'fatal'
+
+
+def _retry_after(exc):
+    """Seconds from a Retry-After header (never negative), if the provider sent one."""
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return max(0.0, float(headers.get('retry-after')))
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt):
+    """Full-jitter exponential backoff."""
+    ceiling = min(settings.AI_BACKOFF_MAX, settings.AI_BACKOFF_BASE * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+def _check_available(provider, task, bucket, breaker):
+    """
+    Take a rate-limit token, then ask the breaker (in that order: a throttled
+    call must not use up the breaker's half-open trial).
+    """
+    if not bucket.acquire(max_wait=settings.AI_RATE_LIMIT_MAX_WAIT):
+        _record(provider, task, throttled=1)
+        raise AIRateLimited(f"{provider} local rate limit exceeded.")
+    if not breaker.allow():
+        _record(provider, task, breaker_rejections=1)
+        raise AIUnavailable(f"{provider} circuit breaker is open.")
+
+
+async def _acheck_available(provider, task, bucket, breaker):
+    """_check_available() for the event loop."""
+    if not await bucket.aacquire(max_wait=settings.AI_RATE_LIMIT_MAX_WAIT):
+        _record(provider, task, throttled=1)
+        raise AIRateLimited(f"{provider} local rate limit exceeded.")
+    if not breaker.allow():
+        _record(provider, task, breaker_rejections=1)
+        raise AIUnavailable(f"{provider} circuit breaker is open.")
+
+
+def _on_failure(provider, task, breaker, exc, elapsed, last_attempt, attempt):
+    """Record a failed attempt. Raises the mapped AIError, or returns the delay before retrying."""
+    kind = _classify(exc)
+    _record(provider, task, errors=1, latency_seconds=elapsed)
+    if kind == 'fatal':
+        breaker.record_success()  # provider answered; the request itself was bad
+    else:
+        breaker.record_failure()
+
+    retry_after = _retry_after(exc)
+    if retry_after is not None and retry_after > settings.AI_BACKOFF_MAX:
+        # Not worth holding the request (or a worker) for; the provider asked for a long pause
+        logger.warning("AI call failed (%s/%s, %s), Retry-After %.0fs: %s", provider, task, kind, retry_after, exc)
+        raise AIRateLimited(f"{provider} asked to retry after {retry_after:.0f}s.") from exc
+
+    if kind == 'fatal' or last_attempt:
+        logger.warning("AI call failed (%s/%s, %s): %s", provider, task, kind, exc)
+        if kind == 'rate_limit':
+            raise AIRateLimited(str(exc)) from exc
+        if kind == 'timeout':
+            raise AITimeout(str(exc)) from exc
+        raise AIError(str(exc)) from exc
+
+    delay = _backoff(attempt) if retry_after is None else retry_after
+    _record(provider, task, retries=1)
+    logger.info("AI %s error from %s (%s), retrying in %.1fs", kind, provider, task, delay)
+    return delay
+
+
+def _on_success(provider, task, breaker, result, elapsed):
+    breaker.record_success()
+    _record(provider, task, calls=1, latency_seconds=elapsed, **_usage(result))
+
+
+def call(provider, fn, task='default'):
+    """
+    Run `fn()` (a single provider request) with rate limiting, circuit breaking,
+    retries and metrics. Returns whatever `fn` returns.
+    """
+    if not is_configured(provider):
+        raise AIUnavailable(f"{provider} API key is not configured.")
+
+    bucket, breaker = _guard(provider)
+    max_retries = settings.AI_MAX_RETRIES
+
+    for attempt in range(max_retries + 1):
+        _check_available(provider, task, bucket, breaker)
+
+        started = time.monotonic()
+        try:
+            result = fn()
+        except Exception as exc:
+            delay = _on_failure(provider, task, breaker, exc, time.monotonic() - started, attempt == max_retries, attempt)
+            time.sleep(delay)
+            continue
+        except BaseException:
+            breaker.release()
+            raise
+
+        _on_success(provider, task, breaker, result, time.monotonic() - started)
+        return result
+
+
+async def acall(provider, afn, task='default'):
+    """call() for coroutines: `afn()` returns an awaitable; waits never block the event loop."""
+    if not is_configured(provider):
+        raise AIUnavailable(f"{provider} API key is not configured.")
+
+    bucket, breaker = _guard(provider)
+    max_retries = settings.AI_MAX_RETRIES
+
+    for attempt in range(max_retries + 1):
+        await _acheck_available(provider, task, bucket, breaker)
+
+        started = time.monotonic()
+        try:
+            result = await afn()
+        except Exception as exc:
+            delay = _on_failure(provider, task, breaker, exc, time.monotonic() - started, attempt == max_retries, attempt)
+            await asyncio.sleep(delay)
+            continue
+        except BaseException:
+            # Cancelled (e.g. the SSE client went away): no verdict on the provider
+            breaker.release()
+            raise
+
+        _on_success(provider, task, breaker, result, time.monotonic() - started)
+        return result
+
+
+def _usage(response):
+    """Token counts from a Groq or Gemini response (zeros if unavailable)."""
+    usage = getattr(response, 'usage', None)
+    if usage is not None:
+        return {
+            'prompt_tokens': getattr(usage, 'prompt_tokens', 0) or 0,
+            'completion_tokens': getattr(usage, 'completion_tokens', 0) or 0,
+        }
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is not None:
+        return {
+            'prompt_tokens': getattr(usage, 'prompt_token_count', 0) or 0,
+            'completion_tokens': getattr(usage, 'candidates_token_count', 0) or 0,
+        }
+    return {}
+
+
+# ═══════════════════════════════════════════════════
+# PUBLIC API
+# ═══════════════════════════════════════════════════
+
+def chat_completion(messages, model="llama-3.3-70b-versatile", temperature=0.7, max_tokens=500, task='chat'):
+    """Groq chat completion. Returns the assistant text."""
+    backend = get_backend()
+    response = call(GROQ, lambda: backend.groq_chat(
+        task,
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+    ), task=task)
+    return response.choices[0].message.content
+
+
+def chat_completion_stream(messages, model="llama-3.3-70b-versatile", temperature=0.7, max_tokens=500, task='chat'):
+    """
+    Streaming Groq chat completion. Returns an iterator of text deltas.
+
+    The stream is opened here, through call() (rate limit, breaker, retries),
+    so those errors surface before the caller starts responding. Once tokens
+    have been yielded a failure cannot be retried and raises AIError.
+    """
+    backend = get_backend()
+    started = time.monotonic()
+    stream = call(GROQ, lambda: backend.groq_chat(
+        task,
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True,
+    ), task=task)
+    return _relay_stream(stream, task, started)
+
+
+def _relay_stream(stream, task, started):
+    first = True
+    try:
+        for chunk in stream:
+            delta = _chunk_delta(chunk, task, started, first)
+            if delta:
+                first = False
+                yield delta
+    except Exception as exc:
+        _stream_failed(task, exc)
+    _record(GROQ, task, streams=1, stream_seconds=time.monotonic() - started)
+
+
+def _chunk_delta(chunk, task, started, first):
+    # Groq reports token usage on the final chunk
+    usage = _usage(getattr(chunk, 'x_groq', None))
+    if usage:
+        _record(GROQ, task, **usage)
+    delta = chunk.choices[0].delta.content if chunk.choices else None
+    if delta and first:
+        _record(GROQ, task, first_token_seconds=time.monotonic() - started)
+    return delta
+
+
+def _stream_failed(task, exc):
+    _record(GROQ, task, errors=1)
+    logger.warning("AI stream interrupted (%s/%s): %s", GROQ, task, exc)
+    raise AIError(str(exc)) from exc
+
+
+async def achat_completion(messages, model="llama-3.3-70b-versatile", temperature=0.7, max_tokens=500, task='chat'):
+    """Async chat_completion() (AsyncGroq): the LLM wait does not hold a thread."""
+    backend = get_backend()
+    response = await acall(GROQ, lambda: backend.agroq_chat(
+        task,
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+    ), task=task)
+    return response.choices[0].message.content
+
+
+async def achat_completion_message(messages, tools, model="llama-3.3-70b-versatile", temperature=0.7, max_tokens=500,
+                                  tool_choice='auto', task='chat'):
+    """
+    One function-calling round. Returns the assistant message: `.content`, or
+    `.tool_calls` (each with `.id`, `.function.name`, `.function.arguments` JSON)
+    when the model wants tool results before answering.
+    """
+    backend = get_backend()
+    response = await acall(GROQ, lambda: backend.agroq_chat(
+        task,
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        tools=tools,
+        tool_choice=tool_choice,
+    ), task=task)
+    return response.choices[0].message
+
+
+async def achat_completion_stream(messages, model="llama-3.3-70b-versatile", temperature=0.7, max_tokens=500, task='chat'):
+    """Async chat_completion_stream(). Returns an async iterator of text deltas."""
+    backend = get_backend()
+    started = time.monotonic()
+    stream = await acall(GROQ, lambda: backend.agroq_chat(
+        task,
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True,
+    ), task=task)
+    return _arelay_stream(stream, task, started)
+
+
+async def _arelay_stream(stream, task, started):
+    first = True
+    try:
+        async for chunk in stream:
+            delta = _chunk_delta(chunk, task, started, first)
+            if delta:
+                first = False
+                yield delta
+    except Exception as exc:
+        _stream_failed(task, exc)
+    _record(GROQ, task, streams=1, stream_seconds=time.monotonic() - started)
+
+
+def generate_content(contents, model='gemini-flash-latest', task='generate'):
+    """Gemini generate_content. Returns the response text."""
+    backend = get_backend()
+    response = call(GEMINI, lambda: backend.gemini_generate(task, model, contents), task=task)
+    return response.text
+
+
+def upload_file(path, display_name=None, task='upload'):
+    """Upload a file (e.g. a maintenance photo) to Gemini for multimodal prompts."""
+    backend = get_backend()
+    return call(GEMINI, lambda: backend.gemini_upload(task, path, display_name), task=task)
+
+
+def embed_content(texts, model='models/text-embedding-004', dimensions=256, task='embed'):
+    """Gemini embeddings for a batch of texts. Returns a list of vectors."""
+    backend = get_backend()
+    response = call(GEMINI, lambda: backend.gemini_embed(task, model, texts, dimensions), task=task)
+    return response['embedding']
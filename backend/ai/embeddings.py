@@ -0,0 +1,90 @@
+"""
+Text embeddings for retrieval (chatbot context, answer cache).
+
+Two embedders, selected by settings.AI_EMBEDDER:
+  - 'gemini'  : Gemini text-embedding model through the shared AI client.
+  - 'hashing' : offline feature-hashing embedder — deterministic, no network,
+                good enough for keyword-ish similarity and for tests.
+
+Both produce EMBEDDING_DIMENSIONS-long, L2-normalised vectors, but they are
+NOT interchangeable: switching AI_EMBEDDER requires `manage.py rebuild_chat_index`.
+"""
+
+import hashlib
+import math
+import re
+
+from django.conf import settings
+
+EMBEDDING_DIMENSIONS = 256
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(text):
+    words = []
+    for word in _TOKEN_RE.findall(text.lower()):
+        if len(word) > 3 and word.endswith('s'):
+            word = word[:-1]  # cheap plural folding: "pets" ~ "pet"
+        words.append(word)
+    return words
+
+
+def _normalise(vector):
+    norm = math.sqrt(sum(v * v for v in vector))
+    if not norm:
+        vector = [0.0] * len(vector)
+        vector[0] = 1.0  # cosine distance is undefined for the zero vector
+        return vector
+    return [v / norm for v in vector]
+
+
+def hashing_vector(text, dimensions=EMBEDDING_DIMENSIONS):
+    """Signed feature hashing of word unigrams and bigrams."""
+    vector = [0.0] * dimensions
+    words = _tokens(text)
+    features = words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+    for feature in features:
+        digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+        value = int.from_bytes(digest, 'big')
+        index = value % dimensions
+        vector[index] += 1.0 if (value >> 63) & 1 else -1.0
+    return _normalise(vector)
+
+
+class HashingEmbedder:
+    name = 'hashing'
+
+    def embed(self, texts):
+        return [hashing_vector(text) for text in texts]
+
+
+class GeminiEmbedder:
+    name = 'gemini'
+    model = 'models/text-embedding-004'
+
+    def embed(self, texts):
+        from .client import embed_content
+        vectors = embed_content(texts, model=self.model, dimensions=EMBEDDING_DIMENSIONS)
+        return [_normalise(list(vector)) for vector in vectors]
+
+
+_EMBEDDERS = {
+    'hashing': HashingEmbedder(),
+    'gemini': GeminiEmbedder(),
+}
+
+
+def get_embedder():
+    return _EMBEDDERS[settings.AI_EMBEDDER]
+
+
+def embed_texts(texts):
+    """Embed a list of strings (batched into one provider call where possible)."""
+    if not texts:
+        return []
+    return get_embedder().embed(list(texts))
+
+
+def embed_query(text):
+    return embed_texts([text])[0]
@@ -0,0 +1,243 @@
+"""
+Local fake LLM provider (AI_BACKEND='stub').
+
+Returns schema-valid responses shaped like the Groq / Gemini SDK objects, so
+the chatbot, smart pricing and maintenance triage paths run end to end without
+network access. Latency and failures are injected from settings.AI_STUB:
+
+    latency_ms       base response time
+    jitter_ms        +/- random spread around latency_ms
+    token_ms         delay between streamed chunks (stream=True chat calls)
+    rate_limit_rate  fraction of calls that fail with a 429
+    malformed_rate   fraction of calls that return unparseable output
+    seed             makes the injected sequence reproducible
+
+Chat calls that pass `tools` get a tool call back for the tool best matching
+the question's words, and once tool results are in, an answer quoting them.
+
+Calls still go through ai.client.call(), so rate limiting, retries and the
+circuit breaker behave exactly as they would against the real providers.
+"""
+
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from django.conf import settings
+
+
+class StubRateLimitError(Exception):
+    """Injected provider 429."""
+    status_code = 429
+
+
+class StubBackend:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    def _rng(self):
+        """Per-call RNG: the Nth call gets the same draws for the same seed."""
+        with self._lock:
+            self._counter += 1
+            n = self._counter
+        return random.Random(f"{settings.AI_STUB['seed']}:{n}")
+
+    def reset(self):
+        with self._lock:
+            self._counter = 0
+
+    def _draw(self, rng):
+        """Latency (seconds) for this call, and the injected failure: None, 'rate_limit' or 'malformed'."""
+        conf = settings.AI_STUB
+        latency = max(0.0, conf['latency_ms'] + rng.uniform(-conf['jitter_ms'], conf['jitter_ms'])) / 1000.0
+        if rng.random() < conf['rate_limit_rate']:
+            return latency, 'rate_limit'
+        return latency, 'malformed' if rng.random() < conf['malformed_rate'] else None
+
+    def _simulate(self, rng):
+        """Sleep for the configured latency, then maybe raise a 429. Returns True if output should be malformed."""
+        latency, failure = self._draw(rng)
+        time.sleep(latency)
+        if failure == 'rate_limit':
+            raise StubRateLimitError("429 Too Many Requests (stub)")
+        return failure == 'malformed'
+
+    async def _asimulate(self, rng):
+        """_simulate() without blocking the event loop."""
+        latency, failure = self._draw(rng)
+        await asyncio.sleep(latency)
+        if failure == 'rate_limit':
+            raise StubRateLimitError("429 Too Many Requests (stub)")
+        return failure == 'malformed'
+
+    # --- Groq ---
+
+    def groq_chat(self, task, **kwargs):
+        malformed = self._simulate(self._rng())
+        calls = _tool_calls(kwargs)
+        if calls and not malformed:
+            return _tool_call_response(calls, kwargs['messages'])
+        text, messages = _chat_text(kwargs, malformed)
+        if kwargs.get('stream'):
+            return _stream(text, messages)
+        return _chat_response(text, messages)
+
+    async def agroq_chat(self, task, **kwargs):
+        """Same as groq_chat(), shaped like AsyncGroq (awaitable, async streams)."""
+        malformed = await self._asimulate(self._rng())
+        calls = _tool_calls(kwargs)
+        if calls and not malformed:
+            return _tool_call_response(calls, kwargs['messages'])
+        text, messages = _chat_text(kwargs, malformed)
+        if kwargs.get('stream'):
+            return _astream(text, messages)
+        return _chat_response(text, messages)
+
+    # --- Gemini ---
+
+    def gemini_generate(self, task, model, contents):
+        rng = self._rng()
+        malformed = self._simulate(rng)
+        prompt = contents if isinstance(contents, str) else ' '.join(str(c) for c in contents if isinstance(c, str))
+
+        if task == 'pricing':
+            text = _pricing_response(prompt, rng, malformed)
+        elif task == 'triage':
+            text = "I could not analyse this image." if malformed else _triage_response(rng)
+        else:
+            text = "```" if malformed else "(stub) Generated content."
+
+        return SimpleNamespace(
+            text=text,
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=len(prompt) // 4,
+                candidates_token_count=len(text) // 4,
+            ),
+        )
+
+    def gemini_embed(self, task, model, texts, dimensions):
+        from .embeddings import hashing_vector
+        self._simulate(self._rng())
+        return {'embedding': [hashing_vector(text, dimensions) for text in texts]}
+
+    def gemini_upload(self, task, path, display_name=None):
+        self._simulate(self._rng())
+        return SimpleNamespace(name=f"files/stub-{abs(hash(path)) % 10**8}", display_name=display_name, uri=path)
+
+
+def _chat_text(kwargs, malformed):
+    messages = kwargs.get('messages', [])
+    question = next((m['content'] for m in reversed(messages) if m.get('role') == 'user'), '')
+    if malformed:
+        return '{"response": ', messages
+    if messages and messages[-1].get('role') == 'tool':
+        results = [m for m in messages if m.get('role') == 'tool']
+        names = ', '.join(m.get('name', '?') for m in results)
+        return f"(stub) Based on {names}: {results[-1]['content'][:200]}", messages
+    return f"(stub) Thanks for your question about \"{question[:80]}\". Here is a short answer.", messages
+
+
+def _tool_calls(kwargs):
+    """
+    Tool the stub 'decides' to call: the one whose name and description share
+    the most words with the question. Only on the first round (no tool results
+    yet); never when tool_choice='none'.
+    """
+    tools = kwargs.get('tools')
+    messages = kwargs.get('messages', [])
+    if not tools or kwargs.get('tool_choice') == 'none' or not messages or messages[-1].get('role') != 'user':
+        return []
+    words = set(re.findall(r"[a-z]+", messages[-1]['content'].lower()))
+    scored = []
+    for spec in tools:
+        function = spec['function']
+        vocabulary = set(re.findall(r"[a-z]+", f"{function['name'].replace('_', ' ')} {function['description']}".lower()))
+        scored.append((len(words & vocabulary - _STOP_WORDS), function['name']))
+    score, name = max(scored)
+    return [name] if score else []
+
+
+_STOP_WORDS = {'a', 'an', 'and', 'are', 'for', 'how', 'i', 'in', 'is', 'many', 'me', 'my', 'of', 'on', 'or',
+               'the', 'to', 'what', 'when', 'which', 'with'}
+
+
+def _tool_call_response(names, messages):
+    calls = [
+        SimpleNamespace(id=f"call_{i}", type='function', function=SimpleNamespace(name=name, arguments='{}'))
+        for i, name in enumerate(names)
+    ]
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=None, tool_calls=calls))],
+        usage=_chat_usage('', messages),
+    )
+
+
+def _chat_usage(text, messages):
+    return SimpleNamespace(
+        prompt_tokens=sum(len(str(m.get('content', ''))) for m in messages) // 4,
+        completion_tokens=len(text) // 4,
+    )
+
+
+def _chat_response(text, messages):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=text, tool_calls=None))],
+        usage=_chat_usage(text, messages),
+    )
+
+
+def _stream_chunks(text, messages):
+    """Chunks shaped like Groq's ChatCompletionChunk: one per word, then a usage-only chunk."""
+    for word in re.findall(r"\S+\s*", text):
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word))], x_groq=None)
+    yield SimpleNamespace(choices=[], x_groq=SimpleNamespace(usage=_chat_usage(text, messages)))
+
+
+def _stream(text, messages):
+    for chunk in _stream_chunks(text, messages):
+        yield chunk
+        time.sleep(settings.AI_STUB['token_ms'] / 1000.0)
+
+
+async def _astream(text, messages):
+    for chunk in _stream_chunks(text, messages):
+        yield chunk
+        await asyncio.sleep(settings.AI_STUB['token_ms'] / 1000.0)
+
+
+def _pricing_response(prompt, rng, malformed):
+    """JSON matching the schema requested by properties.ai_pricing."""
+    if malformed:
+        return '```json\n{"recommended_low": 80000, "recommended_mid": '
+
+    match = re.search(r"Market Average: AED ([\d,]+)", prompt)
+    avg = int(match.group(1).replace(',', '')) if match else 80000
+    mid = int(avg * rng.uniform(0.95, 1.05))
+    return json.dumps({
+        "recommended_low": int(mid * 0.9),
+        "recommended_mid": mid,
+        "recommended_high": int(mid * 1.1),
+        "confidence": rng.randint(60, 90),
+        "verdict": rng.choice(["UNDERPRICED", "FAIR", "OVERPRICED", "PREMIUM"]),
+        "reasoning": "Stub recommendation derived from the market average in the prompt.",
+        "tips": ["Stub tip 1", "Stub tip 2", "Stub tip 3"],
+    })
+
+
+def _triage_response(rng):
+    """Text in the 'Priority / Title / Description' format parsed by maintenance.ai_agent."""
+    priority = rng.choice(["LOW", "MEDIUM", "HIGH", "EMERGENCY"])
+    return (
+        f"Priority: {priority}\n"
+        f"Title: Stub triage result ({priority.lower()})\n"
+        f"Description: Simulated analysis of the uploaded photo. Inspect and repair as needed."
+    )
+
+
+stub_backend = StubBackend()
@@ -0,0 +1,133 @@
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from . import client
+from .client import GROQ, AIError, AIRateLimited, AIUnavailable, CircuitBreaker, TokenBucket
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        headers = {'retry-after': retry_after} if retry_after is not None else {}
+        self.response = SimpleNamespace(headers=headers)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_half_open_allows_one_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_trial_outcome(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        breaker.allow()
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+        breaker.record_failure()
+        breaker.allow()
+        breaker.reset_timeout = 60
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_released_trial_can_be_retried_at_once(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        breaker.opened_at -= 60
+        self.assertTrue(breaker.allow())
+        breaker.release()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertTrue(breaker.allow())
+
+
+@override_settings(AI_BACKEND='stub', AI_MAX_RETRIES=2, AI_RATE_LIMIT_MAX_WAIT=0, AI_BACKOFF_BASE=0.01, AI_BACKOFF_MAX=5)
+class ResilientCallTests(SimpleTestCase):
+    def setUp(self):
+        self.bucket = TokenBucket(rate_per_minute=600, burst=10)
+        self.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        client._guards[GROQ] = (self.bucket, self.breaker)
+        self.addCleanup(client.reset_guards)
+        sleep = mock.patch.object(client.time, 'sleep')
+        self.sleep = sleep.start()
+        self.addCleanup(sleep.stop)
+
+    def open_breaker(self):
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+    def test_failed_trial_reopens_and_success_closes(self):
+        self.open_breaker()
+        with override_settings(AI_MAX_RETRIES=0), self.assertRaises(AIError):
+            client.call(GROQ, mock.Mock(side_effect=ProviderError(500)))
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(client.call(GROQ, lambda: 'ok'), 'ok')
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_throttled_call_does_not_use_up_the_trial(self):
+        self.open_breaker()
+        self.bucket.tokens = 0
+        with self.assertRaises(AIRateLimited):
+            client.call(GROQ, lambda: 'ok')
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.bucket.tokens = 10
+        self.assertEqual(client.call(GROQ, lambda: 'ok'), 'ok')
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_cancelled_trial_is_released(self):
+        self.open_breaker()
+
+        async def scenario():
+            started = asyncio.Event()
+
+            async def hang():
+                started.set()
+                await asyncio.Event().wait()
+
+            task = asyncio.ensure_future(client.acall(GROQ, hang))
+            await started.wait()
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+            async def answer():
+                return 'ok'
+            return await client.acall(GROQ, answer)
+
+        self.assertEqual(asyncio.run(scenario()), 'ok')
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_open_breaker_rejects(self):
+        self.breaker.reset_timeout = 60
+        self.open_breaker()
+        with self.assertRaises(AIUnavailable):
+            client.call(GROQ, lambda: 'ok')
+
+    def test_long_retry_after_fails_fast(self):
+        fn = mock.Mock(side_effect=ProviderError(429, retry_after='3600'))
+        with self.assertRaises(AIRateLimited):
+            client.call(GROQ, fn)
+        self.assertEqual(fn.call_count, 1)
+        self.sleep.assert_not_called()
+
+    def test_retry_after_is_honoured_within_bounds(self):
+        fn = mock.Mock(side_effect=[ProviderError(429, retry_after='-5'), ProviderError(503, retry_after='2'), 'ok'])
+        self.breaker.failure_threshold = 5
+        self.assertEqual(client.call(GROQ, fn), 'ok')
+        self.assertEqual([c.args[0] for c in self.sleep.call_args_list], [0.0, 2.0])
@@ -1,8 +1,41 @@
 from django.contrib import admin
-from .models import ChatLog
+from .models import ChatDailyStat, ChatLog, ChatMessage, Conversation, Notification
 
 @admin.register(ChatLog)
 class ChatLogAdmin(admin.ModelAdmin):
-    list_display = ('organization', 'timestamp', 'user_message')
+    list_display = ('organization', 'user', 'timestamp', 'user_message', 'cache_hit')
+    list_filter = ('organization', 'cache_hit')
+    list_select_related = ('organization', 'user')
+    ordering = ('-timestamp',)
+    exclude = ('response_compressed',)
+    readonly_fields = ('full_response',)
+
+
+@admin.register(ChatDailyStat)
+class ChatDailyStatAdmin(admin.ModelAdmin):
+    list_display = ('date', 'organization', 'chats', 'cache_hits', 'users', 'conversations')
     list_filter = ('organization',)
-    ordering = ('-timestamp',)
\ No newline at end of file
+    ordering = ('-date',)
+
+
+class ChatMessageInline(admin.TabularInline):
+    model = ChatMessage
+    extra = 0
+    readonly_fields = ('role', 'content', 'created_at')
+
+
+@admin.register(Conversation)
+class ConversationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'organization', 'updated_at')
+    list_filter = ('organization',)
+    readonly_fields = ('summary', 'summarized_through')
+    inlines = [ChatMessageInline]
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'kind', 'severity', 'title', 'created_at', 'read_at')
+    list_filter = ('kind', 'severity', 'organization')
+    list_select_related = ('recipient',)
+    raw_id_fields = ('recipient',)
+    ordering = ('-created_at',)
@@ -0,0 +1,127 @@
+"""
+Semantic answer cache for the chatbot.
+
+Many users ask the same things ("gym hours?", "when is my next cheque?"). An
+answer is stored under a *scope* that fingerprints the data it was built from:
+
+  property  building-rules questions (context.get_rules_context), answered
+            from a prompt holding only the building's matching RuleSections,
+            and shared by every tenant of the building
+  tenant    anything else a tenant asks: the tenant's own version (lease,
+            cheques, tickets) plus their property's version (rules, units)
+  admin     the user and every topic version of their org
+
+A tenant answer is only shared when it was built from the rules alone. The
+regular tenant prompt carries the asker's profile, lease, cheques and tickets
+(get_tenant_context) and their name (build_system_prompt), and an answer to
+"when will the technician visit?" leans on exactly that, so it stays under
+the tenant's own scope.
+
+The version counters are the ones communication/signals.py bumps for the
+context cache, so saving new rules (update_property_rules) or a cheque moves
+later questions to a new scope, and the old answers expire after
+CHAT_ANSWER_CACHE_TTL. Within a scope a question matches on its normalized
+text, or else on embedding similarity >= CHAT_ANSWER_CACHE_SIMILARITY so
+paraphrases hit too.
+"""
+
+import re
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from pgvector.django import CosineDistance
+
+from ai.embeddings import embed_query
+from .context import ADMIN_SECTIONS, _find_tenant, _version_key, _versions
+from .models import CachedAnswer
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9 ]+")
+_SPACE_RE = re.compile(r"\s+")
+
+# Questions that lean on earlier turns can't be answered from the cache
+_FOLLOW_UP_RE = re.compile(r"^(and|also|what about|how about|but|so|then)\b|\b(it|that|this|those|these|them|he|she|they)\b")
+
+
+def normalize_question(text):
+    text = _NON_WORD_RE.sub(' ', text.lower())
+    return _SPACE_RE.sub(' ', text).strip()[:500]
+
+
+def is_cacheable(question):
+    return settings.CHAT_ANSWER_CACHE_ENABLED and not _FOLLOW_UP_RE.search(normalize_question(question))
+
+
+async def fingerprint(user, is_admin, question):
+    """Scope string for caching this user's answer to `question` (None if it can't be cached)."""
+    if is_admin:
+        org = getattr(user, 'organization', None)
+        if org is None and not user.is_superuser:
+            return None
+        scope = 'all' if user.is_superuser else f"org:{org.id}"
+        topics = sorted({topic for deps in ADMIN_SECTIONS.values() for topic in deps})
+        versions = await _versions([_version_key(scope, topic) for topic in topics])
+        return f"admin:{user.id}:{scope}:{versions}"
+
+    tenant = await _find_tenant(user)
+    if tenant is None:
+        return None
+    lease = tenant.active_leases[0] if tenant.active_leases else None
+    property_id = lease.unit.property_id if lease else None
+    keys = [_version_key(f"tenant:{tenant.id}")]
+    if property_id:
+        keys.append(_version_key(f"property:{property_id}"))
+    return f"tenant:{tenant.id}:{property_id}:{await _versions(keys)}"
+
+
+async def rules_scope(property_id):
+    """Scope shared by the building for answers built from its rules alone."""
+    return f"property:{property_id}:{await _versions([_version_key(f'property:{property_id}')])}"
+
+
+async def _embed(question):
+    return await sync_to_async(embed_query, thread_sensitive=False)(question)
+
+
+async def lookup(scope, question):
+    """
+    Cached answer for the question in this scope, or None.
+    Returns (CachedAnswer, embedding) — the embedding is reused by store() on a miss.
+    """
+    live = CachedAnswer.objects.filter(scope=scope, expires_at__gt=timezone.now())
+    entry = await live.filter(normalized=normalize_question(question)).afirst()
+    embedding = None
+    if entry is None:
+        embedding = await _embed(question)
+        max_distance = 1 - settings.CHAT_ANSWER_CACHE_SIMILARITY
+        entry = await (
+            live.annotate(distance=CosineDistance('embedding', embedding))
+            .filter(distance__lte=max_distance)
+            .order_by('distance')
+            .afirst()
+        )
+    if entry is not None:
+        await CachedAnswer.objects.filter(pk=entry.pk).aupdate(hits=F('hits') + 1)
+    return entry, embedding
+
+
+async def store(scope, question, answer, action=None, embedding=None):
+    if embedding is None:
+        embedding = await _embed(question)
+    await CachedAnswer.objects.acreate(
+        scope=scope,
+        question=question,
+        normalized=normalize_question(question),
+        embedding=embedding,
+        answer=answer,
+        action=action,
+        expires_at=timezone.now() + timedelta(seconds=settings.CHAT_ANSWER_CACHE_TTL),
+    )
+
+
+def purge_expired():
+    """Delete expired answers. Returns the number removed."""
+    deleted, _ = CachedAnswer.objects.filter(expires_at__lte=timezone.now()).delete()
+    return deleted
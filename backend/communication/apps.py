@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class CommunicationConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'communication'
+
+    def ready(self):
+        import communication.signals  # Invalidates cached chat context
+        import communication.notifications  # Notification feed writers
+        import communication.realtime  # Live updates over WebSockets
+        from communication.signals import backfill_context_index
+        post_migrate.connect(backfill_context_index, sender=self)
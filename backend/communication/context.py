@@ -0,0 +1,395 @@
+"""
+RAG context builders for the chatbot.
+
+Context is assembled from named sections. Each section is built from a fixed
+number of prefetched queries and cached; the cache key embeds version counters
+for the data it depends on, and communication/signals.py bumps those counters
+whenever a Property, Unit, Tenant, Lease, Cheque or MaintenanceTicket changes.
+So consecutive chat turns reuse the cached text, and a change only rebuilds
+the sections that actually depend on it.
+
+When a question is given (and CHAT_RETRIEVAL_ENABLED), the per-record listings
+are replaced by the top-k records retrieved for that question (retrieval.py),
+which keeps the prompt bounded regardless of portfolio size. If nothing comes
+back (e.g. the index hasn't been built yet) the full listings are sent. Building rules
+are never pasted whole: only the RuleSections matching the question
+(properties.rules.search_rules, Postgres full-text search) are included.
+
+With CHAT_TOOLS_ENABLED the chat view lets the model query data on demand
+through communication/tools.py instead; these builders are then only the
+fallback (and the source of the cached portfolio summary tool).
+
+The builders are async (Django's async ORM and cache APIs) so the chat view
+can run on the ASGI event loop without tying up a worker thread.
+"""
+
+import logging
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Prefetch, Q, Sum
+
+from tenants.models import Tenant, Lease
+from properties.models import Property, Unit
+from finance.models import Cheque
+from maintenance.models import MaintenanceTicket
+from properties.rules import asearch_rules, detect_topics
+from .retrieval import aretrieve
+
+logger = logging.getLogger(__name__)
+
+# Which data each admin section is built from (see bump_versions()).
+ADMIN_SECTIONS = {
+    'summary': ('property', 'unit', 'lease', 'cheque', 'tenant'),
+    'properties': ('property', 'unit'),
+    'units': ('property', 'unit'),
+    'tenants': ('tenant', 'lease', 'unit'),
+    'tickets': ('ticket', 'unit'),
+    'cheques': ('cheque', 'tenant'),
+}
+
+# Sections still sent in full when retrieval supplies the individual records
+RETRIEVAL_SECTIONS = ('summary', 'properties')
+
+# Questions that lean on the asker's own profile, lease, payments or tickets
+_PERSONAL_RE = re.compile(
+    r"\b(i|me|my|mine|we|us|our|ours|lease|contract|cheques?|payments?|rent|tickets?|requests?|complaints?|technicians?)\b"
+)
+
+MAX_UNITS = 100
+MAX_TENANTS = 20
+MAX_TICKETS = 15
+MAX_CHEQUES = 20
+
+
+# ═══════════════════════════════════════════════════
+# VERSION COUNTERS
+# ═══════════════════════════════════════════════════
+
+def _version_key(scope, topic=None):
+    return f"chatctx:ver:{scope}:{topic}" if topic else f"chatctx:ver:{scope}"
+
+
+def bump_versions(scopes):
+    """Invalidate every cached section depending on the given (scope, topic) keys."""
+    for scope in scopes:
+        key = _version_key(*scope) if isinstance(scope, tuple) else _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, None)
+
+
+async def _versions(keys):
+    stored = await cache.aget_many(keys)
+    return '.'.join(str(stored.get(key, 1)) for key in keys)
+
+
+async def _cached(key, builder):
+    text = await cache.aget(key)
+    if text is None:
+        text = await builder()
+        await cache.aset(key, text, settings.CHAT_CONTEXT_TTL)
+    return text
+
+
+# ═══════════════════════════════════════════════════
+# TENANT CONTEXT
+# ═══════════════════════════════════════════════════
+
+async def _find_tenant(user):
+    active_leases = Prefetch(
+        'leases',
+        queryset=Lease.objects.filter(is_active=True).select_related('unit__property'),
+        to_attr='active_leases',
+    )
+    tenant = await Tenant.objects.prefetch_related(active_leases).filter(user=user).afirst()
+    if tenant is None and user.email:
+        tenant = await Tenant.objects.prefetch_related(active_leases).filter(email=user.email).afirst()
+    return tenant
+
+
+async def get_tenant_context(user, question=None):
+    """Build RAG context for a tenant user."""
+    tenant = await _find_tenant(user)
+    if tenant is None:
+        return "No tenant profile found for this user."
+
+    lease = tenant.active_leases[0] if tenant.active_leases else None
+    keys = [_version_key(f"tenant:{tenant.id}")]
+    if lease:
+        keys.append(_version_key(f"property:{lease.unit.property_id}"))
+
+    rules = None
+    if lease and question and settings.CHAT_RETRIEVAL_ENABLED:
+        rules = await _retrieved_rules(question, lease)
+
+    include_rules = rules is None
+    cache_key = f"chatctx:tenant:{tenant.id}:{int(include_rules)}:{await _versions(keys)}"
+    context = await _cached(cache_key, lambda: _build_tenant_context(tenant, lease, include_rules))
+    return context + (rules or '')
+
+
+async def _retrieved_rules(question, lease):
+    """Only the rule sections relevant to the question (None if retrieval is unavailable)."""
+    try:
+        sections = await asearch_rules([lease.unit.property_id], question)
+    except Exception as e:
+        logger.warning("Rules retrieval failed, sending full rules: %s", e)
+        return None
+    if not sections:
+        return ''
+    return "\nBUILDING RULES & REGULATIONS (relevant sections):\n" + '\n\n'.join(_format_rule(r) for r in sections) + '\n'
+
+
+def is_rules_question(question):
+    """A building-rules question ('gym hours?', 'are dogs allowed?') the asker's own records play no part in."""
+    text = question.lower()
+    topics = detect_topics(text)
+    return bool(topics) and 'PAYMENTS' not in topics and not _PERSONAL_RE.search(text)
+
+
+async def get_rules_context(user, question):
+    """
+    (property_id, context) for a tenant's building-rules question: the
+    matching RuleSections of their building and nothing about the tenant, so
+    the answer built from it can be shared by the whole building (see
+    answer_cache). None if it isn't a rules question or no section matches.
+    """
+    if not is_rules_question(question):
+        return None
+    tenant = await _find_tenant(user)
+    if tenant is None or not tenant.active_leases:
+        return None
+    property_id = tenant.active_leases[0].unit.property_id
+    sections = await asearch_rules([property_id], question)
+    if not sections:
+        return None
+    return property_id, "BUILDING RULES & REGULATIONS (relevant sections):\n" + '\n\n'.join(_format_rule(r) for r in sections) + '\n'
+
+
+def _format_rule(section, with_property=False):
+    title = section.heading or section.get_topic_display()
+    if with_property:
+        title = f"{section.property.name} — {title}"
+    return f"{title}:\n{section.body}"
+
+
+async def _build_tenant_context(tenant, lease, include_rules=True):
+    context = f"TENANT PROFILE:\n"
+    context += f"- Name: {tenant.name}\n"
+    context += f"- Email: {tenant.email}\n"
+    context += f"- Phone: {tenant.phone}\n"
+    context += f"- Nationality: {tenant.nationality}\n"
+
+    if lease:
+        unit = lease.unit
+        context += f"\nLEASE & UNIT:\n"
+        context += f"- Property: {unit.property.name}\n"
+        context += f"- Address: {unit.property.address}\n"
+        context += f"- Unit: {unit.unit_number} ({unit.unit_type})\n"
+        context += f"- Bedrooms: {unit.bedrooms} | Bathrooms: {unit.bathrooms}\n"
+        context += f"- Lease: {lease.start_date} to {lease.end_date}\n"
+        context += f"- Yearly Rent: AED {lease.rent_amount:,.0f}\n"
+        context += f"- Payment Frequency: {lease.get_payment_frequency_display()}\n"
+
+        cheques = [c async for c in lease.cheques.order_by('cheque_date')]
+        if cheques:
+            context += f"\nPAYMENT SCHEDULE:\n"
+            for c in cheques:
+                context += f"- {c.cheque_number}: AED {c.amount:,.0f} | Due: {c.cheque_date} | Status: {c.status}\n"
+
+        # 🆕 Property rules & regulations for chatbot RAG
+        if include_rules and unit.property.rules_and_regulations:
+            context += f"\nBUILDING RULES & REGULATIONS:\n{unit.property.rules_and_regulations}\n"
+
+    tickets = [t async for t in MaintenanceTicket.objects.filter(tenant=tenant).order_by('-created_at')[:10]]
+    if tickets:
+        context += f"\nMAINTENANCE TICKETS:\n"
+        for t in tickets:
+            context += f"- #{t.id}: {t.title} | Priority: {t.priority} | Status: {t.status} | Date: {t.created_at.strftime('%Y-%m-%d')}\n"
+
+    return context
+
+
+# ═══════════════════════════════════════════════════
+# ADMIN CONTEXT
+# ═══════════════════════════════════════════════════
+
+async def get_admin_context(user, question=None):
+    """
+    Build RAG context for an admin/owner/manager user.
+    `user.organization` must already be loaded (select_related) — lazy loads are sync.
+    """
+    org = user.organization if hasattr(user, 'organization') else None
+
+    if not org and not user.is_superuser:
+        return "No organization found for this user."
+
+    if user.is_superuser:
+        scope, org = 'all', None
+    else:
+        scope = f"org:{org.id}"
+
+    topics = sorted({topic for deps in ADMIN_SECTIONS.values() for topic in deps})
+    stored = await cache.aget_many([_version_key(scope, topic) for topic in topics])
+
+    retrieved = None
+    if question and settings.CHAT_RETRIEVAL_ENABLED:
+        retrieved = await _retrieved_records(question, org)
+    sections = RETRIEVAL_SECTIONS if retrieved is not None else ADMIN_SECTIONS
+
+    parts = [f"ORGANIZATION: {org.name if org else 'All Organizations'}\n"]
+    for section in sections:
+        parts.append(await _admin_section(scope, org, section, stored))
+    if retrieved is not None:
+        parts.append(retrieved)
+    if question:
+        parts.append(await _relevant_rules(question, org))
+    return ''.join(parts)
+
+
+async def admin_section(org, section):
+    """One cached admin context section for `org` (None: all organizations)."""
+    scope = 'all' if org is None else f"org:{org.id}"
+    stored = await cache.aget_many([_version_key(scope, topic) for topic in ADMIN_SECTIONS[section]])
+    return await _admin_section(scope, org, section, stored)
+
+
+async def _admin_section(scope, org, section, stored):
+    versions = '.'.join(str(stored.get(_version_key(scope, topic), 1)) for topic in ADMIN_SECTIONS[section])
+    builder = SECTION_BUILDERS[section]
+    return await _cached(f"chatctx:{scope}:{section}:{versions}", lambda: builder(_querysets(org)))
+
+
+async def _relevant_rules(question, org):
+    """Rule sections across the portfolio that match the question."""
+    properties = Property.objects.all() if org is None else Property.objects.filter(organization=org)
+    try:
+        sections = await asearch_rules(properties.values('id'), question, limit=5)
+    except Exception as e:
+        logger.warning("Rules retrieval failed: %s", e)
+        return ''
+    if not sections:
+        return ''
+    return "\nBUILDING RULES (relevant sections):\n" + '\n\n'.join(_format_rule(r, with_property=True) for r in sections) + '\n'
+
+
+async def _retrieved_records(question, org):
+    """Top-k records for the question (None if retrieval is unavailable or the index is still empty)."""
+    try:
+        documents = await aretrieve(question, organization_id=org.id if org else None)
+    except Exception as e:
+        logger.warning("Context retrieval failed, sending full listings: %s", e)
+        return None
+    if not documents:
+        return None
+    context = f"\nRECORDS RELEVANT TO THE QUESTION:\n"
+    for d in documents:
+        context += f"- {d.content}\n"
+    return context
+
+
+def _querysets(org):
+    if org is None:
+        return {
+            'properties': Property.objects.all(),
+            'units': Unit.objects.all(),
+            'tenants': Tenant.objects.all(),
+            'cheques': Cheque.objects.all(),
+            'tickets': MaintenanceTicket.objects.all(),
+        }
+    return {
+        'properties': Property.objects.filter(organization=org),
+        'units': Unit.objects.filter(organization=org),
+        'tenants': Tenant.objects.filter(organization=org),
+        'cheques': Cheque.objects.filter(organization=org),
+        'tickets': MaintenanceTicket.objects.filter(organization=org),
+    }
+
+
+async def _summary_section(qs):
+    unit_stats = await qs['units'].aaggregate(
+        total=Count('id'),
+        occupied=Count('id', filter=Q(status='OCCUPIED')),
+        vacant=Count('id', filter=Q(status='VACANT')),
+    )
+    cheque_stats = await qs['cheques'].aaggregate(
+        revenue=Sum('amount', filter=Q(status='CLEARED')),
+        pending=Sum('amount', filter=Q(status='PENDING')),
+        bounced=Count('id', filter=Q(status='BOUNCED')),
+    )
+    total_units = unit_stats['total']
+    occupancy_rate = round((unit_stats['occupied'] / total_units * 100), 1) if total_units > 0 else 0
+
+    context = f"\nPROPERTY PORTFOLIO:\n"
+    context += f"- Total Properties: {await qs['properties'].acount()}\n"
+    context += f"- Total Units: {total_units} (Occupied: {unit_stats['occupied']}, Vacant: {unit_stats['vacant']})\n"
+    context += f"- Occupancy Rate: {occupancy_rate}%\n"
+    context += f"- Active Tenants: {await qs['tenants'].acount()}\n"
+
+    context += f"\nFINANCIAL SUMMARY:\n"
+    context += f"- Revenue Collected: AED {cheque_stats['revenue'] or 0:,.0f}\n"
+    context += f"- Pending Payments: AED {cheque_stats['pending'] or 0:,.0f}\n"
+    context += f"- Bounced Cheques: {cheque_stats['bounced']}\n"
+    return context
+
+
+async def _properties_section(qs):
+    properties = qs['properties'].annotate(
+        unit_count=Count('units'),
+        vacant_count=Count('units', filter=Q(units__status='VACANT')),
+    )
+    context = f"\nPROPERTIES:\n"
+    async for p in properties:
+        context += f"- {p.name} ({p.property_type}) — {p.address} | Units: {p.unit_count} (Vacant: {p.vacant_count})\n"
+    return context
+
+
+async def _units_section(qs):
+    units = [u async for u in qs['units'].select_related('property').order_by('property__name', 'unit_number')[:MAX_UNITS + 1]]
+    context = f"\nUNITS:\n"
+    for u in units[:MAX_UNITS]:
+        context += f"- {u.property.name} / Unit {u.unit_number} ({u.unit_type}) | Rent: AED {u.yearly_rent:,.0f} | Status: {u.status}\n"
+    if len(units) > MAX_UNITS:
+        context += f"- ... more units not listed (see the portfolio totals above)\n"
+    return context
+
+
+async def _tenants_section(qs):
+    tenants = qs['tenants'].order_by('-created_at').prefetch_related(Prefetch(
+        'leases',
+        queryset=Lease.objects.filter(is_active=True).select_related('unit'),
+        to_attr='active_leases',
+    ))[:MAX_TENANTS]
+    context = f"\nTENANTS:\n"
+    async for t in tenants:
+        active_lease = t.active_leases[0] if t.active_leases else None
+        unit_info = f"Unit {active_lease.unit.unit_number}" if active_lease else "No active lease"
+        context += f"- {t.name} ({t.email}) | {unit_info}\n"
+    return context
+
+
+async def _tickets_section(qs):
+    context = f"\nRECENT MAINTENANCE TICKETS:\n"
+    async for t in qs['tickets'].select_related('unit').order_by('-created_at')[:MAX_TICKETS]:
+        context += f"- #{t.id}: {t.title} | Unit: {t.unit.unit_number if t.unit else 'N/A'} | Priority: {t.priority} | Status: {t.status}\n"
+    return context
+
+
+async def _cheques_section(qs):
+    context = f"\nCHEQUES (Recent):\n"
+    async for c in qs['cheques'].select_related('tenant').order_by('-cheque_date')[:MAX_CHEQUES]:
+        context += f"- {c.cheque_number}: AED {c.amount:,.0f} | Tenant: {c.tenant.name if c.tenant else 'N/A'} | Due: {c.cheque_date} | Status: {c.status}\n"
+    return context
+
+
+SECTION_BUILDERS = {
+    'summary': _summary_section,
+    'properties': _properties_section,
+    'units': _units_section,
+    'tenants': _tenants_section,
+    'tickets': _tickets_section,
+    'cheques': _cheques_section,
+}
@@ -0,0 +1,140 @@
+"""
+Buffered ChatLog writer.
+
+The chat view only appends the row to an in-process buffer; a background
+thread writes the buffer with one bulk_create every CHAT_LOG_FLUSH_INTERVAL
+seconds, or as soon as CHAT_LOG_BATCH_SIZE rows are waiting. The buffer is
+also flushed when the process exits. Each web process (uvicorn worker) has
+its own writer.
+
+Logs are analytics, not records: if the process is killed hard, up to one
+interval's worth of rows is lost, and a failed flush is logged and dropped
+rather than retried forever.
+
+rollup_old_logs() is the retention side: logs older than
+CHAT_LOG_RETENTION_DAYS are folded into ChatDailyStat rows and deleted.
+"""
+
+import atexit
+import logging
+import threading
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, Max, Q
+from django.utils import timezone
+
+from .models import ChatDailyStat, ChatLog
+
+logger = logging.getLogger(__name__)
+
+
+class ChatLogWriter:
+    def __init__(self):
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.written = 0
+        self.dropped = 0
+
+    def write(self, log):
+        """Queue an unsaved ChatLog. Never touches the database, safe to call from async code."""
+        with self._lock:
+            if len(self._buffer) >= settings.CHAT_LOG_MAX_BUFFER:
+                self.dropped += 1
+                return
+            self._buffer.append(log)
+            pending = len(self._buffer)
+            if self._thread is None:
+                self._start()
+        if pending >= settings.CHAT_LOG_BATCH_SIZE:
+            self._wake.set()
+
+    def flush(self):
+        """Write everything buffered so far. Returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                return 0
+            try:
+                ChatLog.objects.bulk_create(batch, batch_size=settings.CHAT_LOG_BATCH_SIZE)
+            except Exception:
+                self.dropped += len(batch)
+                logger.exception("Dropped %d chat logs", len(batch))
+                return 0
+            self.written += len(batch)
+            return len(batch)
+
+    def pending(self):
+        with self._lock:
+            return len(self._buffer)
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name='chatlog-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wake.wait(settings.CHAT_LOG_FLUSH_INTERVAL)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Chat log flush failed")
+            finally:
+                # Drop the thread's connection once it's past CONN_MAX_AGE (or broken)
+                close_old_connections()
+
+
+chat_log_writer = ChatLogWriter()
+
+
+def rollup_old_logs(retention_days=None):
+    """
+    Fold ChatLog rows from before the retention window into ChatDailyStat, one
+    day per transaction, and delete them. Returns (days, logs) processed.
+    """
+    if retention_days is None:
+        retention_days = settings.CHAT_LOG_RETENTION_DAYS
+    cutoff = timezone.make_aware(datetime.combine(timezone.localdate() - timedelta(days=retention_days), time.min))
+
+    days = logs = 0
+    while True:
+        oldest = ChatLog.objects.filter(timestamp__lt=cutoff).order_by('timestamp').values_list('timestamp', flat=True).first()
+        if oldest is None:
+            return days, logs
+        day = timezone.localdate(oldest)
+        start = timezone.make_aware(datetime.combine(day, time.min))
+        end = min(start + timedelta(days=1), cutoff)
+        logs += _rollup_day(day, start, end)
+        days += 1
+
+
+def _rollup_day(day, start, end):
+    with transaction.atomic():
+        rows = ChatLog.objects.filter(timestamp__gte=start, timestamp__lt=end)
+        # Rows the writer flushes from now on are left for the next run
+        last_id = rows.aggregate(last=Max('id'))['last']
+        rows = rows.filter(id__lte=last_id)
+        totals = rows.values('organization_id').annotate(
+            chats=Count('id'),
+            cache_hits=Count('id', filter=Q(cache_hit=True)),
+            users=Count('user_id', distinct=True),
+            conversations=Count('conversation_id', distinct=True),
+        )
+        for row in totals:
+            counts = {field: row[field] for field in ('chats', 'cache_hits', 'users', 'conversations')}
+            # A day is normally rolled up once; late rows are added on top
+            # (users/conversations may then count someone twice).
+            updated = ChatDailyStat.objects.filter(organization_id=row['organization_id'], date=day).update(
+                **{field: F(field) + value for field, value in counts.items()}
+            )
+            if not updated:
+                ChatDailyStat.objects.create(organization_id=row['organization_id'], date=day, **counts)
+        deleted, _ = rows.delete()
+    return deleted
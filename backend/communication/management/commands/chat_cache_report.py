@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from communication.answer_cache import purge_expired
+from communication.models import CachedAnswer, ChatDailyStat, ChatLog
+
+
+class Command(BaseCommand):
+    help = "Chatbot answer-cache hit rate per day (from ChatLog / ChatDailyStat) and cache contents."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7)
+        parser.add_argument('--organization', type=int, help="Only this organization's chats.")
+        parser.add_argument('--purge', action='store_true', help="Delete expired cached answers first.")
+
+    def handle(self, *args, **options):
+        if options['purge']:
+            self.stdout.write(f"Purged {purge_expired()} expired answers.")
+
+        since = timezone.now() - timedelta(days=options['days'])
+        logs = ChatLog.objects.filter(timestamp__gte=since)
+        stats = ChatDailyStat.objects.filter(date__gte=timezone.localdate(since))
+        if options['organization']:
+            logs = logs.filter(organization_id=options['organization'])
+            stats = stats.filter(organization_id=options['organization'])
+
+        # Days past the retention window only survive as rolled-up stats
+        daily = {}
+        for row in stats.values('date').annotate(total=Sum('chats'), hits=Sum('cache_hits')):
+            daily[row['date']] = [row['total'], row['hits']]
+        for row in (
+            logs.annotate(day=TruncDate('timestamp'))
+            .values('day')
+            .annotate(total=Count('id'), hits=Count('id', filter=Q(cache_hit=True)))
+        ):
+            day = daily.setdefault(row['day'], [0, 0])
+            day[0] += row['total']
+            day[1] += row['hits']
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Answer cache hit rate (last {options['days']} days)"))
+        total = hits = 0
+        for day, (day_total, day_hits) in sorted(daily.items()):
+            total += day_total
+            hits += day_hits
+            self.stdout.write(f"  {day}  {day_hits:>6} / {day_total:<6} {_rate(day_hits, day_total)}")
+        self.stdout.write(f"  {'overall':<10}  {hits:>6} / {total:<6} {_rate(hits, total)}")
+
+        live = CachedAnswer.objects.filter(expires_at__gt=timezone.now())
+        stats = live.aggregate(entries=Count('id'), hits=Sum('hits'), scopes=Count('scope', distinct=True))
+        self.stdout.write(self.style.MIGRATE_HEADING("Cache contents"))
+        self.stdout.write(f"  {stats['entries']} live answers in {stats['scopes']} scopes, {stats['hits'] or 0} hits served")
+        for entry in live.order_by('-hits')[:10]:
+            self.stdout.write(f"  {entry.hits:>5}  {entry.question[:70]}")
+
+
+def _rate(hits, total):
+    return f"{hits / total * 100:5.1f}%" if total else "    -"
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Organization
+from communication.retrieval import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Re-embed all portfolio records used for chatbot retrieval (run after changing AI_EMBEDDER)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', type=int, help="Only rebuild this organization's documents.")
+
+    def handle(self, *args, **options):
+        organization = None
+        if options['organization']:
+            try:
+                organization = Organization.objects.get(id=options['organization'])
+            except Organization.DoesNotExist:
+                raise CommandError(f"Organization {options['organization']} not found.")
+
+        totals = rebuild_index(organization)
+        for source_type, count in totals.items():
+            self.stdout.write(f"{source_type}: {count} documents")
+        self.stdout.write(self.style.SUCCESS(f"Indexed {sum(totals.values())} documents."))
@@ -0,0 +1,113 @@
+"""
+Server-side chat memory.
+
+Each turn is stored as ChatMessage rows on a Conversation. The prompt sent to
+the LLM carries the cached system prompt, the conversation's rolling summary
+and only the last CHAT_RECENT_MESSAGES messages. Once more than
+CHAT_SUMMARIZE_AFTER messages are unsummarized, tasks.summarize_conversation
+folds the older ones into the summary in the background.
+"""
+
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+import ai
+from .context import _find_tenant
+from .models import ChatMessage, Conversation
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT_TTL = 60 * 60 * 24
+SUMMARY_MAX_TOKENS = 300
+
+SUMMARY_INSTRUCTIONS = """You maintain the running memory of a chat between a property management assistant and a user.
+Merge the previous summary and the new messages into one short summary (max 150 words).
+Keep facts the user shared (names, units, dates, amounts, issues reported), open requests and decisions.
+Drop greetings and small talk. Write plain sentences, no headings."""
+
+
+async def get_conversation(user, conversation_id):
+    """The user's conversation with that id, or None."""
+    return await Conversation.objects.filter(id=conversation_id, user=user).afirst()
+
+
+async def start_conversation(user):
+    organization_id = getattr(user, 'organization_id', None)
+    if organization_id is None and not user.is_superuser:
+        # Tenant: the organization managing their building
+        tenant = await _find_tenant(user)
+        if tenant is not None and tenant.active_leases:
+            organization_id = tenant.active_leases[0].unit.property.organization_id
+    return await Conversation.objects.acreate(user=user, organization_id=organization_id)
+
+
+async def cached_system_prompt(conversation, build):
+    """The conversation's static system prompt, rendered once by `build()`."""
+    key = f"chatprompt:{conversation.id}"
+    prompt = await cache.aget(key)
+    if prompt is None:
+        prompt = build()
+        await cache.aset(key, prompt, SYSTEM_PROMPT_TTL)
+    return prompt
+
+
+async def memory_messages(conversation):
+    """The rolling summary (as a system message) plus the most recent turns, oldest first."""
+    messages = []
+    if conversation.summary:
+        messages.append({"role": "system", "content": f"EARLIER IN THIS CONVERSATION (summary):\n{conversation.summary}"})
+
+    recent = [
+        m async for m in conversation.messages
+        .filter(id__gt=conversation.summarized_through)
+        .order_by('-id')[:settings.CHAT_RECENT_MESSAGES]
+    ]
+    messages += [{"role": m.role, "content": m.content} for m in reversed(recent)]
+    return messages
+
+
+async def record_turn(conversation, message, answer):
+    """Store the exchange; schedule summarization once enough turns have piled up."""
+    await ChatMessage.objects.abulk_create([
+        ChatMessage(conversation=conversation, role='user', content=message),
+        ChatMessage(conversation=conversation, role='assistant', content=answer),
+    ])
+    await conversation.asave(update_fields=['updated_at'])
+
+    pending = await conversation.messages.filter(id__gt=conversation.summarized_through).acount()
+    if pending > settings.CHAT_SUMMARIZE_AFTER:
+        from .tasks import summarize_conversation
+        try:
+            await sync_to_async(summarize_conversation.delay)(conversation.id)
+        except Exception as e:
+            logger.warning("Could not schedule summary for conversation %s: %s", conversation.id, e)
+
+
+def summarize(conversation_id):
+    """
+    Fold all but the last CHAT_RECENT_MESSAGES unsummarized messages into the
+    summary. Returns the number of messages folded.
+    """
+    conversation = Conversation.objects.filter(id=conversation_id).first()
+    if conversation is None:
+        return 0
+
+    pending = list(conversation.messages.filter(id__gt=conversation.summarized_through).order_by('id'))
+    to_fold = pending[:-settings.CHAT_RECENT_MESSAGES] if settings.CHAT_RECENT_MESSAGES else pending
+    if not to_fold:
+        return 0
+
+    transcript = '\n'.join(f"{m.role.upper()}: {m.content}" for m in to_fold)
+    summary = ai.chat_completion([
+        {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+        {"role": "user", "content": f"PREVIOUS SUMMARY:\n{conversation.summary or '(none)'}\n\nNEW MESSAGES:\n{transcript}"},
+    ], temperature=0.2, max_tokens=SUMMARY_MAX_TOKENS, task='summary')
+
+    # Only apply if nobody else summarized in the meantime
+    updated = Conversation.objects.filter(
+        id=conversation.id, summarized_through=conversation.summarized_through,
+    ).update(summary=summary.strip(), summarized_through=to_fold[-1].id)
+    return len(to_fold) if updated else 0
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:10
+
+import django.db.models.deletion
+import pgvector.django
+import pgvector.django.indexes
+import pgvector.django.vector
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communication', '0002_initial'),
+        ('core', '0004_user_managed_property'),
+        ('properties', '0003_property_rules_and_regulations'),
+        ('tenants', '0005_tenant_user'),
+    ]
+
+    operations = [
+        pgvector.django.VectorExtension(),
+        migrations.CreateModel(
+            name='ContextDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_type', models.CharField(choices=[('UNIT', 'Unit'), ('TENANT', 'Tenant'), ('LEASE', 'Lease'), ('TICKET', 'Maintenance Ticket'), ('CHEQUE', 'Cheque'), ('RULES', 'Building Rules')], max_length=20)),
+                ('source_id', models.PositiveBigIntegerField()),
+                ('chunk', models.PositiveIntegerField(default=0)),
+                ('content', models.TextField()),
+                ('embedding', pgvector.django.vector.VectorField(dimensions=256)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='context_documents', to='core.organization')),
+                ('property', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='properties.property')),
+                ('tenant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='tenants.tenant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['organization', 'source_type'], name='communicati_organiz_b8a9ea_idx'), pgvector.django.indexes.HnswIndex(ef_construction=64, fields=['embedding'], m=16, name='context_embedding_hnsw', opclasses=['vector_cosine_ops'])],
+                'constraints': [models.UniqueConstraint(fields=('source_type', 'source_id', 'chunk'), name='unique_context_chunk')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:25
+
+import pgvector.django.vector
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communication', '0004_conversation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatlog',
+            name='cache_hit',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='CachedAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=255)),
+                ('question', models.TextField()),
+                ('normalized', models.CharField(max_length=500)),
+                ('embedding', pgvector.django.vector.VectorField(dimensions=256)),
+                ('answer', models.TextField()),
+                ('action', models.JSONField(blank=True, null=True)),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['scope', 'normalized'], name='communicati_scope_c2c1b6_idx'), models.Index(fields=['expires_at'], name='communicati_expires_a2a94b_idx')],
+            },
+        ),
+    ]
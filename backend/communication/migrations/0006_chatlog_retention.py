@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:29
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_log_users(apps, schema_editor):
+    ChatLog = apps.get_model('communication', 'ChatLog')
+    Conversation = apps.get_model('communication', 'Conversation')
+    ChatLog.objects.filter(user__isnull=True, conversation__isnull=False).update(
+        user=models.Subquery(Conversation.objects.filter(id=models.OuterRef('conversation_id')).values('user_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communication', '0005_cachedanswer'),
+        ('core', '0004_user_managed_property'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('chats', models.PositiveIntegerField(default=0)),
+                ('cache_hits', models.PositiveIntegerField(default=0)),
+                ('users', models.PositiveIntegerField(default=0)),
+                ('conversations', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='chatlog',
+            name='response_compressed',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='chatlog',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='chat_logs', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='chatlog',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='core.organization'),
+        ),
+        migrations.AlterField(
+            model_name='chatlog',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='chatlog',
+            index=models.Index(fields=['organization', 'timestamp'], name='communicati_organiz_2099b5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='chatlog',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['timestamp'], name='chatlog_timestamp_brin'),
+        ),
+        migrations.AddField(
+            model_name='chatdailystat',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.organization'),
+        ),
+        migrations.AddConstraint(
+            model_name='chatdailystat',
+            constraint=models.UniqueConstraint(fields=('organization', 'date'), name='unique_chat_daily_stat'),
+        ),
+        migrations.RunPython(backfill_log_users, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:26
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communication', '0006_chatlog_retention'),
+        ('core', '0005_requestprofile'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('PAYMENT_DUE', 'Payment due'), ('PAYMENT_CLEARED', 'Payment received'), ('BOUNCED', 'Cheque bounced'), ('CHEQUE_UPDATE', 'Cheque status update'), ('TICKET_NEW', 'New maintenance ticket'), ('TICKET_ASSIGNED', 'Ticket assigned'), ('MAINTENANCE_UPDATE', 'Maintenance in progress'), ('MAINTENANCE_RESOLVED', 'Maintenance resolved')], max_length=30)),
+                ('severity', models.CharField(choices=[('EMERGENCY', 'Emergency'), ('HIGH', 'High'), ('MEDIUM', 'Medium'), ('LOW', 'Low')], default='MEDIUM', max_length=10)),
+                ('title', models.CharField(max_length=200)),
+                ('message', models.CharField(blank=True, max_length=500)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('dedupe_key', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('read_at', models.DateTimeField(blank=True, null=True)),
+                ('organization', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.organization')),
+                ('recipient', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['recipient', '-created_at', '-id'], name='notification_feed'), models.Index(condition=models.Q(('read_at__isnull', True)), fields=['recipient'], name='notification_unread'), django.contrib.postgres.indexes.BrinIndex(fields=['created_at'], name='notification_created_brin')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('dedupe_key', ''), _negated=True), fields=('recipient', 'dedupe_key'), name='unique_notification_dedupe')],
+            },
+        ),
+    ]
@@ -1,13 +1,246 @@
+import zlib
+
+from django.contrib.postgres.indexes import BrinIndex
 from django.db import models
+from django.utils import timezone
+from pgvector.django import HnswIndex, VectorField
+
+from ai.embeddings import EMBEDDING_DIMENSIONS
+
+class Conversation(models.Model):
+    """
+    A chat session kept server-side. The client only sends its id with each new
+    message; older turns are folded into `summary` (see tasks.summarize_conversation)
+    so the prompt sent to the LLM stays bounded however long the chat gets.
+    """
+    user = models.ForeignKey('core.User', on_delete=models.CASCADE, related_name='conversations')
+    organization = models.ForeignKey('core.Organization', on_delete=models.SET_NULL, null=True, blank=True, related_name='conversations')
+    # Rolling memory of everything up to and including message `summarized_through`
+    summary = models.TextField(blank=True)
+    summarized_through = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-updated_at']
+
+    def __str__(self):
+        return f"Conversation #{self.id} ({self.user})"
+
+
+class ChatMessage(models.Model):
+    ROLE_CHOICES = [
+        ('user', 'User'),
+        ('assistant', 'Assistant'),
+    ]
+
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='messages')
+    role = models.CharField(max_length=10, choices=ROLE_CHOICES)
+    content = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.role}: {self.content[:50]}"
+
 
 class ChatLog(models.Model):
     """
     Stores history of AI conversations for analytics.
+
+    Rows are written in batches by communication/logwriter.py, not in the
+    request. The full answer is kept zlib-compressed in `response_compressed`
+    (read it through `full_response`); `ai_response` is a short preview for
+    the admin. Logs older than CHAT_LOG_RETENTION_DAYS are folded into
+    ChatDailyStat and deleted (tasks.rollup_chat_logs).
     """
-    organization = models.ForeignKey('core.Organization', on_delete=models.CASCADE)
+    PREVIEW_LENGTH = 500
+
+    # Tenants have no organization of their own; theirs is their building's
+    organization = models.ForeignKey('core.Organization', on_delete=models.CASCADE, null=True, blank=True)
+    user = models.ForeignKey('core.User', on_delete=models.SET_NULL, null=True, blank=True, related_name='chat_logs')
+    conversation = models.ForeignKey(Conversation, on_delete=models.SET_NULL, null=True, blank=True, related_name='logs')
     user_message = models.TextField()
     ai_response = models.TextField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    response_compressed = models.BinaryField(null=True, blank=True)
+    # Answered from the semantic answer cache (CachedAnswer) instead of the LLM
+    cache_hit = models.BooleanField(default=False)
+    timestamp = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['organization', 'timestamp']),
+            # Append-only, so timestamp follows the physical order: a BRIN index
+            # is a few pages and serves the retention job's range scans.
+            BrinIndex(fields=['timestamp'], name='chatlog_timestamp_brin'),
+        ]
+
+    def __str__(self):
+        return f"Chat at {self.timestamp}"
+
+    @classmethod
+    def build(cls, *, response, **fields):
+        """Unsaved log row with the response stored compressed."""
+        return cls(
+            ai_response=response[:cls.PREVIEW_LENGTH],
+            response_compressed=zlib.compress(response.encode('utf-8')),
+            **fields,
+        )
+
+    @property
+    def full_response(self):
+        if self.response_compressed is None:
+            return self.ai_response
+        return zlib.decompress(bytes(self.response_compressed)).decode('utf-8')
+
+
+class ChatDailyStat(models.Model):
+    """Per-organization daily chat totals, kept after the raw ChatLog rows are deleted."""
+    organization = models.ForeignKey('core.Organization', on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    date = models.DateField()
+    chats = models.PositiveIntegerField(default=0)
+    cache_hits = models.PositiveIntegerField(default=0)
+    users = models.PositiveIntegerField(default=0)
+    conversations = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['organization', 'date'], name='unique_chat_daily_stat'),
+        ]
+
+    def __str__(self):
+        return f"{self.date}: {self.chats} chats"
+
+
+class CachedAnswer(models.Model):
+    """
+    A chatbot answer reusable for the same (or a paraphrased) question while
+    the data it was built from is unchanged. `scope` embeds the context version
+    counters (see answer_cache.fingerprint), so any change to the tenant's lease,
+    cheques or building rules moves new questions to a fresh scope; stale rows
+    simply expire.
+    """
+    scope = models.CharField(max_length=255)
+    question = models.TextField()
+    normalized = models.CharField(max_length=500)
+    embedding = VectorField(dimensions=EMBEDDING_DIMENSIONS)
+    answer = models.TextField()
+    action = models.JSONField(null=True, blank=True)
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        # Lookups are always within one scope (a handful of rows), so a btree
+        # on scope beats an ANN index that would post-filter by scope.
+        indexes = [
+            models.Index(fields=['scope', 'normalized']),
+            models.Index(fields=['expires_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.scope}: {self.question[:50]}"
+
+class ContextDocument(models.Model):
+    """
+    One embedded chunk of portfolio data (a unit, tenant, lease, ticket, cheque
+    or a piece of a property's rules) for vector retrieval by the chatbot.
+    Kept in sync by communication/signals.py → communication/tasks.py.
+    """
+    SOURCE_CHOICES = [
+        ('UNIT', 'Unit'),
+        ('TENANT', 'Tenant'),
+        ('LEASE', 'Lease'),
+        ('TICKET', 'Maintenance Ticket'),
+        ('CHEQUE', 'Cheque'),
+        ('RULES', 'Building Rules'),
+    ]
+
+    organization = models.ForeignKey('core.Organization', on_delete=models.CASCADE, related_name='context_documents')
+    # Scoping for tenant users: their own records + their building's rules
+    property = models.ForeignKey('properties.Property', on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    tenant = models.ForeignKey('tenants.Tenant', on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+
+    source_type = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    source_id = models.PositiveBigIntegerField()
+    chunk = models.PositiveIntegerField(default=0)
+
+    content = models.TextField()
+    embedding = VectorField(dimensions=EMBEDDING_DIMENSIONS)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['source_type', 'source_id', 'chunk'], name='unique_context_chunk'),
+        ]
+        indexes = [
+            models.Index(fields=['organization', 'source_type']),
+            HnswIndex(
+                name='context_embedding_hnsw',
+                fields=['embedding'],
+                m=16,
+                ef_construction=64,
+                opclasses=['vector_cosine_ops'],
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.source_type} #{self.source_id} [{self.chunk}]"
+
+
+class Notification(models.Model):
+    """
+    One message in a user's feed. Written in bulk by the daily payment-due job
+    and by signals on cheque and ticket changes (notifications.py); read newest
+    first per recipient.
+    """
+    KIND_CHOICES = [
+        ('PAYMENT_DUE', 'Payment due'),
+        ('PAYMENT_CLEARED', 'Payment received'),
+        ('BOUNCED', 'Cheque bounced'),
+        ('CHEQUE_UPDATE', 'Cheque status update'),
+        ('TICKET_NEW', 'New maintenance ticket'),
+        ('TICKET_ASSIGNED', 'Ticket assigned'),
+        ('MAINTENANCE_UPDATE', 'Maintenance in progress'),
+        ('MAINTENANCE_RESOLVED', 'Maintenance resolved'),
+    ]
+    SEVERITY_CHOICES = [
+        ('EMERGENCY', 'Emergency'),
+        ('HIGH', 'High'),
+        ('MEDIUM', 'Medium'),
+        ('LOW', 'Low'),
+    ]
+
+    recipient = models.ForeignKey('core.User', on_delete=models.CASCADE, related_name='notifications', db_index=False)
+    organization = models.ForeignKey('core.Organization', on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    severity = models.CharField(max_length=10, choices=SEVERITY_CHOICES, default='MEDIUM')
+    title = models.CharField(max_length=200)
+    message = models.CharField(max_length=500, blank=True)
+    # Ids of what it is about (cheque_id, ticket_id) and its date, for the client to link to
+    data = models.JSONField(default=dict, blank=True)
+    # Set by jobs that may run again over the same records; one notification per recipient and key
+    dedupe_key = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recipient', 'dedupe_key'], name='unique_notification_dedupe',
+                condition=~models.Q(dedupe_key=''),
+            ),
+        ]
+        indexes = [
+            # The feed: one recipient, newest first
+            models.Index(fields=['recipient', '-created_at', '-id'], name='notification_feed'),
+            # Unread badge counts
+            models.Index(fields=['recipient'], name='notification_unread', condition=models.Q(read_at__isnull=True)),
+            # Retention job's range scans (append-only, so time follows the physical order)
+            BrinIndex(fields=['created_at'], name='notification_created_brin'),
+        ]
 
     def __str__(self):
-        return f"Chat at {self.timestamp}"
\ No newline at end of file
+        return f"{self.recipient_id}: {self.title}"
@@ -0,0 +1,294 @@
+"""
+Notification feed: stored per recipient, written when things happen, so
+reading a feed is one index range scan (recipient, newest first).
+
+Writers, each one bulk insert per run / batch:
+
+  - notify_payments_due()     daily (tasks.py): tenants with a PENDING cheque
+                              dated in the next PAYMENT_DUE_NOTICE_DAYS, and a
+                              digest for each organization's owner and finance
+                              staff. Keyed (dedupe_key), so re-runs add nothing.
+  - cheques_transitioned      batch status moves (finance/lifecycle.py):
+                              tenants of cleared / bounced cheques, and one
+                              summary per batch for owner and finance staff.
+  - ChequeTransition saved    single edits (admin, API): the tenant, and staff
+                              when it bounced.
+  - MaintenanceTicket saved   new tickets → owner and the property's manager;
+                              assignment → the technician; in progress /
+                              resolved → the tenant.
+
+Notifications go to users; tenants without a login get none. The tenant
+app's alerts (/api/me/) are still computed live from the tenant's cheques and
+tickets until it reads this feed.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Q, Sum
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.models import Organization, User
+from finance.lifecycle import cheques_transitioned
+from finance.models import Cheque, ChequeTransition
+from maintenance.models import MaintenanceTicket
+from properties.models import Unit
+from .models import Notification
+from .realtime import publish_notifications
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 2000
+
+FINANCE_ROLES = ('OWNER', 'FINANCE')
+
+def _insert(notifications):
+    """
+    Bulk insert, leaving out rows whose (recipient, dedupe_key) is already
+    stored; recipients online hear of the new ones. Returns rows inserted.
+    """
+    keyed = [n for n in notifications if n.dedupe_key]
+    if keyed:
+        stored = set(Notification.objects.filter(
+            recipient_id__in={n.recipient_id for n in keyed}, dedupe_key__in={n.dedupe_key for n in keyed},
+        ).values_list('recipient_id', 'dedupe_key'))
+        notifications = [n for n in notifications if (n.recipient_id, n.dedupe_key) not in stored]
+    # ignore_conflicts still covers a concurrent run inserting the same keys
+    Notification.objects.bulk_create(notifications, batch_size=BATCH_SIZE, ignore_conflicts=True)
+    publish_notifications(notifications)
+    return len(notifications)
+
+
+def _staff(org_ids, roles):
+    """{organization id: user ids} — the owner plus active staff with one of `roles`."""
+    staff = defaultdict(set)
+    for org_id, owner_id in Organization.objects.filter(id__in=org_ids).values_list('id', 'owner_id'):
+        staff[org_id].add(owner_id)
+    users = User.objects.filter(organization_id__in=org_ids, role__in=roles, is_active=True)
+    for org_id, user_id in users.values_list('organization_id', 'id'):
+        staff[org_id].add(user_id)
+    return staff
+
+
+def _plural(count, word):
+    return f"{count} {word}{'s' if count != 1 else ''}"
+
+
+# ═══════════════════════════════════════════════════
+# DAILY: PAYMENTS DUE
+# ═══════════════════════════════════════════════════
+
+def notify_payments_due(today=None):
+    """Notify tenants of PENDING cheques coming due, and staff with a daily digest. Returns rows inserted."""
+    today = today or timezone.localdate()
+    horizon = today + timedelta(days=settings.PAYMENT_DUE_NOTICE_DAYS)
+    due = Cheque.objects.filter(status='PENDING', cheque_date__range=(today, horizon)).order_by()
+
+    count = 0
+    batch = []
+    rows = due.filter(tenant__user__isnull=False).values_list(
+        'id', 'organization_id', 'cheque_number', 'amount', 'cheque_date', 'tenant__user_id',
+    )
+    for cheque_id, org_id, number, amount, cheque_date, user_id in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(Notification(
+            recipient_id=user_id, organization_id=org_id, kind='PAYMENT_DUE', severity='HIGH',
+            title=f"Payment due on {cheque_date:%d %b}",
+            message=f"AED {amount:,.0f} — Cheque #{number}",
+            data={'cheque_id': cheque_id, 'date': str(cheque_date)},
+            dedupe_key=f"due:{cheque_id}:{cheque_date}",
+        ))
+        if len(batch) >= BATCH_SIZE:
+            count += _insert(batch)
+            batch = []
+
+    totals = list(due.exclude(organization=None).values('organization_id').annotate(cheques=Count('id'), amount=Sum('amount')))
+    staff = _staff([row['organization_id'] for row in totals], FINANCE_ROLES)
+    for row in totals:
+        org_id = row['organization_id']
+        batch += [
+            Notification(
+                recipient_id=user_id, organization_id=org_id, kind='PAYMENT_DUE', severity='MEDIUM',
+                title=f"{_plural(row['cheques'], 'cheque')} due by {horizon:%d %b}",
+                message=f"AED {row['amount']:,.0f} in PENDING cheques",
+                data={'date': str(horizon)},
+                dedupe_key=f"due-digest:{org_id}:{today}",
+            )
+            for user_id in staff[org_id]
+        ]
+    count += _insert(batch)
+    logger.info("Stored %d payment-due notifications for %d organizations", count, len(totals))
+    return count
+
+
+def purge_old(days=None):
+    """Delete notifications older than NOTIFICATION_RETENTION_DAYS. Returns rows deleted."""
+    cutoff = timezone.now() - timedelta(days=days or settings.NOTIFICATION_RETENTION_DAYS)
+    deleted, _ = Notification.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+# ═══════════════════════════════════════════════════
+# CHEQUES
+# ═══════════════════════════════════════════════════
+
+def _tenant_cheque_notifications(cheque_ids, to_status):
+    """Notifications for the tenants (with a login) of cheques that just CLEARED or BOUNCED."""
+    if to_status not in ('CLEARED', 'BOUNCED'):
+        return []
+    rows = Cheque.objects.filter(id__in=cheque_ids, tenant__user__isnull=False).values_list(
+        'id', 'organization_id', 'cheque_number', 'amount', 'cheque_date', 'tenant__user_id',
+    )
+    bounced = to_status == 'BOUNCED'
+    return [
+        Notification(
+            recipient_id=user_id, organization_id=org_id,
+            kind='BOUNCED' if bounced else 'PAYMENT_CLEARED',
+            severity='EMERGENCY' if bounced else 'LOW',
+            title="Cheque Bounced — Action Required" if bounced else "Payment received",
+            message=f"AED {amount:,.0f} — Cheque #{number}",
+            data={'cheque_id': cheque_id, 'date': str(cheque_date)},
+        )
+        for cheque_id, org_id, number, amount, cheque_date, user_id in rows.iterator(chunk_size=BATCH_SIZE)
+    ]
+
+
+@receiver(cheques_transitioned)
+def notify_cheque_batch(sender, organization_id, source, changes, **kwargs):
+    labels = dict(Cheque.STATUS_CHOICES)
+    notifications = []
+    for change in changes:
+        ids = change['cheque_ids']
+        for start in range(0, len(ids), BATCH_SIZE):
+            notifications += _tenant_cheque_notifications(ids[start:start + BATCH_SIZE], change['to_status'])
+
+    count = sum(change['count'] for change in changes)
+    bounced = any(change['to_status'] == 'BOUNCED' for change in changes)
+    message = "; ".join(
+        f"{change['count']} {labels[change['from_status']]} → {labels[change['to_status']]}" for change in changes
+    )
+    notifications += [
+        Notification(
+            recipient_id=user_id, organization_id=organization_id, kind='CHEQUE_UPDATE',
+            severity='HIGH' if bounced else 'LOW',
+            title=f"{_plural(count, 'cheque status update')} "
+                  f"(AED {sum(change['amount'] for change in changes):,.0f})",
+            message=message[:500],
+            data={'source': source},
+        )
+        for user_id in _staff([organization_id], FINANCE_ROLES)[organization_id]
+    ]
+    _insert(notifications)
+
+
+@receiver(post_save, sender=ChequeTransition)
+def notify_cheque_edit(sender, instance, created, **kwargs):
+    # Batch moves bulk-insert their transitions (no signal) and are handled above
+    if not created:
+        return
+    notifications = _tenant_cheque_notifications([instance.cheque_id], instance.to_status)
+    if instance.to_status == 'BOUNCED' and instance.organization_id:
+        cheque = instance.cheque
+        staff = _staff([instance.organization_id], FINANCE_ROLES)[instance.organization_id] - {instance.changed_by_id}
+        notifications += [
+            Notification(
+                recipient_id=user_id, organization_id=instance.organization_id, kind='BOUNCED', severity='HIGH',
+                title=f"Cheque #{cheque.cheque_number} bounced",
+                message=f"AED {cheque.amount:,.0f} dated {cheque.cheque_date:%d %b %Y}",
+                data={'cheque_id': cheque.id, 'date': str(cheque.cheque_date)},
+            )
+            for user_id in staff
+        ]
+    _insert(notifications)
+
+
+# ═══════════════════════════════════════════════════
+# MAINTENANCE TICKETS
+# ═══════════════════════════════════════════════════
+
+TICKET_STATUS_NOTICES = {
+    'IN_PROGRESS': ('MAINTENANCE_UPDATE', 'MEDIUM', "'{title}' is being worked on", "Status: In Progress"),
+    'RESOLVED': ('MAINTENANCE_RESOLVED', 'LOW', "'{title}' has been resolved", "Your issue has been fixed"),
+}
+
+
+@receiver(post_save, sender=MaintenanceTicket)
+def notify_ticket_change(sender, instance, created, **kwargs):
+    previous_status = None if created else getattr(instance, '_loaded_status', instance.status)
+    previous_assignee = None if created else getattr(instance, '_loaded_assigned_to_id', instance.assigned_to_id)
+
+    ticket = {
+        'organization_id': instance.organization_id,
+        'data': {'ticket_id': instance.id},
+    }
+    notifications = []
+    if created:
+        property_id = Unit.objects.filter(pk=instance.unit_id).values_list('property_id', flat=True).first()
+        staff = _staff([instance.organization_id], ('OWNER',))[instance.organization_id]
+        staff |= set(User.objects.filter(
+            organization_id=instance.organization_id, role='MANAGER', managed_property_id=property_id, is_active=True,
+        ).values_list('id', flat=True))
+        notifications += [
+            Notification(
+                recipient_id=user_id, kind='TICKET_NEW', severity=instance.priority,
+                title=f"New ticket: {instance.title}", message=instance.description[:500], **ticket,
+            )
+            for user_id in staff
+        ]
+
+    if instance.assigned_to_id and instance.assigned_to_id != previous_assignee:
+        notifications.append(Notification(
+            recipient_id=instance.assigned_to_id, kind='TICKET_ASSIGNED', severity=instance.priority,
+            title=f"Assigned to you: {instance.title}", message=instance.description[:500], **ticket,
+        ))
+
+    notice = TICKET_STATUS_NOTICES.get(instance.status)
+    if notice and previous_status is not None and previous_status != instance.status and instance.tenant_id:
+        user_id = User.objects.filter(tenant_profile__id=instance.tenant_id).values_list('id', flat=True).first()
+        if user_id:
+            kind, severity, title, message = notice
+            notifications.append(Notification(
+                recipient_id=user_id, kind=kind, severity=severity,
+                title=title.format(title=instance.title), message=message, **ticket,
+            ))
+    _insert(notifications)
+
+
+# ═══════════════════════════════════════════════════
+# READING
+# ═══════════════════════════════════════════════════
+
+FEED_FIELDS = ('id', 'kind', 'severity', 'title', 'message', 'data', 'created_at', 'read_at')
+
+
+def feed(user, cursor=None, unread_only=False, limit=50):
+    """
+    (notifications newest first, cursor for the next page or None). `cursor`
+    is the (created_at, id) of the last row of the previous page.
+    """
+    notifications = Notification.objects.filter(recipient=user)
+    if unread_only:
+        notifications = notifications.filter(read_at__isnull=True)
+    if cursor:
+        created_at, pk = cursor
+        notifications = notifications.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    rows = list(notifications.order_by('-created_at', '-id').values(*FEED_FIELDS)[:limit + 1])
+    more = len(rows) > limit
+    rows = rows[:limit]
+    return rows, ((rows[-1]['created_at'], rows[-1]['id']) if more else None)
+
+
+def unread_count(user):
+    return Notification.objects.filter(recipient=user, read_at__isnull=True).count()
+
+
+def mark_read(user, ids=None):
+    """Mark `ids` (default: everything) read. Returns rows updated."""
+    notifications = Notification.objects.filter(recipient=user, read_at__isnull=True)
+    if ids is not None:
+        notifications = notifications.filter(id__in=ids)
+    return notifications.update(read_at=timezone.now())
+
@@ -0,0 +1,329 @@
+"""
+Live updates over WebSockets, so the technician and tenant apps (and staff
+screens) don't have to re-fetch to find out a ticket or cheque changed.
+
+    ws://host/ws/updates/?token=<JWT access token>
+
+config/asgi.py hands WebSocket connections to websocket_application(); HTTP
+stays with Django. Each connection listens on its channels:
+
+    user:<id>   always — their tickets (technician), cheques and tickets (tenant),
+                new notifications
+    org:<id>    owners, managers, finance staff — every ticket and cheque change
+
+and receives one JSON text frame per event:
+
+    {"type": "ticket", "event": "created" | "assigned" | "status", "ticket": {...}}
+    {"type": "cheque", "from_status": ..., "to_status": ..., "count": n, "cheque_ids": [...]}
+    {"type": "notification", "count": n}
+
+Events are published to Redis pub/sub (REALTIME_REDIS_URL) after the
+transaction that made the change commits, by the receivers at the bottom of
+this module, so every server process gets them whichever process or Celery
+worker made the change. Each process holds one Redis subscription (Hub),
+subscribed to the channels its open sockets need, and fans messages out to
+them. A socket that falls REALTIME_QUEUE_SIZE events behind is closed (4008)
+and one whose token expires is closed too (4001); clients reconnect, with a
+fresh token, and re-fetch.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict
+from urllib.parse import parse_qs
+
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from core.authentication import aauthenticate_token
+from finance.lifecycle import cheques_transitioned
+from finance.models import Cheque, ChequeTransition
+from maintenance.models import MaintenanceTicket
+from tenants.models import Tenant
+
+logger = logging.getLogger(__name__)
+
+WEBSOCKET_PATH = '/ws/updates/'
+CHANNEL_PREFIX = 'updates:'
+
+# Roles that follow every change in their organization
+STAFF_ROLES = ('SUPER_ADMIN', 'OWNER', 'MANAGER', 'FINANCE')
+
+# Larger batches are announced with their count only; the client re-fetches
+MAX_EVENT_IDS = 500
+
+# Close codes
+CLOSE_NOT_FOUND = 4404
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_TOKEN_EXPIRED = 4001
+CLOSE_TOO_SLOW = 4008
+CLOSE_UNAVAILABLE = 1011
+
+
+def user_channels(user):
+    channels = [f"user:{user.id}"]
+    if user.organization_id and (user.is_superuser or user.role in STAFF_ROLES):
+        channels.append(f"org:{user.organization_id}")
+    return channels
+
+
+# ═══════════════════════════════════════════════════
+# PUBLISHING (sync; signals, Celery)
+# ═══════════════════════════════════════════════════
+
+_client = None
+
+
+def _redis():
+    global _client
+    if _client is None:
+        # Short timeouts: a Redis outage costs a warning, not a stalled request
+        _client = redis.Redis.from_url(settings.REALTIME_REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+    return _client
+
+
+def publish(messages):
+    """Send [(channel, event)] once the current transaction commits (right away outside one)."""
+    if not settings.REALTIME_ENABLED or not messages:
+        return
+    payloads = [(CHANNEL_PREFIX + channel, json.dumps(event, cls=DjangoJSONEncoder)) for channel, event in messages]
+    transaction.on_commit(lambda: _send(payloads), robust=True)
+
+
+def _send(payloads):
+    try:
+        pipe = _redis().pipeline(transaction=False)
+        for channel, data in payloads:
+            pipe.publish(channel, data)
+        pipe.execute()
+    except redis.RedisError:
+        logger.warning("Could not publish %d live updates", len(payloads), exc_info=True)
+
+
+# ═══════════════════════════════════════════════════
+# FAN-OUT (async, per server process)
+# ═══════════════════════════════════════════════════
+
+class Hub:
+    """One Redis subscription per process, shared by its sockets: channel → their queues."""
+
+    def __init__(self):
+        self.queues = defaultdict(set)
+        self.pubsub = None
+        self.reader = None
+        self.lock = asyncio.Lock()
+
+    async def join(self, channels, queue):
+        async with self.lock:
+            if self.pubsub is None:
+                self.pubsub = aioredis.Redis.from_url(settings.REALTIME_REDIS_URL).pubsub(ignore_subscribe_messages=True)
+            new = [channel for channel in channels if not self.queues[channel]]
+            for channel in channels:
+                self.queues[channel].add(queue)
+            if new:
+                try:
+                    await self.pubsub.subscribe(*(CHANNEL_PREFIX + channel for channel in new))
+                except BaseException:
+                    for channel in channels:
+                        self.queues[channel].discard(queue)
+                        if not self.queues[channel]:
+                            del self.queues[channel]
+                    raise
+            if self.reader is None or self.reader.done():
+                self.reader = asyncio.create_task(self._read())
+
+    async def leave(self, channels, queue):
+        async with self.lock:
+            gone = []
+            for channel in channels:
+                self.queues[channel].discard(queue)
+                if not self.queues[channel]:
+                    del self.queues[channel]
+                    gone.append(channel)
+            if gone:
+                try:
+                    await self.pubsub.unsubscribe(*(CHANNEL_PREFIX + channel for channel in gone))
+                except redis.RedisError:
+                    # Resubscribing after a reconnect only covers channels still wanted
+                    logger.warning("Could not unsubscribe from %d channels", len(gone), exc_info=True)
+
+    async def _read(self):
+        while True:
+            try:
+                message = await self.pubsub.get_message(timeout=None)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # redis-py reconnects and resubscribes on the next read
+                logger.warning("Live update subscription failed; retrying", exc_info=True)
+                await asyncio.sleep(1)
+                continue
+            if message is None or message['type'] != 'message':
+                continue
+            channel = message['channel'].decode()[len(CHANNEL_PREFIX):]
+            for queue in list(self.queues.get(channel, ())):
+                self._deliver(queue, message['data'])
+
+    @staticmethod
+    def _deliver(queue, data):
+        try:
+            queue.put_nowait(data)
+        except asyncio.QueueFull:
+            # Too far behind: drop what's queued and tell the socket to close
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+
+hub = Hub()
+
+
+# ═══════════════════════════════════════════════════
+# WEBSOCKET (ASGI)
+# ═══════════════════════════════════════════════════
+
+async def websocket_application(scope, receive, send):
+    """ASGI app for `websocket` scopes (config/asgi.py)."""
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+    if scope['path'] != WEBSOCKET_PATH or not settings.REALTIME_ENABLED:
+        await send({'type': 'websocket.close', 'code': CLOSE_NOT_FOUND})
+        return
+
+    raw_token = parse_qs(scope.get('query_string', b'').decode()).get('token', [''])[0]
+    user, token = await aauthenticate_token(raw_token) if raw_token else (None, None)
+    if user is None:
+        await send({'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED})
+        return
+
+    channels = user_channels(user)
+    queue = asyncio.Queue(maxsize=settings.REALTIME_QUEUE_SIZE)
+    try:
+        await hub.join(channels, queue)
+    except redis.RedisError:
+        logger.exception("Live updates unavailable")
+        await send({'type': 'websocket.close', 'code': CLOSE_UNAVAILABLE})
+        return
+    try:
+        await send({'type': 'websocket.accept'})
+        await send({'type': 'websocket.send', 'text': json.dumps({'type': 'hello', 'channels': channels})})
+        await _pump(receive, send, queue, token['exp'] - time.time())
+    finally:
+        await hub.leave(channels, queue)
+
+
+async def _pump(receive, send, queue, seconds_left):
+    """Forward queued events until the client leaves, falls behind or its token expires."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + seconds_left
+    incoming = asyncio.ensure_future(receive())
+    outgoing = asyncio.ensure_future(queue.get())
+    try:
+        while True:
+            done, _ = await asyncio.wait(
+                {incoming, outgoing}, timeout=max(deadline - loop.time(), 0), return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                await send({'type': 'websocket.close', 'code': CLOSE_TOKEN_EXPIRED})
+                return
+            if incoming in done:
+                message = incoming.result()
+                if message['type'] == 'websocket.disconnect':
+                    return
+                if message.get('text') == 'ping':
+                    await send({'type': 'websocket.send', 'text': 'pong'})
+                incoming = asyncio.ensure_future(receive())
+            if outgoing in done:
+                data = outgoing.result()
+                if data is None:
+                    await send({'type': 'websocket.close', 'code': CLOSE_TOO_SLOW})
+                    return
+                await send({'type': 'websocket.send', 'text': data.decode()})
+                outgoing = asyncio.ensure_future(queue.get())
+    finally:
+        incoming.cancel()
+        outgoing.cancel()
+
+
+# ═══════════════════════════════════════════════════
+# EVENTS
+# ═══════════════════════════════════════════════════
+
+@receiver(post_save, sender=MaintenanceTicket)
+def publish_ticket_change(sender, instance, created, **kwargs):
+    previous_status = getattr(instance, '_loaded_status', None)
+    previous_assignee = getattr(instance, '_loaded_assigned_to_id', None)
+    if created:
+        event = 'created'
+    elif instance.assigned_to_id != previous_assignee:
+        event = 'assigned'
+    elif instance.status != previous_status:
+        event = 'status'
+    else:
+        return
+
+    channels = {f"org:{instance.organization_id}"}
+    channels |= {f"user:{user_id}" for user_id in (instance.assigned_to_id, previous_assignee) if user_id}
+    if instance.tenant_id:
+        tenant_user = Tenant.objects.filter(pk=instance.tenant_id).values_list('user_id', flat=True).first()
+        if tenant_user:
+            channels.add(f"user:{tenant_user}")
+    payload = {
+        'type': 'ticket',
+        'event': event,
+        'ticket': {
+            'id': instance.id, 'title': instance.title, 'status': instance.status, 'priority': instance.priority,
+            'unit_id': instance.unit_id, 'tenant_id': instance.tenant_id, 'assigned_to_id': instance.assigned_to_id,
+            'updated_at': instance.updated_at,
+        },
+    }
+    publish([(channel, payload) for channel in sorted(channels)])
+
+
+def _cheque_events(organization_id, from_status, to_status, cheque_ids):
+    """The organization's event plus one per tenant user with their own cheques."""
+    def event(ids):
+        return {
+            'type': 'cheque', 'from_status': from_status, 'to_status': to_status,
+            'count': len(ids), 'cheque_ids': ids if len(ids) <= MAX_EVENT_IDS else None,
+        }
+
+    messages = [(f"org:{organization_id}", event(cheque_ids))] if organization_id else []
+    by_user = defaultdict(list)
+    for start in range(0, len(cheque_ids), MAX_EVENT_IDS):
+        rows = Cheque.objects.filter(id__in=cheque_ids[start:start + MAX_EVENT_IDS], tenant__user__isnull=False)
+        for cheque_id, user_id in rows.values_list('id', 'tenant__user_id'):
+            by_user[user_id].append(cheque_id)
+    messages += [(f"user:{user_id}", event(ids)) for user_id, ids in by_user.items()]
+    return messages
+
+
+@receiver(cheques_transitioned)
+def publish_cheque_batch(sender, organization_id, source, changes, **kwargs):
+    messages = []
+    for change in changes:
+        messages += _cheque_events(organization_id, change['from_status'], change['to_status'], change['cheque_ids'])
+    publish(messages)
+
+
+@receiver(post_save, sender=ChequeTransition)
+def publish_cheque_edit(sender, instance, created, **kwargs):
+    # Batch moves bulk-insert their transitions (no signal) and are handled above
+    if created:
+        publish(_cheque_events(instance.organization_id, instance.from_status, instance.to_status, [instance.cheque_id]))
+
+
+def publish_notifications(notifications):
+    """A `notification` event per recipient of newly stored notifications (notifications.py)."""
+    counts = defaultdict(int)
+    for notification in notifications:
+        counts[notification.recipient_id] += 1
+    publish([(f"user:{user_id}", {'type': 'notification', 'count': count}) for user_id, count in counts.items()])
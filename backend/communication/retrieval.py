@@ -0,0 +1,233 @@
+"""
+Vector retrieval over portfolio records for the chatbot (pgvector).
+
+Every unit, tenant, lease, ticket, cheque and chunk of building rules is
+rendered to a short text, embedded (ai.embeddings) and stored as a
+ContextDocument. At question time only the top-k nearest documents within the
+user's scope are put into the prompt, so prompt size no longer grows with the
+size of the portfolio.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Prefetch, Q
+from pgvector.django import CosineDistance
+
+from ai.embeddings import embed_query, embed_texts
+from tenants.models import Tenant, Lease
+from properties.models import Property, Unit
+from finance.models import Cheque
+from maintenance.models import MaintenanceTicket
+from .models import ContextDocument
+
+RULES_CHUNK_CHARS = 800
+EMBED_BATCH_SIZE = 100
+
+
+# ═══════════════════════════════════════════════════
+# RENDERING  (record → text chunks)
+# ═══════════════════════════════════════════════════
+
+def _doc(organization_id, content, property_id=None, tenant_id=None):
+    return {'organization_id': organization_id, 'property_id': property_id, 'tenant_id': tenant_id, 'content': content}
+
+
+def _render_unit(u):
+    return [_doc(
+        u.property.organization_id,
+        f"Unit {u.unit_number} at {u.property.name} ({u.unit_type}, {u.bedrooms} bed / {u.bathrooms} bath"
+        f"{f', {u.square_feet} sq ft' if u.square_feet else ''}) | Rent: AED {u.yearly_rent:,.0f}/year | Status: {u.status}",
+        property_id=u.property_id,
+    )]
+
+
+def _render_tenant(t):
+    lease = t.active_leases[0] if t.active_leases else (t.all_leases[0] if t.all_leases else None)
+    if lease is None:
+        return []  # not attached to any organization yet
+    unit = lease.unit
+    unit_info = f"Unit {unit.unit_number} at {unit.property.name}" if lease.is_active else "No active lease"
+    return [_doc(
+        unit.property.organization_id,
+        f"Tenant {t.name} ({t.email}, {t.phone}) | Nationality: {t.nationality or 'N/A'} | {unit_info}",
+        property_id=unit.property_id,
+        tenant_id=t.id,
+    )]
+
+
+def _render_lease(l):
+    unit = l.unit
+    return [_doc(
+        unit.property.organization_id,
+        f"Lease #{l.id}: {l.tenant.name} — Unit {unit.unit_number} at {unit.property.name} | "
+        f"{l.start_date} to {l.end_date} | Rent: AED {l.rent_amount:,.0f}/year | "
+        f"{l.get_payment_frequency_display()} | {'Active' if l.is_active else 'Ended'}",
+        property_id=unit.property_id,
+        tenant_id=l.tenant_id,
+    )]
+
+
+def _render_ticket(t):
+    return [_doc(
+        t.organization_id,
+        f"Maintenance ticket #{t.id}: {t.title} | Unit {t.unit.unit_number} at {t.unit.property.name} | "
+        f"Category: {t.ai_category} | Priority: {t.priority} | Status: {t.status} | "
+        f"Reported: {t.created_at.strftime('%Y-%m-%d')} | {t.description[:300]}",
+        property_id=t.unit.property_id,
+        tenant_id=t.tenant_id,
+    )]
+
+
+def _render_cheque(c):
+    if not c.organization_id:
+        return []
+    unit_info = f" | Unit {c.lease.unit.unit_number}" if c.lease_id else ""
+    return [_doc(
+        c.organization_id,
+        f"Cheque {c.cheque_number}: AED {c.amount:,.0f} from {c.tenant.name}{unit_info} | "
+        f"Bank: {c.bank_name or 'N/A'} | Due: {c.cheque_date} | Status: {c.status}",
+        property_id=c.lease.unit.property_id if c.lease_id else None,
+        tenant_id=c.tenant_id,
+    )]
+
+
+def chunk_text(text, size=RULES_CHUNK_CHARS):
+    """Split on blank lines, packing paragraphs into chunks of about `size` characters."""
+    chunks, current = [], ''
+    for paragraph in [p.strip() for p in text.split('\n\n') if p.strip()]:
+        if current and len(current) + len(paragraph) > size:
+            chunks.append(current)
+            current = ''
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _render_rules(p):
+    """One document per parsed RuleSection; raw chunks for rules that have not been parsed yet."""
+    if not p.rules_and_regulations:
+        return []
+    sections = [f"{r.heading or r.get_topic_display()}:\n{r.body}" for r in p.rule_sections.all()]
+    return [
+        _doc(p.organization_id, f"Building rules for {p.name}:\n{chunk}", property_id=p.id)
+        for chunk in sections or chunk_text(p.rules_and_regulations)
+    ]
+
+
+def _tenant_queryset():
+    return Tenant.objects.prefetch_related(
+        Prefetch('leases', queryset=Lease.objects.filter(is_active=True).select_related('unit__property'), to_attr='active_leases'),
+        Prefetch('leases', queryset=Lease.objects.select_related('unit__property').order_by('-end_date'), to_attr='all_leases'),
+    )
+
+
+SOURCES = {
+    'UNIT': (lambda: Unit.objects.select_related('property'), _render_unit),
+    'TENANT': (_tenant_queryset, _render_tenant),
+    'LEASE': (lambda: Lease.objects.select_related('tenant', 'unit__property'), _render_lease),
+    'TICKET': (lambda: MaintenanceTicket.objects.select_related('unit__property'), _render_ticket),
+    'CHEQUE': (lambda: Cheque.objects.select_related('tenant', 'lease__unit'), _render_cheque),
+    'RULES': (lambda: Property.objects.prefetch_related('rule_sections'), _render_rules),
+}
+
+
+# ═══════════════════════════════════════════════════
+# INDEXING
+# ═══════════════════════════════════════════════════
+
+def index_objects(source_type, ids):
+    """(Re)embed the given records. Missing records just lose their documents."""
+    queryset, render = SOURCES[source_type]
+    documents = []
+    for obj in queryset().filter(pk__in=ids):
+        for chunk, doc in enumerate(render(obj)):
+            documents.append(ContextDocument(source_type=source_type, source_id=obj.pk, chunk=chunk, **doc))
+
+    for start in range(0, len(documents), EMBED_BATCH_SIZE):
+        batch = documents[start:start + EMBED_BATCH_SIZE]
+        for doc, vector in zip(batch, embed_texts([d.content for d in batch])):
+            doc.embedding = vector
+
+    with transaction.atomic():
+        delete_documents(source_type, ids)
+        ContextDocument.objects.bulk_create(documents, batch_size=500)
+    return len(documents)
+
+
+def delete_documents(source_type, ids):
+    ContextDocument.objects.filter(source_type=source_type, source_id__in=ids).delete()
+
+
+def rebuild_index(organization=None, batch_size=500):
+    """Re-embed everything (or one organization). Returns {source_type: documents}."""
+    scopes = {
+        'UNIT': Q(organization=organization),
+        'TENANT': Q(organization=organization),
+        'LEASE': Q(organization=organization),
+        'TICKET': Q(organization=organization),
+        'CHEQUE': Q(organization=organization),
+        'RULES': Q(organization=organization),
+    }
+    totals = {}
+    for source_type, (queryset, _render) in SOURCES.items():
+        qs = queryset()
+        stale = ContextDocument.objects.filter(source_type=source_type)
+        if organization is not None:
+            qs = qs.filter(scopes[source_type])
+            stale = stale.filter(organization=organization)
+        stale.delete()
+        ids = list(qs.order_by('pk').values_list('pk', flat=True).distinct())
+        totals[source_type] = 0
+        for start in range(0, len(ids), batch_size):
+            totals[source_type] += index_objects(source_type, ids[start:start + batch_size])
+    return totals
+
+
+# ═══════════════════════════════════════════════════
+# RETRIEVAL
+# ═══════════════════════════════════════════════════
+
+def _nearest(vector, organization_id, tenant_id, property_id, source_types, k):
+    """
+    The HNSW index filters after its scan: it yields the hnsw.ef_search (40)
+    rows nearest to the question and drops those outside the scope, so a
+    small organization can get few or no documents back. Scoped queries are
+    ranked exactly over the rows the btree indexes select instead; only
+    unscoped (superuser) searches use the HNSW index.
+    """
+    documents = ContextDocument.objects.all()
+    if organization_id is not None:
+        documents = documents.filter(organization_id=organization_id)
+    if tenant_id is not None:
+        documents = documents.filter(Q(tenant_id=tenant_id) | Q(source_type='RULES', property_id=property_id))
+    if source_types:
+        documents = documents.filter(source_type__in=source_types)
+    documents = documents.annotate(distance=CosineDistance('embedding', vector)).order_by('distance')[:k or settings.CHAT_RETRIEVAL_TOP_K]
+    if organization_id is None and tenant_id is None and not source_types:
+        return list(documents)
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # Bitmap scans (the btree filters) stay on; the HNSW index can only be used by an index scan
+            cursor.execute("SET LOCAL enable_indexscan = off")
+        documents = list(documents)
+        # Read-only, and rolling back undoes SET LOCAL even inside a caller's transaction
+        transaction.set_rollback(True)
+    return documents
+
+
+def retrieve(question, organization_id=None, tenant_id=None, property_id=None, source_types=None, k=None):
+    """
+    Top-k documents nearest to `question`.
+    Admins: everything in their organization (organization_id=None → all, for superusers).
+    Tenants: their own records plus their building's rules.
+    """
+    vector = embed_query(question)
+    return _nearest(vector, organization_id, tenant_id, property_id, source_types, k)
+
+
+async def aretrieve(question, organization_id=None, tenant_id=None, property_id=None, source_types=None, k=None):
+    """Async retrieve(). The embedding call (no DB access) runs off the event loop."""
+    vector = await sync_to_async(embed_query, thread_sensitive=False)(question)
+    return await sync_to_async(_nearest)(vector, organization_id, tenant_id, property_id, source_types, k)
@@ -0,0 +1,142 @@
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from properties.models import Property, Unit
+from tenants.models import Tenant, Lease
+from finance.models import Cheque
+from maintenance.models import MaintenanceTicket
+from .context import bump_versions
+from .tasks import index_context_documents, delete_context_documents, rebuild_context_index
+
+logger = logging.getLogger(__name__)
+
+
+def _org_scopes(org_ids, topic):
+    scopes = [('all', topic)]
+    scopes += [(f"org:{org_id}", topic) for org_id in set(org_ids) if org_id]
+    return scopes
+
+
+@receiver([post_save, post_delete], sender=Property)
+def invalidate_property_context(sender, instance, **kwargs):
+    bump_versions(_org_scopes([instance.organization_id], 'property') + [f"property:{instance.id}"])
+
+
+@receiver(post_save, sender=Property)
+def refresh_moved_property(sender, instance, **kwargs):
+    """
+    Property.save() moves the units and leases of a property that changed
+    organization with update(), which sends no signals: invalidate both
+    organizations and re-embed those rows once the move commits.
+    """
+    previous_org = getattr(instance, '_moved_from_organization_id', None)
+    if not previous_org:
+        return
+    org_ids = [previous_org, instance.organization_id]
+    unit_ids = list(Unit.objects.filter(property=instance).values_list('id', flat=True))
+    leases = list(Lease.objects.filter(unit__property=instance).values_list('id', 'tenant_id'))
+    scopes = [scope for topic in ('property', 'unit', 'lease') for scope in _org_scopes(org_ids, topic)]
+    scopes += [f"tenant:{tenant_id}" for _, tenant_id in leases]
+    transaction.on_commit(lambda: bump_versions(scopes), robust=True)
+    _reindex('UNIT', *unit_ids)
+    _reindex('LEASE', *[lease_id for lease_id, _ in leases])
+
+
+@receiver([post_save, post_delete], sender=Unit)
+def invalidate_unit_context(sender, instance, **kwargs):
+    bump_versions(_org_scopes([instance.organization_id], 'unit') + [f"property:{instance.property_id}"])
+
+
+@receiver([post_save, post_delete], sender=Tenant)
+def invalidate_tenant_context(sender, instance, **kwargs):
+    bump_versions(_org_scopes([instance.organization_id], 'tenant') + [f"tenant:{instance.id}"])
+
+
+@receiver([post_save, post_delete], sender=Lease)
+def invalidate_lease_context(sender, instance, **kwargs):
+    bump_versions(_org_scopes([instance.organization_id], 'lease') + [f"tenant:{instance.tenant_id}"])
+
+
+@receiver([post_save, post_delete], sender=Cheque)
+def invalidate_cheque_context(sender, instance, **kwargs):
+    bump_versions(_org_scopes([instance.organization_id], 'cheque') + [f"tenant:{instance.tenant_id}"])
+
+
+@receiver([post_save, post_delete], sender=MaintenanceTicket)
+def invalidate_ticket_context(sender, instance, **kwargs):
+    scopes = _org_scopes([instance.organization_id], 'ticket')
+    if instance.tenant_id:
+        scopes.append(f"tenant:{instance.tenant_id}")
+    bump_versions(scopes)
+
+
+# ═══════════════════════════════════════════════════
+# VECTOR INDEX (retrieval.py) — re-embed changed records in Celery
+# ═══════════════════════════════════════════════════
+
+def _reindex(source_type, *ids):
+    ids = [pk for pk in ids if pk]
+    if ids:
+        transaction.on_commit(lambda: index_context_documents.delay(source_type, ids), robust=True)
+
+
+def _unindex(source_type, pk):
+    transaction.on_commit(lambda: delete_context_documents.delay(source_type, [pk]), robust=True)
+
+
+INDEXED_MODELS = {
+    Property: 'RULES',
+    Unit: 'UNIT',
+    Tenant: 'TENANT',
+    Lease: 'LEASE',
+    MaintenanceTicket: 'TICKET',
+    Cheque: 'CHEQUE',
+}
+
+
+@receiver(post_save, sender=Unit)
+@receiver(post_save, sender=Tenant)
+@receiver(post_save, sender=MaintenanceTicket)
+@receiver(post_save, sender=Cheque)
+def index_on_save(sender, instance, **kwargs):
+    _reindex(INDEXED_MODELS[sender], instance.id)
+
+
+@receiver(post_save, sender=Lease)
+def index_lease_on_save(sender, instance, **kwargs):
+    # The tenant's document shows their current unit
+    _reindex('LEASE', instance.id)
+    _reindex('TENANT', instance.tenant_id)
+
+
+@receiver(post_save, sender=Property)
+def index_rules_on_save(sender, instance, **kwargs):
+    _reindex('RULES', instance.id)
+
+
+@receiver(post_delete, sender=Unit)
+@receiver(post_delete, sender=Tenant)
+@receiver(post_delete, sender=Lease)
+@receiver(post_delete, sender=MaintenanceTicket)
+@receiver(post_delete, sender=Cheque)
+@receiver(post_delete, sender=Property)
+def unindex_on_delete(sender, instance, **kwargs):
+    _unindex(INDEXED_MODELS[sender], instance.id)
+
+
+def backfill_context_index(sender, **kwargs):
+    """
+    post_migrate (apps.py): queue a full index build when the index is empty
+    but there are records to index, e.g. on the first deploy with retrieval.
+    """
+    from .models import ContextDocument
+
+    if ContextDocument.objects.exists() or not (Unit.objects.exists() or Tenant.objects.exists()):
+        return
+    try:
+        rebuild_context_index.delay()
+    except Exception as e:
+        logger.warning("Could not queue the chat index build, run `manage.py rebuild_chat_index`: %s", e)
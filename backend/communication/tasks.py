@@ -0,0 +1,56 @@
+import logging
+
+from celery import shared_task
+
+import ai
+from . import answer_cache, logwriter, memory, retrieval
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def index_context_documents(source_type, ids):
+    """Re-embed records for chatbot retrieval after they change."""
+    return retrieval.index_objects(source_type, ids)
+
+
+@shared_task
+def delete_context_documents(source_type, ids):
+    retrieval.delete_documents(source_type, ids)
+
+
+@shared_task
+def rebuild_context_index():
+    """Embed every record (first deploy; queued after migrate when the index is empty)."""
+    return retrieval.rebuild_index()
+
+
+@shared_task
+def summarize_conversation(conversation_id):
+    """Fold older chat turns into the conversation's rolling summary."""
+    try:
+        return memory.summarize(conversation_id)
+    except ai.AIError as e:
+        # Recent turns are still sent verbatim; the next turn will try again.
+        logger.warning("Conversation %s summary failed: %s", conversation_id, e)
+        return 0
+
+
+@shared_task
+def purge_answer_cache():
+    """Drop expired chatbot answers (celery beat, hourly)."""
+    return answer_cache.purge_expired()
+
+
+@shared_task
+def rollup_chat_logs():
+    """Fold chat logs past CHAT_LOG_RETENTION_DAYS into daily stats (celery beat, daily)."""
+    days, logs = logwriter.rollup_old_logs()
+    return {'days': days, 'logs': logs}
+
+
+@shared_task
+def notify_payments_due():
+    """Payment-due notifications for the coming week, and retention (celery beat, daily)."""
+    from . import notifications  # imports finance.lifecycle, which imports this module
+    return {'queued': notifications.notify_payments_due(), 'purged': notifications.purge_old()}
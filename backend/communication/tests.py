@@ -1,3 +1,232 @@
-from django.test import TestCase
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+import ai
+from ai.embeddings import EMBEDDING_DIMENSIONS, embed_texts
+from core.models import Organization, User
+from properties.models import Property, Unit
+from properties.rules import reindex_property_rules
+from tenants.models import Lease, Tenant
+from . import answer_cache, notifications, signals
+from .views import _positive_int
+from .context import admin_section, get_admin_context
+from .logwriter import chat_log_writer
+from .models import ContextDocument, Notification
+from .retrieval import retrieve
+
+
+class AnswerCacheScopeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner', role='OWNER')
+        cls.org = Organization.objects.create(name='Org', owner=owner)
+        building = Property.objects.create(
+            organization=cls.org, name='Marina Tower', address='Dubai Marina',
+            rules_and_regulations="Gym: open daily from 6am to 10pm.\n\nPets: cats and small dogs are allowed.",
+        )
+        reindex_property_rules(building)
+        cls.users = []
+        for number in ('101', '102'):
+            user = User.objects.create_user(f'tenant{number}', role='TENANT')
+            tenant = Tenant.objects.create(user=user, name=f'Tenant {number}', phone='050', email=f'{number}@example.com', organization=cls.org)
+            unit = Unit.objects.create(property=building, organization=cls.org, unit_number=number, unit_type='1BHK', yearly_rent=80000)
+            Lease.objects.create(
+                tenant=tenant, unit=unit, organization=cls.org, start_date=date(2026, 1, 1),
+                end_date=date(2026, 12, 31), rent_amount=80000, payment_frequency='4_CHEQUES',
+            )
+            cls.users.append(user)
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_tenants_in_one_building_do_not_share_answers(self):
+        # Tagged VISITORS, but answered from the asker's own tickets
+        question = "When will the technician visit?"
+        first, second = [await answer_cache.fingerprint(user, False, question) for user in self.users]
+        self.assertTrue(first.startswith('tenant:'))
+        self.assertTrue(second.startswith('tenant:'))
+        self.assertNotEqual(first, second)
+
+    async def test_building_questions_are_scoped_per_tenant(self):
+        first, second = [await answer_cache.fingerprint(user, False, "What are the gym hours?") for user in self.users]
+        self.assertNotEqual(first, second)
+
+    async def test_scope_changes_with_the_tenants_data(self):
+        user = self.users[0]
+        before = await answer_cache.fingerprint(user, False, "When is my next cheque due?")
+        tenant = await Tenant.objects.aget(user=user)
+        await tenant.asave()
+        self.assertNotEqual(before, await answer_cache.fingerprint(user, False, "When is my next cheque due?"))
+
+    @override_settings(CHAT_TOOLS_ENABLED=False)
+    async def test_tenants_share_rules_answers_but_not_payment_answers(self):
+        async def ask(user, message):
+            headers = {'Authorization': f"Bearer {AccessToken.for_user(user)}"}
+            response = await self.async_client.post('/api/chat/', {'message': message}, content_type='application/json', headers=headers)
+            return response.json()
+
+        with mock.patch.object(ai, 'achat_completion', new=mock.AsyncMock(return_value="Answer")) as complete, \
+                mock.patch.object(chat_log_writer, 'write'):
+            first, second = [await ask(user, "What are the gym hours?") for user in self.users]
+            self.assertNotIn('cached', first)
+            self.assertTrue(second['cached'])
+            # Built from the rules alone: nothing about the tenant who asked first
+            prompt = str(complete.call_args.args[0])
+            self.assertIn("6am to 10pm", prompt)
+            self.assertNotIn("101", prompt)
+
+            first, second = [await ask(user, "When is my next cheque due?") for user in self.users]
+            self.assertNotIn('cached', second)
+            self.assertIn("Tenant 102", str(complete.call_args.args[0]))
+        self.assertEqual(complete.await_count, 3)
+
+    def test_follow_up_questions_are_not_cacheable(self):
+        self.assertFalse(answer_cache.is_cacheable("And what about that one?"))
+        self.assertTrue(answer_cache.is_cacheable("What are the gym hours?"))
+
+
+@override_settings(CHAT_RETRIEVAL_ENABLED=True)
+class RetrievalFallbackTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', role='OWNER')
+        cls.org = Organization.objects.create(name='Org', owner=cls.owner)
+        cls.owner.organization = cls.org
+        cls.owner.save()
+        building = Property.objects.create(organization=cls.org, name='Marina Tower', address='Dubai Marina')
+        Unit.objects.create(property=building, organization=cls.org, unit_number='1204', unit_type='1BHK', yearly_rent=80000)
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_empty_index_sends_full_listings(self):
+        self.assertFalse(await ContextDocument.objects.aexists())
+        context = await get_admin_context(self.owner, question="Which units are vacant?")
+        self.assertIn("UNITS:", context)
+        self.assertIn("Unit 1204", context)
+        self.assertNotIn("RECORDS RELEVANT TO THE QUESTION", context)
+
+    def test_backfill_is_queued_only_while_the_index_is_empty(self):
+        with mock.patch.object(signals.rebuild_context_index, 'delay') as delay:
+            signals.backfill_context_index(sender=None)
+            self.assertEqual(delay.call_count, 1)
+            ContextDocument.objects.create(organization=self.org, source_type='UNIT', source_id=1, content='x', embedding=[0.1] * EMBEDDING_DIMENSIONS)
+            signals.backfill_context_index(sender=None)
+            self.assertEqual(delay.call_count, 1)
+
+
+class ChatRequestValidationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tenant', role='TENANT')
+
+    async def post(self, body):
+        headers = {'Authorization': f"Bearer {AccessToken.for_user(self.user)}"}
+        return await self.async_client.post('/api/chat/', body, content_type='application/json', headers=headers)
+
+    async def test_body_must_be_an_object(self):
+        response = await self.post('[]')
+        self.assertEqual(response.status_code, 400)
+
+    async def test_conversation_id_must_be_a_positive_integer(self):
+        for conversation_id in ('abc', -3, 0, 1.5, True, [1]):
+            with self.subTest(conversation_id=conversation_id):
+                response = await self.post({'message': 'Hello', 'conversation_id': conversation_id})
+                self.assertEqual(response.status_code, 400)
+
+
+class PositiveIntTests(SimpleTestCase):
+    def test_values(self):
+        self.assertEqual(_positive_int(12), 12)
+        self.assertEqual(_positive_int(" 12 "), 12)
+        for value in ('abc', '', '-1', 0, -1, 1.0, False, None):
+            with self.subTest(value=value):
+                self.assertIsNone(_positive_int(value))
+
+
+class NotificationInsertTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(f'user{n}') for n in range(2)]
+
+    def build(self, key):
+        return [Notification(recipient=user, kind='PAYMENT_DUE', title='Due', dedupe_key=key) for user in self.users]
+
+    def test_rerun_stores_and_announces_nothing_twice(self):
+        with mock.patch.object(notifications, 'publish_notifications') as publish:
+            self.assertEqual(notifications._insert(self.build('due:1')), 2)
+            self.assertEqual(notifications._insert(self.build('due:1') + self.build('due:2')), 2)
+        self.assertEqual(Notification.objects.count(), 4)
+        announced = [n.dedupe_key for call in publish.call_args_list for n in call.args[0]]
+        self.assertEqual(sorted(announced), ['due:1', 'due:1', 'due:2', 'due:2'])
+
+
+class ContextInvalidationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.orgs = [Organization.objects.create(name=f'Org {n}', owner=User.objects.create_user(f'owner{n}')) for n in range(2)]
+        cls.building = Property.objects.create(organization=cls.orgs[0], name='Marina Tower', address='Dubai Marina')
+        cls.unit = Unit.objects.create(property=cls.building, organization=cls.orgs[0], unit_number='1204', unit_type='1BHK', yearly_rent=80000)
+        tenant = Tenant.objects.create(name='Tenant', phone='050', email='tenant@example.com', organization=cls.orgs[0])
+        cls.lease = Lease.objects.create(
+            tenant=tenant, unit=cls.unit, organization=cls.orgs[0], start_date=date(2026, 1, 1),
+            end_date=date(2026, 12, 31), rent_amount=80000, payment_frequency='4_CHEQUES',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_summary_counts_new_tenants(self):
+        self.assertIn("Active Tenants: 1", await admin_section(self.orgs[0], 'summary'))
+        await Tenant.objects.acreate(name='Second', phone='050', email='second@example.com', organization=self.orgs[0])
+        self.assertIn("Active Tenants: 2", await admin_section(self.orgs[0], 'summary'))
+
+    def test_moving_a_property_refreshes_its_units_and_leases(self):
+        def listings():
+            return [async_to_sync(admin_section)(org, 'units') for org in self.orgs]
+
+        self.assertIn("Unit 1204", listings()[0])
+        with mock.patch.object(signals.index_context_documents, 'delay') as delay, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.building.organization = self.orgs[1]
+            self.building.save()
+        old_org, new_org = listings()
+        self.assertNotIn("Unit 1204", old_org)
+        self.assertIn("Unit 1204", new_org)
+        queued = [call.args for call in delay.call_args_list]
+        self.assertIn(('UNIT', [self.unit.id]), queued)
+        self.assertIn(('LEASE', [self.lease.id]), queued)
+
+
+class FilteredRetrievalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owners = User.objects.bulk_create([User(username=f'owner{n}') for n in range(6)])
+        orgs = Organization.objects.bulk_create([Organization(name=f'Org {n}', owner=owner) for n, owner in enumerate(owners)])
+        cls.small_org = orgs[-1]
+        # Enough rows for the planner to pick the HNSW index, and none of
+        # small_org's among the ef_search candidates nearest to the question
+        documents = [
+            ContextDocument(organization=org, source_type='UNIT', source_id=n, content=f"Unit {n} is vacant")
+            for n, org in enumerate(orgs[:-1] * 250)
+        ]
+        documents += [
+            ContextDocument(organization=cls.small_org, source_type='TICKET', source_id=n, content=f"Ticket {n}: leaking pipe")
+            for n in range(250)
+        ]
+        for document, vector in zip(documents, embed_texts([d.content for d in documents])):
+            document.embedding = vector
+        ContextDocument.objects.bulk_create(documents)
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {ContextDocument._meta.db_table}")
+
+    def test_small_organization_gets_k_results(self):
+        documents = retrieve("Which units are vacant?", organization_id=self.small_org.id, k=3)
+        self.assertEqual(len(documents), 3)
+        self.assertEqual({d.organization_id for d in documents}, {self.small_org.id})
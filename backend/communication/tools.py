@@ -0,0 +1,463 @@
+"""
+Read-only query tools for the chatbot (Groq function calling).
+
+Instead of prefetching the portfolio into the prompt before the question is
+known, the chat view sends a short header (who is asking, today's date) plus
+these tool definitions. The model calls the tools it needs and run_tools()
+feeds the results back, so the database work per message follows the question
+rather than the size of the portfolio.
+
+Every tool runs against a ToolScope: admins query their organization
+(superusers: all of them), tenants only their own lease, payments and tickets
+and their building's rules. Scoping is applied in the queries, never left to
+the model. Listings are capped at MAX_ROWS and returned as JSON.
+"""
+
+import json
+import logging
+from datetime import timedelta
+
+from django.db.models import Count, Prefetch, Q, Sum
+from django.utils import timezone
+
+import ai
+from finance.models import Cheque
+from maintenance.models import MaintenanceTicket
+from properties.rules import asearch_rules
+from tenants.models import Lease
+from .context import _find_tenant, _querysets, admin_section
+
+logger = logging.getLogger(__name__)
+
+ADMIN = 'admin'
+TENANT = 'tenant'
+BOTH = 'both'
+
+MAX_ROWS = 25
+MAX_DAYS = 90
+OPEN_TICKET_STATUSES = ('OPEN', 'IN_PROGRESS')
+
+TOOL_INSTRUCTIONS = """Look up property data with the tools provided instead of guessing: call them for any question about
+properties, units, occupancy, tenants, leases, payments, maintenance or building rules. Answer general questions directly."""
+
+
+class ToolScope:
+    """Whose data the tools may read."""
+
+    def __init__(self, is_admin, org=None, tenant=None, lease=None):
+        self.is_admin = is_admin
+        self.org = org          # None for superusers: every organization
+        self.tenant = tenant
+        self.lease = lease
+
+    def querysets(self):
+        return _querysets(self.org)
+
+    def header(self):
+        """Context message sent instead of the prefetched portfolio data."""
+        if self.is_admin:
+            context = f"ORGANIZATION: {self.org.name if self.org else 'All Organizations'}\n"
+        else:
+            context = f"TENANT: {self.tenant.name}\n"
+            if self.lease:
+                context += f"UNIT: {self.lease.unit.unit_number} at {self.lease.unit.property.name}\n"
+        context += f"TODAY: {timezone.localdate():%A %Y-%m-%d}\n\n{TOOL_INSTRUCTIONS}\n"
+        return context
+
+
+async def tool_scope(user, is_admin):
+    """ToolScope for the user, or None if they have nothing to query (no organization / tenant profile)."""
+    if is_admin:
+        org = getattr(user, 'organization', None)
+        if user.is_superuser:
+            return ToolScope(True)
+        return ToolScope(True, org=org) if org else None
+
+    tenant = await _find_tenant(user)
+    if tenant is None:
+        return None
+    return ToolScope(False, tenant=tenant, lease=tenant.active_leases[0] if tenant.active_leases else None)
+
+
+# ═══════════════════════════════════════════════════
+# REGISTRY
+# ═══════════════════════════════════════════════════
+
+TOOLS = {}
+
+
+def tool(name, description, audience, parameters=None, required=()):
+    """Register `async handler(scope, **arguments)` as a chatbot tool."""
+    def register(handler):
+        TOOLS[name] = {
+            'audience': audience,
+            'handler': handler,
+            'spec': {
+                'type': 'function',
+                'function': {
+                    'name': name,
+                    'description': description,
+                    'parameters': {'type': 'object', 'properties': parameters or {}, 'required': list(required)},
+                },
+            },
+        }
+        return handler
+    return register
+
+
+def _string(description, choices=None):
+    schema = {'type': 'string', 'description': description}
+    if choices:
+        schema['enum'] = [value for value, _ in choices]
+    return schema
+
+
+def _integer(description):
+    return {'type': 'integer', 'description': description}
+
+
+def _boolean(description):
+    return {'type': 'boolean', 'description': description}
+
+
+def tool_specs(scope):
+    audiences = (BOTH, ADMIN if scope.is_admin else TENANT)
+    return [entry['spec'] for entry in TOOLS.values() if entry['audience'] in audiences]
+
+
+async def execute(scope, name, arguments):
+    """Run one tool call. Problems are returned to the model as {"error": ...} rather than raised."""
+    entry = TOOLS.get(name)
+    if entry is None or entry['audience'] not in (BOTH, ADMIN if scope.is_admin else TENANT):
+        return json.dumps({'error': f"Unknown tool '{name}'."})
+    try:
+        kwargs = json.loads(arguments or '{}')
+    except ValueError:
+        kwargs = None
+    if not isinstance(kwargs, dict):
+        return json.dumps({'error': "Arguments must be a JSON object."})
+
+    allowed = entry['spec']['function']['parameters']['properties']
+    kwargs = {key: value for key, value in kwargs.items() if key in allowed and value not in (None, '')}
+    missing = [key for key in entry['spec']['function']['parameters']['required'] if key not in kwargs]
+    if missing:
+        return json.dumps({'error': f"Missing arguments: {', '.join(missing)}."})
+
+    try:
+        result = await entry['handler'](scope, **kwargs)
+    except Exception as e:
+        logger.warning("Chat tool %s(%s) failed: %s", name, kwargs, e)
+        return json.dumps({'error': "The lookup failed."})
+    return result if isinstance(result, str) else json.dumps(result, default=str)
+
+
+async def run_tools(messages, scope, max_rounds, temperature=0.7, max_tokens=500):
+    """
+    Let the model call tools for up to `max_rounds` rounds, appending its calls
+    and their results to `messages`. Returns the answer if the model gave one,
+    or None if the last round still ended in tool calls (the caller then asks
+    for the answer itself, e.g. streamed).
+    """
+    specs = tool_specs(scope)
+    for _ in range(max_rounds):
+        reply = await ai.achat_completion_message(messages, specs, temperature=temperature, max_tokens=max_tokens)
+        if not reply.tool_calls:
+            return reply.content or ''
+
+        messages.append({
+            'role': 'assistant',
+            'content': reply.content or '',
+            'tool_calls': [
+                {'id': call.id, 'type': 'function',
+                 'function': {'name': call.function.name, 'arguments': call.function.arguments}}
+                for call in reply.tool_calls
+            ],
+        })
+        for call in reply.tool_calls:
+            messages.append({
+                'role': 'tool',
+                'tool_call_id': call.id,
+                'name': call.function.name,
+                'content': await execute(scope, call.function.name, call.function.arguments),
+            })
+    return None
+
+
+def _int(value, default, low=1, high=MAX_DAYS):
+    try:
+        return min(max(int(value), low), high)
+    except (TypeError, ValueError):
+        return default
+
+
+def _money(value):
+    return float(value or 0)
+
+
+def _filter_property(queryset, property, field='name'):
+    return queryset.filter(**{f"{field}__icontains": property}) if property else queryset
+
+
+# ═══════════════════════════════════════════════════
+# ADMIN TOOLS
+# ═══════════════════════════════════════════════════
+
+@tool(
+    'portfolio_summary',
+    "Portfolio totals: number of properties and units, occupancy rate, active tenants, "
+    "revenue collected, pending payments and bounced cheques.",
+    ADMIN,
+)
+async def portfolio_summary(scope):
+    # Same cached section the prefetched context uses
+    return await admin_section(scope.org, 'summary')
+
+
+@tool(
+    'property_occupancy',
+    "Occupancy per property: total, occupied and vacant units and the occupancy rate.",
+    ADMIN,
+    {'property': _string("Property name (or part of it). Omit for every property.")},
+)
+async def property_occupancy(scope, property=None):
+    properties = _filter_property(scope.querysets()['properties'], property).annotate(
+        total_units=Count('units'),
+        occupied=Count('units', filter=Q(units__status='OCCUPIED')),
+        vacant=Count('units', filter=Q(units__status='VACANT')),
+    ).order_by('name')
+    rows = []
+    async for p in properties[:MAX_ROWS]:
+        rate = round(p.occupied / p.total_units * 100, 1) if p.total_units else 0
+        rows.append({'property': p.name, 'units': p.total_units, 'occupied': p.occupied,
+                     'vacant': p.vacant, 'occupancy_rate': f"{rate}%"})
+    return rows or {'error': f"No property matching '{property}'."}
+
+
+@tool(
+    'vacant_units',
+    "Vacant units available to rent, with type, bedrooms, size and yearly rent.",
+    ADMIN,
+    {
+        'property': _string("Property name (or part of it)."),
+        'bedrooms': _integer("Exact number of bedrooms."),
+    },
+)
+async def vacant_units(scope, property=None, bedrooms=None):
+    units = _filter_property(scope.querysets()['units'].filter(status='VACANT'), property, 'property__name')
+    if bedrooms is not None:
+        units = units.filter(bedrooms=_int(bedrooms, 1, 0, 20))
+    total = await units.acount()
+    rows = [
+        {'property': u.property.name, 'unit': u.unit_number, 'type': u.unit_type, 'bedrooms': u.bedrooms,
+         'square_feet': u.square_feet, 'yearly_rent': _money(u.yearly_rent)}
+        async for u in units.select_related('property').order_by('yearly_rent')[:MAX_ROWS]
+    ]
+    return {'vacant_units': total, 'listed': rows}
+
+
+@tool(
+    'cheques_due',
+    "Cheques falling due in the next N days (7 = this week, 30 = this month) with tenant, unit and amount, "
+    "plus totals of pending cheques already overdue.",
+    ADMIN,
+    {
+        'days': _integer("How many days ahead, from today (default 7)."),
+        'property': _string("Only cheques for units in this property."),
+    },
+)
+async def cheques_due(scope, days=7, property=None):
+    today = timezone.localdate()
+    cheques = _filter_property(scope.querysets()['cheques'].filter(status='PENDING'), property, 'lease__unit__property__name')
+    due = cheques.filter(cheque_date__range=(today, today + timedelta(days=_int(days, 7))))
+    totals = await due.aaggregate(count=Count('id'), amount=Sum('amount'))
+    overdue = await cheques.filter(cheque_date__lt=today).aaggregate(count=Count('id'), amount=Sum('amount'))
+    rows = [
+        {'cheque': c.cheque_number, 'date': c.cheque_date, 'amount': _money(c.amount), 'tenant': c.tenant.name,
+         'unit': c.lease.unit.unit_number if c.lease else None,
+         'property': c.lease.unit.property.name if c.lease else None}
+        async for c in due.select_related('tenant', 'lease__unit__property').order_by('cheque_date')[:MAX_ROWS]
+    ]
+    return {
+        'from': today, 'to': today + timedelta(days=_int(days, 7)),
+        'due_count': totals['count'], 'due_amount': _money(totals['amount']), 'due': rows,
+        'overdue_count': overdue['count'], 'overdue_amount': _money(overdue['amount']),
+    }
+
+
+@tool(
+    'cheques_by_status',
+    "Cheques with a given status (e.g. BOUNCED, DEPOSITED), most recent first, with their total.",
+    ADMIN,
+    {
+        'status': _string("Cheque status.", Cheque.STATUS_CHOICES),
+        'tenant': _string("Only this tenant's cheques (name or part of it)."),
+    },
+    required=['status'],
+)
+async def cheques_by_status(scope, status, tenant=None):
+    cheques = scope.querysets()['cheques'].filter(status=str(status).upper())
+    if tenant:
+        cheques = cheques.filter(tenant__name__icontains=tenant)
+    totals = await cheques.aaggregate(count=Count('id'), amount=Sum('amount'))
+    rows = [
+        {'cheque': c.cheque_number, 'date': c.cheque_date, 'amount': _money(c.amount),
+         'tenant': c.tenant.name, 'bank': c.bank_name}
+        async for c in cheques.select_related('tenant').order_by('-cheque_date')[:MAX_ROWS]
+    ]
+    return {'status': status, 'count': totals['count'], 'amount': _money(totals['amount']), 'cheques': rows}
+
+
+@tool(
+    'open_tickets',
+    "Open and in-progress maintenance tickets, grouped by unit.",
+    ADMIN,
+    {
+        'property': _string("Property name (or part of it)."),
+        'unit': _string("Unit number."),
+        'priority': _string("Only this priority.", MaintenanceTicket.PRIORITY_CHOICES),
+    },
+)
+async def open_tickets(scope, property=None, unit=None, priority=None):
+    tickets = scope.querysets()['tickets'].filter(status__in=OPEN_TICKET_STATUSES)
+    tickets = _filter_property(tickets, property, 'unit__property__name')
+    if unit:
+        tickets = tickets.filter(unit__unit_number__iexact=unit)
+    if priority:
+        tickets = tickets.filter(priority=str(priority).upper())
+
+    total = await tickets.acount()
+    by_unit = {}
+    async for t in tickets.select_related('unit__property').order_by('unit__property__name', 'unit__unit_number', '-created_at')[:MAX_ROWS]:
+        label = f"{t.unit.property.name} / {t.unit.unit_number}"
+        by_unit.setdefault(label, []).append({
+            'id': t.id, 'title': t.title, 'priority': t.priority, 'status': t.status,
+            'category': t.ai_category, 'opened': t.created_at.date(),
+        })
+    return {'open_tickets': total, 'by_unit': by_unit}
+
+
+@tool(
+    'find_tenant',
+    "Look up tenants by name or email: contact details, current unit and lease, pending and bounced cheques.",
+    ADMIN,
+    {'name': _string("Tenant name or email (or part of it).")},
+    required=['name'],
+)
+async def find_tenant(scope, name):
+    qs = scope.querysets()
+    tenants = [
+        t async for t in qs['tenants'].filter(Q(name__icontains=name) | Q(email__icontains=name))
+        .prefetch_related(Prefetch(
+            'leases',
+            queryset=Lease.objects.filter(is_active=True).select_related('unit__property'),
+            to_attr='active_leases',
+        )).order_by('name')[:5]
+    ]
+    if not tenants:
+        return {'error': f"No tenant matching '{name}'."}
+
+    cheques = {
+        row['tenant_id']: row
+        async for row in qs['cheques'].filter(tenant__in=[t.id for t in tenants]).values('tenant_id').annotate(
+            pending=Sum('amount', filter=Q(status='PENDING')),
+            bounced=Count('id', filter=Q(status='BOUNCED')),
+        )
+    }
+    rows = []
+    for t in tenants:
+        lease = t.active_leases[0] if t.active_leases else None
+        stats = cheques.get(t.id, {})
+        rows.append({
+            'name': t.name, 'email': t.email, 'phone': t.phone,
+            'unit': f"{lease.unit.property.name} / {lease.unit.unit_number}" if lease else None,
+            'lease': f"{lease.start_date} to {lease.end_date}" if lease else None,
+            'yearly_rent': _money(lease.rent_amount) if lease else None,
+            'pending_amount': _money(stats.get('pending')), 'bounced_cheques': stats.get('bounced', 0),
+        })
+    return rows
+
+
+# ═══════════════════════════════════════════════════
+# TENANT TOOLS
+# ═══════════════════════════════════════════════════
+
+@tool(
+    'my_lease',
+    "The tenant's own lease and unit: property, address, unit, bedrooms, lease dates, yearly rent and payment frequency.",
+    TENANT,
+)
+async def my_lease(scope):
+    lease = scope.lease
+    if lease is None:
+        return {'error': "No active lease on file."}
+    unit = lease.unit
+    return {
+        'property': unit.property.name, 'address': unit.property.address, 'unit': unit.unit_number,
+        'type': unit.unit_type, 'bedrooms': unit.bedrooms, 'bathrooms': unit.bathrooms,
+        'start': lease.start_date, 'end': lease.end_date, 'yearly_rent': _money(lease.rent_amount),
+        'payment_frequency': lease.get_payment_frequency_display(),
+    }
+
+
+@tool(
+    'my_payments',
+    "The tenant's own cheques / payment schedule with due dates, amounts and status.",
+    TENANT,
+    {'status': _string("Only cheques with this status.", Cheque.STATUS_CHOICES)},
+)
+async def my_payments(scope, status=None):
+    cheques = Cheque.objects.filter(tenant=scope.tenant)
+    if status:
+        cheques = cheques.filter(status=str(status).upper())
+    today = timezone.localdate()
+    rows = [
+        {'cheque': c.cheque_number, 'date': c.cheque_date, 'amount': _money(c.amount), 'status': c.status,
+         'overdue': c.status == 'PENDING' and c.cheque_date < today}
+        async for c in cheques.order_by('cheque_date')[:MAX_ROWS]
+    ]
+    return rows or "No cheques on file."
+
+
+@tool(
+    'my_tickets',
+    "The tenant's own maintenance tickets (open and in progress unless include_closed).",
+    TENANT,
+    {'include_closed': _boolean("Also list resolved and closed tickets.")},
+)
+async def my_tickets(scope, include_closed=False):
+    tickets = MaintenanceTicket.objects.filter(tenant=scope.tenant)
+    if not include_closed:
+        tickets = tickets.filter(status__in=OPEN_TICKET_STATUSES)
+    rows = [
+        {'id': t.id, 'title': t.title, 'priority': t.priority, 'status': t.status, 'opened': t.created_at.date()}
+        async for t in tickets.order_by('-created_at')[:MAX_ROWS]
+    ]
+    return rows or "No maintenance tickets."
+
+
+# ═══════════════════════════════════════════════════
+# SHARED
+# ═══════════════════════════════════════════════════
+
+@tool(
+    'building_rules',
+    "Building rules and policies relevant to a question: pets, parking, gym, pool, visitors, noise, waste, "
+    "moving, smoking, security, renovation, fees.",
+    BOTH,
+    {
+        'question': _string("What the user wants to know, e.g. 'are dogs allowed'."),
+        'property': _string("Admins only: limit to this property."),
+    },
+    required=['question'],
+)
+async def building_rules(scope, question, property=None):
+    if scope.is_admin:
+        property_ids = _filter_property(scope.querysets()['properties'], property).values('id')
+    elif scope.lease is not None:
+        property_ids = [scope.lease.unit.property_id]
+    else:
+        return {'error': "No active lease, so no building on file."}
+
+    sections = await asearch_rules(property_ids, str(question), limit=5)
+    rows = [{'property': s.property.name, 'title': s.heading or s.get_topic_display(), 'text': s.body} for s in sections]
+    return rows or "No matching rules found."
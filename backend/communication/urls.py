@@ -1,6 +1,8 @@
 from django.urls import path
-from .views import chat_view
+from .views import chat_view, mark_notifications_read, notification_feed
 
 urlpatterns = [
     path('chat/', chat_view, name='chat'),
+    path('notifications/', notification_feed, name='notification_feed'),
+    path('notifications/read/', mark_notifications_read, name='mark_notifications_read'),
 ]
\ No newline at end of file
@@ -1,140 +1,25 @@
-import os
 import json
-import traceback
+import logging
+from datetime import datetime
 
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from django.db.models import Sum, Count, Q
-
-from groq import Groq
-
-from tenants.models import Tenant, Lease
-from properties.models import Property, Unit
-from finance.models import Cheque
-from maintenance.models import MaintenanceTicket
+import ai
+from core.authentication import aauthenticate
+from . import answer_cache, notifications
+from . import tools as chat_tools
+from .context import get_admin_context, get_rules_context, get_tenant_context
+from .logwriter import chat_log_writer
+from .memory import cached_system_prompt, get_conversation, memory_messages, record_turn, start_conversation
 from .models import ChatLog
 
-GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
-groq_client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
-
-
-def get_tenant_context(user):
-    """Build RAG context for a tenant user."""
-    try:
-        tenant = Tenant.objects.get(user=user)
-    except Tenant.DoesNotExist:
-        try:
-            tenant = Tenant.objects.get(email=user.email)
-        except Tenant.DoesNotExist:
-            return "No tenant profile found for this user."
-
-    context = f"TENANT PROFILE:\n"
-    context += f"- Name: {tenant.name}\n"
-    context += f"- Email: {tenant.email}\n"
-    context += f"- Phone: {tenant.phone}\n"
-    context += f"- Nationality: {tenant.nationality}\n"
-
-    lease = tenant.leases.filter(is_active=True).first()
-    if lease:
-        unit = lease.unit
-        context += f"\nLEASE & UNIT:\n"
-        context += f"- Property: {unit.property.name}\n"
-        context += f"- Address: {unit.property.address}\n"
-        context += f"- Unit: {unit.unit_number} ({unit.unit_type})\n"
-        context += f"- Bedrooms: {unit.bedrooms} | Bathrooms: {unit.bathrooms}\n"
-        context += f"- Lease: {lease.start_date} to {lease.end_date}\n"
-        context += f"- Yearly Rent: AED {lease.rent_amount:,.0f}\n"
-        context += f"- Payment Frequency: {lease.get_payment_frequency_display()}\n"
-
-        cheques = lease.cheques.all().order_by('cheque_date')
-        if cheques.exists():
-            context += f"\nPAYMENT SCHEDULE:\n"
-            for c in cheques:
-                context += f"- {c.cheque_number}: AED {c.amount:,.0f} | Due: {c.cheque_date} | Status: {c.status}\n"
-
-        # 🆕 Property rules & regulations for chatbot RAG
-        if unit.property.rules_and_regulations:
-            context += f"\nBUILDING RULES & REGULATIONS:\n{unit.property.rules_and_regulations}\n"
-
-    tickets = MaintenanceTicket.objects.filter(tenant=tenant).order_by('-created_at')[:10]
-    if tickets.exists():
-        context += f"\nMAINTENANCE TICKETS:\n"
-        for t in tickets:
-            context += f"- #{t.id}: {t.title} | Priority: {t.priority} | Status: {t.status} | Date: {t.created_at.strftime('%Y-%m-%d')}\n"
-
-    return context
-
-
-def get_admin_context(user):
-    """Build RAG context for an admin/owner/manager user."""
-    org = user.organization if hasattr(user, 'organization') else None
-    
-    if not org and not user.is_superuser:
-        return "No organization found for this user."
-
-    if user.is_superuser:
-        properties = Property.objects.all()
-        units = Unit.objects.all()
-        tenants = Tenant.objects.all()
-        cheques = Cheque.objects.all()
-        tickets = MaintenanceTicket.objects.all()
-    else:
-        properties = Property.objects.filter(organization=org)
-        units = Unit.objects.filter(property__organization=org)
-        tenants = Tenant.objects.filter(leases__unit__property__organization=org).distinct()
-        cheques = Cheque.objects.filter(organization=org)
-        tickets = MaintenanceTicket.objects.filter(organization=org)
-
-    total_units = units.count()
-    occupied = units.filter(status='OCCUPIED').count()
-    vacant = units.filter(status='VACANT').count()
-    occupancy_rate = round((occupied / total_units * 100), 1) if total_units > 0 else 0
-
-    revenue = cheques.filter(status='CLEARED').aggregate(Sum('amount'))['amount__sum'] or 0
-    pending = cheques.filter(status='PENDING').aggregate(Sum('amount'))['amount__sum'] or 0
-    bounced_count = cheques.filter(status='BOUNCED').count()
-
-    context = f"ORGANIZATION: {org.name if org else 'All Organizations'}\n"
-    context += f"\nPROPERTY PORTFOLIO:\n"
-    context += f"- Total Properties: {properties.count()}\n"
-    context += f"- Total Units: {total_units} (Occupied: {occupied}, Vacant: {vacant})\n"
-    context += f"- Occupancy Rate: {occupancy_rate}%\n"
-    context += f"- Active Tenants: {tenants.count()}\n"
-
-    context += f"\nFINANCIAL SUMMARY:\n"
-    context += f"- Revenue Collected: AED {revenue:,.0f}\n"
-    context += f"- Pending Payments: AED {pending:,.0f}\n"
-    context += f"- Bounced Cheques: {bounced_count}\n"
-
-    context += f"\nPROPERTIES:\n"
-    for p in properties:
-        p_units = p.units.count()
-        p_vacant = p.units.filter(status='VACANT').count()
-        context += f"- {p.name} ({p.property_type}) — {p.address} | Units: {p_units} (Vacant: {p_vacant})\n"
-        if p.rules_and_regulations:
-            context += f"  Rules: {p.rules_and_regulations[:200]}...\n"
-
-    context += f"\nALL UNITS:\n"
-    for u in units:
-        context += f"- {u.property.name} / Unit {u.unit_number} ({u.unit_type}) | Rent: AED {u.yearly_rent:,.0f} | Status: {u.status}\n"
-
-    context += f"\nTENANTS:\n"
-    for t in tenants[:20]:
-        active_lease = t.leases.filter(is_active=True).first()
-        unit_info = f"Unit {active_lease.unit.unit_number}" if active_lease else "No active lease"
-        context += f"- {t.name} ({t.email}) | {unit_info}\n"
-
-    context += f"\nRECENT MAINTENANCE TICKETS:\n"
-    for t in tickets.order_by('-created_at')[:15]:
-        context += f"- #{t.id}: {t.title} | Unit: {t.unit.unit_number if t.unit else 'N/A'} | Priority: {t.priority} | Status: {t.status}\n"
-
-    context += f"\nCHEQUES (Recent):\n"
-    for c in cheques.order_by('-cheque_date')[:20]:
-        context += f"- {c.cheque_number}: AED {c.amount:,.0f} | Tenant: {c.tenant.name if c.tenant else 'N/A'} | Due: {c.cheque_date} | Status: {c.status}\n"
-
-    return context
+logger = logging.getLogger(__name__)
 
 
 def detect_ticket_intent(message):
@@ -147,36 +32,14 @@ def detect_ticket_intent(message):
     return any(kw in msg_lower for kw in keywords)
 
 
-@api_view(['POST'])
-@permission_classes([IsAuthenticated])
-def chat_view(request):
-    """
-    Phase 4: RAG Chatbot Concierge (Powered by Groq + Llama 3.3)
-    POST /api/chat/
-    Body: { "message": "...", "history": [...] }
-    """
-    user = request.user
-    message = request.data.get('message', '').strip()
-    history = request.data.get('history', [])
-
-    if not message:
-        return Response({"response": "Please type a message."}, status=400)
-
-    # Determine user role
+def is_admin_user(user):
     role = getattr(user, 'role', 'TENANT')
-    is_admin = role in ['SUPER_ADMIN', 'OWNER', 'MANAGER'] or user.is_superuser
+    return role in ['SUPER_ADMIN', 'OWNER', 'MANAGER'] or user.is_superuser
 
-    # Build RAG context
-    if is_admin:
-        rag_context = get_admin_context(user)
-    else:
-        rag_context = get_tenant_context(user)
-
-    # Detect maintenance ticket intent
-    wants_ticket = not is_admin and detect_ticket_intent(message)
 
-    # Build system prompt
-    system_prompt = f"""You are PropOS AI, an intelligent property management assistant for a Dubai-based SaaS platform.
+def build_system_prompt(user, is_admin):
+    """The static part of the system prompt (cached per conversation, see memory.py)."""
+    return f"""You are PropOS AI, an intelligent property management assistant for a Dubai-based SaaS platform.
 
 YOUR CAPABILITIES:
 1. Answer questions about the user's property data (leases, payments, maintenance, units)
@@ -191,12 +54,10 @@ USER NAME: {user.first_name or user.username}
 
 {'IMPORTANT: This user is an admin. They can ask about any property, unit, tenant, or financial data in their organization.' if is_admin else 'IMPORTANT: This user is a tenant. Only share information about THEIR unit, lease, and payments.'}
 
-PROPERTY DATA CONTEXT:
-{rag_context}
-
 RULES:
-- When answering about property data, use the context above for accurate numbers
-- When answering about building rules, refer to the BUILDING RULES & REGULATIONS section above
+- When answering about property data, use the PROPERTY DATA CONTEXT message for accurate numbers
+- The context lists only the records most relevant to the question; use the totals for portfolio-wide numbers
+- When answering about building rules, refer to the BUILDING RULES sections of the context
 - For general questions unrelated to properties, answer normally like a helpful AI
 - Use AED for currency, format numbers with commas
 - Be concise but thorough
@@ -205,79 +66,381 @@ RULES:
 - Keep responses short and conversational (2-4 sentences for simple questions)
 """
 
+
+def build_rules_messages(message, rules_context):
+    """
+    Prompt for a building-rules question (see shared_rules_context): the
+    building's rule sections and the question only, no user name, tenant data
+    or conversation memory, since the answer is shared by every tenant of
+    the building.
+    """
+    return [
+        {"role": "system", "content": f"""You are PropOS AI, the property management assistant of a Dubai-based residential building.
+Answer the tenant's question about the building rules using only the BUILDING RULES sections below.
+If they don't cover it, say so and suggest asking the building management. Keep it short (2-4 sentences).
+
+{rules_context}"""},
+        {"role": "user", "content": message},
+    ]
+
+
+async def build_chat_messages(user, conversation, message, use_tools=None):
+    """
+    Cached system prompt + this question's context + conversation memory
+    (summary and recent turns) + the new message.
+    Returns (messages, wants_ticket, tool_scope).
+
+    With CHAT_TOOLS_ENABLED the context is a short header and the model looks
+    data up through the tools in tools.py (tool_scope is then set, see
+    answer_with_tools()); otherwise the RAG context is prefetched.
+    """
+    is_admin = is_admin_user(user)
+    if use_tools is None:
+        use_tools = settings.CHAT_TOOLS_ENABLED
+
+    scope = await chat_tools.tool_scope(user, is_admin) if use_tools else None
+    if scope is not None:
+        rag_context = scope.header()
+    elif is_admin:
+        rag_context = await get_admin_context(user, question=message)
+    else:
+        rag_context = await get_tenant_context(user, question=message)
+
+    # Detect maintenance ticket intent
+    wants_ticket = not is_admin and detect_ticket_intent(message)
+
+    context_prompt = f"PROPERTY DATA CONTEXT:\n{rag_context}"
     if wants_ticket:
-        system_prompt += """
+        context_prompt += """
 SPECIAL: The tenant seems to be reporting a maintenance issue. 
 Ask for: 1) What is the problem? 2) Which room/area? 3) How urgent is it?
 Then confirm you'll help them submit a maintenance request.
 """
 
+    # Stable prefix first (identical on every turn), per-turn context after it
+    messages = [
+        {"role": "system", "content": await cached_system_prompt(conversation, lambda: build_system_prompt(user, is_admin))},
+        {"role": "system", "content": context_prompt},
+    ]
+    messages += await memory_messages(conversation)
+    messages.append({"role": "user", "content": message})
+    return messages, wants_ticket, scope
+
+
+async def answer_with_tools(user, conversation, message, stream, rules=None):
+    """
+    Build the prompt and let the model run its tool lookups.
+    Returns (messages, wants_ticket, answer); answer is None when the model
+    still has to write it (with the tool results now in `messages`).
+
+    When streaming only one tool round is allowed, so the answer that follows
+    can be streamed. If Groq rejects the tool calling (e.g. a malformed call),
+    falls back to the prefetched context. Building-rules questions (`rules`,
+    from shared_rules_context()) get the rules-only prompt and no tools.
+    """
+    if rules is not None:
+        return build_rules_messages(message, rules[1]), False, None
+    messages, wants_ticket, scope = await build_chat_messages(user, conversation, message)
+    if scope is None:
+        return messages, wants_ticket, None
+
+    rounds = 1 if stream else settings.CHAT_TOOL_MAX_ROUNDS
+    try:
+        answer = await chat_tools.run_tools(messages, scope, rounds)
+    except (ai.AIRateLimited, ai.AIUnavailable):
+        raise
+    except ai.AIError as e:
+        logger.warning("Chat tools failed, using prefetched context: %s", e)
+        messages, wants_ticket, _ = await build_chat_messages(user, conversation, message, use_tools=False)
+        return messages, wants_ticket, None
+    return messages, wants_ticket, answer
+
+
+async def log_chat(user, conversation, message, ai_text, cache_hit=False):
+    try:
+        await record_turn(conversation, message, ai_text)
+        # Buffered, written in batches off the request path (see logwriter.py)
+        chat_log_writer.write(ChatLog.build(
+            organization_id=conversation.organization_id,
+            user=user,
+            conversation=conversation,
+            user_message=message,
+            response=ai_text,
+            cache_hit=cache_hit,
+        ))
+    except Exception:
+        logger.exception("Chat log failed")
+
+
+async def shared_rules_context(user, message):
+    """
+    (property_id, rules context) when a tenant asks a cacheable building-rules
+    question their building's RuleSections answer. The answer is then built
+    from the rules alone (build_rules_messages) and cached for the whole
+    building. None otherwise.
+    """
+    if is_admin_user(user) or not answer_cache.is_cacheable(message) or detect_ticket_intent(message):
+        return None
+    try:
+        return await get_rules_context(user, message)
+    except Exception as e:
+        logger.warning("Rules lookup failed, answering from the tenant context: %s", e)
+        return None
+
+
+async def find_cached_answer(user, message, rules=None):
+    """
+    Semantic answer cache lookup. Returns (slot, CachedAnswer or None), where
+    `slot` is what save_answer() needs to cache a fresh answer (None if this
+    question must not be cached). With `rules` (shared_rules_context()) the
+    building's shared scope is used.
+    """
+    is_admin = is_admin_user(user)
+    if not answer_cache.is_cacheable(message) or (not is_admin and detect_ticket_intent(message)):
+        return None, None
+    try:
+        if rules is not None:
+            scope = await answer_cache.rules_scope(rules[0])
+        else:
+            scope = await answer_cache.fingerprint(user, is_admin, message)
+        if scope is None:
+            return None, None
+        entry, embedding = await answer_cache.lookup(scope, message)
+    except Exception as e:
+        logger.warning("Answer cache unavailable: %s", e)
+        return None, None
+    return (scope, embedding), entry
+
+
+async def save_answer(user, conversation, message, ai_text, action, cache_slot):
+    """Store the turn, log it, and cache the answer for repeat questions."""
+    await log_chat(user, conversation, message, ai_text)
+    if cache_slot is None or not ai_text.strip():
+        return
+    scope, embedding = cache_slot
+    try:
+        await answer_cache.store(scope, message, ai_text, action, embedding)
+    except Exception as e:
+        logger.warning("Answer cache store failed: %s", e)
+
+
+def ticket_action(wants_ticket):
+    """Offer ticket creation in the chat UI."""
+    if not wants_ticket:
+        return None
+    return {
+        "type": "CREATE_TICKET",
+        "label": "Create Maintenance Request",
+        "route": "/tenant/maintenance",
+    }
+
+
+def _positive_int(value):
+    """`value` as a positive int (12 or "12"), else None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str) and value.strip().isdecimal():
+        value = int(value)
+    return value if isinstance(value, int) and value > 0 else None
+
+
+BUSY_MESSAGE = "I'm getting a lot of questions right now! Please try again in a moment."
+ERROR_MESSAGE = "Sorry, I ran into an issue. Please try again."
+
+
+@csrf_exempt
+@require_POST
+async def chat_view(request):
+    """
+    Phase 4: RAG Chatbot Concierge (Powered by Groq + Llama 3.3)
+    POST /api/chat/
+    Body: { "message": "...", "conversation_id": 12, "stream": false }
+
+    Turns are stored server-side: omit conversation_id to start a new
+    conversation and send back the id returned with the answer afterwards.
+
+    With "stream": true (or ?stream=1) the answer is sent as Server-Sent Events:
+    `token` events carrying {"delta": "..."} as Groq produces them, then one
+    `done` event with {"response": full_text, "action": ...}.
+
+    Async view: served from config/asgi.py (uvicorn), the LLM round-trip and
+    the context queries wait on the event loop instead of holding a worker.
+    """
+    user = await aauthenticate(request)
+    if user is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided or are invalid."}, status=401)
+
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({"detail": "JSON parse error."}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({"detail": "Expected a JSON object."}, status=400)
+
+    message = str(data.get('message', '')).strip()
+    stream = data.get('stream') in (True, 'true', '1') or request.GET.get('stream') in ('true', '1')
+    conversation_id = data.get('conversation_id')
+    if conversation_id is not None:
+        conversation_id = _positive_int(conversation_id)
+        if conversation_id is None:
+            return JsonResponse({"detail": "conversation_id must be a positive integer."}, status=400)
+
+    if not message:
+        return JsonResponse({"response": "Please type a message."}, status=400)
+
     # Check if Groq is available
-    if not groq_client:
-        return Response({
+    if not ai.is_configured(ai.GROQ):
+        return JsonResponse({
             "response": "I'm PropOS AI! My AI brain isn't connected yet (missing GROQ_API_KEY). Please set it up to enable full chat.",
             "action": None,
         })
 
+    if conversation_id:
+        conversation = await get_conversation(user, conversation_id)
+        if conversation is None:
+            return JsonResponse({"detail": "Conversation not found."}, status=404)
+    else:
+        conversation = await start_conversation(user)
+
+    # Same question (or a paraphrase) already answered against unchanged data?
+    # Building-rules questions are answered from the rules alone and shared by the building.
+    rules = await shared_rules_context(user, message)
+    cache_slot, cached = await find_cached_answer(user, message, rules)
+    if cached is not None:
+        await log_chat(user, conversation, message, cached.answer, cache_hit=True)
+        if stream:
+            return _sse_response(_sse_cached(conversation, cached))
+        return JsonResponse({
+            "response": cached.answer,
+            "action": cached.action,
+            "conversation_id": conversation.id,
+            "cached": True,
+        })
+
     try:
-        # Build messages for Groq
-        messages = [{"role": "system", "content": system_prompt}]
-        
-        for msg in history[-10:]:
-            if msg.get('sender') == 'user':
-                messages.append({"role": "user", "content": msg['text']})
-            elif msg.get('sender') == 'bot':
-                messages.append({"role": "assistant", "content": msg['text']})
-        
-        messages.append({"role": "user", "content": message})
-
-        # Call Groq API
-        response = groq_client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=messages,
-            temperature=0.7,
-            max_tokens=500,
-        )
-
-        ai_text = response.choices[0].message.content
-
-        # Log the chat
-        try:
-            org = user.organization if hasattr(user, 'organization') and user.organization else None
-            if org:
-                ChatLog.objects.create(
-                    organization=org,
-                    user_message=message,
-                    ai_response=ai_text[:500],
-                )
-        except Exception:
-            pass
-
-        # Detect if we should offer ticket creation
-        action = None
-        if wants_ticket:
-            action = {
-                "type": "CREATE_TICKET",
-                "label": "Create Maintenance Request",
-                "route": "/tenant/maintenance",
-            }
-
-        return Response({
+        messages, wants_ticket, ai_text = await answer_with_tools(user, conversation, message, stream, rules)
+        action = ticket_action(wants_ticket)
+
+        if stream:
+            if ai_text is not None:
+                deltas = _complete(ai_text)  # answered during the tool round
+            else:
+                deltas = await ai.achat_completion_stream(messages, temperature=0.7, max_tokens=500)
+            return _sse_response(_sse_events(user, conversation, message, deltas, action, cache_slot))
+
+        # Call Groq API (pooled async client, rate limited, retried)
+        if ai_text is None:
+            ai_text = await ai.achat_completion(messages, temperature=0.7, max_tokens=500)
+
+        # Store the turn, log the chat, cache the answer
+        await save_answer(user, conversation, message, ai_text, action, cache_slot)
+
+        return JsonResponse({
             "response": ai_text,
             "action": action,
+            "conversation_id": conversation.id,
         })
 
-    except Exception as e:
-        print(f"❌ Chat Error: {e}")
-        traceback.print_exc()
-        
-        if "rate_limit" in str(e).lower() or "429" in str(e):
-            return Response({
-                "response": "I'm getting a lot of questions right now! Please try again in a moment.",
-                "action": None,
-            })
-
-        return Response({
-            "response": "Sorry, I ran into an issue. Please try again.",
+    except (ai.AIRateLimited, ai.AIUnavailable) as e:
+        logger.warning("Chat AI busy: %s", e)
+        return JsonResponse({
+            "response": BUSY_MESSAGE,
+            "action": None,
+            "conversation_id": conversation.id,
+        })
+
+    except Exception:
+        logger.exception("Chat failed")
+
+        return JsonResponse({
+            "response": ERROR_MESSAGE,
             "action": None,
-        }, status=500)
\ No newline at end of file
+        }, status=500)
+
+
+# ═══════════════════════════════════════════════════
+# STREAMING (Server-Sent Events)
+# ═══════════════════════════════════════════════════
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _sse_events(user, conversation, message, deltas, action, cache_slot=None):
+    """Relay token deltas, then log the full answer once the stream has completed."""
+    parts = []
+    try:
+        async for delta in deltas:
+            parts.append(delta)
+            yield _sse('token', {'delta': delta})
+    except Exception:
+        logger.exception("Chat stream failed")
+        yield _sse('error', {'response': ERROR_MESSAGE})
+        return
+
+    ai_text = ''.join(parts)
+    await save_answer(user, conversation, message, ai_text, action, cache_slot)
+    yield _sse('done', {'response': ai_text, 'action': action, 'conversation_id': conversation.id})
+
+
+async def _complete(text):
+    yield text
+
+
+async def _sse_cached(conversation, cached):
+    yield _sse('token', {'delta': cached.answer})
+    yield _sse('done', {'response': cached.answer, 'action': cached.action, 'conversation_id': conversation.id, 'cached': True})
+
+
+def _sse_response(events):
+    # An async iterator streams chunk by chunk under ASGI. (Under WSGI / runserver
+    # Django has to collect it first, so the answer arrives in one piece.)
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # disable proxy buffering (nginx)
+    return response
+
+
+# ═══════════════════════════════════════════════════
+# NOTIFICATION FEED (notifications.py)
+# ═══════════════════════════════════════════════════
+
+NOTIFICATION_PAGE_SIZE = 50
+
+
+def _encode_cursor(cursor):
+    created_at, pk = cursor
+    return f"{created_at.isoformat()}_{pk}"
+
+
+def _decode_cursor(value):
+    created_at, _, pk = value.rpartition('_')
+    return datetime.fromisoformat(created_at), int(pk)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def notification_feed(request):
+    """Newest first: ?unread=1 for unread only, ?cursor=<next> for the following page."""
+    try:
+        cursor = _decode_cursor(request.query_params['cursor']) if request.query_params.get('cursor') else None
+    except ValueError:
+        return Response({"error": "Invalid cursor."}, status=400)
+    unread_only = request.query_params.get('unread') in ('1', 'true')
+    rows, next_cursor = notifications.feed(request.user, cursor, unread_only, NOTIFICATION_PAGE_SIZE)
+    return Response({
+        'results': rows,
+        'unread': notifications.unread_count(request.user),
+        'next': _encode_cursor(next_cursor) if next_cursor else None,
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def mark_notifications_read(request):
+    """Mark {"ids": [...]} read, or every notification when no ids are given."""
+    ids = request.data.get('ids')
+    if ids is not None and (not isinstance(ids, list) or not all(isinstance(i, int) for i in ids)):
+        return Response({"error": "ids must be a list of notification ids."}, status=400)
+    updated = notifications.mark_read(request.user, ids)
+    return Response({'updated': updated, 'unread': notifications.unread_count(request.user)})
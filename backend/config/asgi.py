@@ -2,6 +2,13 @@
 ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Served by uvicorn (see docker-compose.yml) so async views such as the chatbot
+can wait on the LLM without holding a worker:
+
+    uvicorn config.asgi:application --host 0.0.0.0 --port 8000
+
+WebSocket connections (live updates, /ws/updates/) are answered by
+communication/realtime.py; everything else goes to Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -14,3 +21,20 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402  (settings are configured above)
+
+from communication.realtime import websocket_application  # noqa: E402
+
+if settings.DEBUG:
+    # runserver serves static files itself; uvicorn needs the handler (admin CSS etc.)
+    from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
+    application = ASGIStaticFilesHandler(application)
+
+http_application = application
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        return await websocket_application(scope, receive, send)
+    return await http_application(scope, receive, send)
@@ -1,5 +1,8 @@
 import os
 from celery import Celery
+from celery.signals import before_task_publish, task_postrun, task_prerun
+
+from core.log import current_request_id, request_id
 
 # Set the default Django settings module
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
@@ -10,4 +13,25 @@ app = Celery('propos')
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
 # Auto-discover tasks in all installed apps
-app.autodiscover_tasks()
\ No newline at end of file
+app.autodiscover_tasks()
+
+
+# Tasks log with the request id of the request that queued them (core/log.py)
+@before_task_publish.connect
+def _send_request_id(headers=None, **kwargs):
+    value = current_request_id()
+    if value and headers is not None:
+        headers.setdefault('request_id', value)
+
+
+@task_prerun.connect
+def _set_request_id(task_id=None, task=None, **kwargs):
+    value = getattr(task.request, 'request_id', None) or current_request_id() or task_id
+    task.request.request_id_token = request_id.set(value)
+
+
+@task_postrun.connect
+def _reset_request_id(task=None, **kwargs):
+    token = getattr(task.request, 'request_id_token', None)
+    if token is not None:
+        request_id.reset(token)
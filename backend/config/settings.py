@@ -29,6 +29,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     'rest_framework',
     'corsheaders',
@@ -43,6 +44,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.log.RequestIdMiddleware',  # first: everything after it logs with the request id
+    'core.instrumentation.RequestMetricsMiddleware',  # times the whole stack
+    'core.profiling.ProfilingMiddleware',  # opt-in, see PROFILING_* below
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -74,6 +78,17 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 
 # Database
+# Connection reuse (compare with `manage.py db_connection_benchmark`):
+#   DB_POOL=True      psycopg 3 connection pool per process — the right choice under
+#                     uvicorn/ASGI, where per-thread persistent connections don't get recycled
+#   DB_CONN_MAX_AGE   otherwise, seconds a connection is kept between requests / Celery
+#                     tasks (0 = new connection every time, None = unlimited)
+#   DB_PGBOUNCER=True behind PgBouncer in transaction mode: no server-side cursors (and
+#                     leave pooling to PgBouncer, DB_POOL=False)
+DB_POOL = os.environ.get('DB_POOL', 'True').lower() in ('true', '1', 'yes')
+DB_PGBOUNCER = os.environ.get('DB_PGBOUNCER', 'False').lower() in ('true', '1', 'yes')
+_conn_max_age = os.environ.get('DB_CONN_MAX_AGE', '60')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -81,7 +96,28 @@ DATABASES = {
         'USER': os.environ.get('POSTGRES_USER', 'propos_user'),
         'PASSWORD': os.environ.get('POSTGRES_PASSWORD', 'propos_password'),
         'HOST': os.environ.get('POSTGRES_HOST', 'db'),
-        'PORT': '5432',
+        'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+        # The pool manages connection lifetime itself; Django requires 0 with it
+        'CONN_MAX_AGE': 0 if DB_POOL else (None if _conn_max_age.lower() == 'none' else int(_conn_max_age)),
+        # Check a reused connection before the first query of a request
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'True').lower() in ('true', '1', 'yes'),
+        'DISABLE_SERVER_SIDE_CURSORS': DB_PGBOUNCER,
+        'OPTIONS': {
+            'pool': {
+                'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+                'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '20')),
+                'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+            },
+        } if DB_POOL else {},
+    }
+}
+
+
+# Cache (Redis) — used for chatbot context and other shared, invalidatable data
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('CACHE_URL', 'redis://redis:6379/1'),
     }
 }
 
@@ -126,7 +162,7 @@ if DEBUG:
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -141,6 +177,10 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
 }
 
+# Seconds an authenticated user (with organization / managed property) is served
+# from the cache by CachedJWTAuthentication; saves drop it earlier (core/signals.py)
+AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', '300'))
+
 
 # Media Files (User Uploads)
 MEDIA_URL = '/media/'
@@ -155,4 +195,153 @@ CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://redis:6379/0')
 CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND', 'redis://redis:6379/0')
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
-CELERY_RESULT_SERIALIZER = 'json'
\ No newline at end of file
+CELERY_RESULT_SERIALIZER = 'json'
+# Keep LOGGING (JSON, request ids) in the worker instead of Celery's own handlers
+CELERY_WORKER_HIJACK_ROOT_LOGGER = False
+# Logging (core/log.py): records are queued and written by a background thread, one JSON
+# object per line (LOG_FORMAT=text for a human-readable console), each with the request id.
+# LOG_LEVELS overrides per logger, e.g. LOG_LEVELS="ai=DEBUG,django.db.backends=DEBUG".
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+_log_levels = {
+    'django': 'INFO',
+    'django.db.backends': 'WARNING',
+    'django.request': 'WARNING',
+    'celery': 'INFO',
+    **{app: LOG_LEVEL for app in ('ai', 'communication', 'core', 'finance', 'maintenance', 'properties', 'tenants')},
+}
+for _item in filter(None, os.environ.get('LOG_LEVELS', '').split(',')):
+    _name, _, _level = _item.partition('=')
+    _log_levels[_name.strip()] = _level.strip().upper()
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'queue': {
+            '()': 'core.log.QueueingHandler',
+            'as_json': LOG_FORMAT == 'json',
+        },
+    },
+    'root': {'handlers': ['queue'], 'level': 'WARNING'},
+    'loggers': {name: {'level': level} for name, level in _log_levels.items()},
+}
+
+# Request instrumentation (core/instrumentation.py): Server-Timing headers, /metrics, and a
+# warning when one statement runs N_PLUS_ONE_THRESHOLD+ times in a request
+REQUEST_METRICS_ENABLED = os.environ.get('REQUEST_METRICS_ENABLED', 'True').lower() in ('true', '1', 'yes')
+N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', '10'))
+# Bearer token Prometheus sends to /metrics (without one, /metrics is only served when DEBUG)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Request profiling (core/profiling.py), off by default. Requests sent with
+# `X-Profile: <PROFILING_TOKEN>` are always profiled; a PROFILING_SAMPLE_RATE
+# share of the rest is, and kept when slower than PROFILING_SLOW_MS.
+# Captured traces are listed in the admin (Request profiles), slowest first.
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'False').lower() in ('true', '1', 'yes')
+PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN', '')
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_SLOW_MS = float(os.environ.get('PROFILING_SLOW_MS', '500'))
+PROFILING_BACKEND = os.environ.get('PROFILING_BACKEND', 'auto')  # auto (pyinstrument if installed) | pyinstrument | cprofile
+PROFILING_KEEP = int(os.environ.get('PROFILING_KEEP', '500'))
+PROFILING_MAX_QUERIES = 500  # statements stored per profile
+
+# Safety-net TTL for cached finance reports (finance/reports.py; data changes invalidate them)
+REPORTS_CACHE_TTL = int(os.environ.get('REPORTS_CACHE_TTL', '600'))
+
+# Periodic jobs (run by `celery -A config beat`)
+CELERY_BEAT_SCHEDULE = {
+    'purge-chat-answer-cache': {
+        'task': 'communication.tasks.purge_answer_cache',
+        'schedule': 60 * 60,
+    },
+    'rollup-chat-logs': {
+        'task': 'communication.tasks.rollup_chat_logs',
+        'schedule': 60 * 60 * 24,
+    },
+    'deposit-due-cheques': {
+        'task': 'finance.tasks.deposit_due_cheques',
+        'schedule': 60 * 60 * 24,
+    },
+    'notify-payments-due': {
+        'task': 'communication.tasks.notify_payments_due',
+        'schedule': 60 * 60 * 24,
+    },
+}
+# Cheques per UPDATE / history insert in batch status transitions (finance/lifecycle.py)
+CHEQUE_TRANSITION_BATCH_SIZE = 5000
+# Days after its date a cheque may appear on a bank statement (finance/reconciliation.py)
+RECONCILIATION_DATE_WINDOW_DAYS = int(os.environ.get('RECONCILIATION_DATE_WINDOW_DAYS', '14'))
+# Notification feed (communication/notifications.py): tenants hear about PENDING cheques
+# this many days ahead; notifications older than the retention are deleted
+PAYMENT_DUE_NOTICE_DAYS = 7
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', '90'))
+# Live updates over WebSockets (communication/realtime.py): Redis pub/sub fan-out, and how many
+# events a socket may fall behind before it is closed
+REALTIME_ENABLED = os.environ.get('REALTIME_ENABLED', 'True').lower() in ('true', '1', 'yes')
+REALTIME_REDIS_URL = os.environ.get('REALTIME_REDIS_URL', 'redis://redis:6379/2')
+REALTIME_QUEUE_SIZE = 200
+# Run tasks inline (no worker needed) — handy for local dev & scripts
+CELERY_TASK_ALWAYS_EAGER = os.environ.get('CELERY_TASK_ALWAYS_EAGER', 'False').lower() in ('true', '1', 'yes')
+
+# AI Client (shared by chatbot, smart pricing & maintenance triage — see ai/client.py)
+AI_REQUEST_TIMEOUT = float(os.environ.get('AI_REQUEST_TIMEOUT', '30'))
+AI_MAX_RETRIES = int(os.environ.get('AI_MAX_RETRIES', '3'))
+AI_BACKOFF_BASE = float(os.environ.get('AI_BACKOFF_BASE', '1.0'))
+AI_BACKOFF_MAX = float(os.environ.get('AI_BACKOFF_MAX', '20.0'))
+# Requests per minute, per process (free-tier defaults)
+AI_RATE_LIMITS = {
+    'groq': int(os.environ.get('GROQ_RPM', '30')),
+    'gemini': int(os.environ.get('GEMINI_RPM', '15')),
+}
+# How long a request may queue for a rate-limit token before giving up
+AI_RATE_LIMIT_MAX_WAIT = float(os.environ.get('AI_RATE_LIMIT_MAX_WAIT', '10'))
+AI_CIRCUIT_BREAKER = {
+    'failure_threshold': int(os.environ.get('AI_BREAKER_THRESHOLD', '5')),
+    'reset_timeout': float(os.environ.get('AI_BREAKER_RESET', '30')),
+}
+
+# Safety-net TTL for cached chatbot context sections (signals invalidate them on change)
+CHAT_CONTEXT_TTL = int(os.environ.get('CHAT_CONTEXT_TTL', '600'))
+
+# Server-side chat memory (communication.Conversation): the last
+# CHAT_RECENT_MESSAGES turns are sent verbatim; once more than
+# CHAT_SUMMARIZE_AFTER are unsummarized the older ones are folded into the summary.
+CHAT_RECENT_MESSAGES = int(os.environ.get('CHAT_RECENT_MESSAGES', '6'))
+CHAT_SUMMARIZE_AFTER = int(os.environ.get('CHAT_SUMMARIZE_AFTER', '12'))
+
+# Semantic answer cache (communication/answer_cache.py): reuse answers to repeated or
+# paraphrased questions while the underlying data is unchanged
+CHAT_ANSWER_CACHE_ENABLED = os.environ.get('CHAT_ANSWER_CACHE_ENABLED', 'True').lower() in ('true', '1', 'yes')
+CHAT_ANSWER_CACHE_TTL = int(os.environ.get('CHAT_ANSWER_CACHE_TTL', '3600'))
+CHAT_ANSWER_CACHE_SIMILARITY = float(os.environ.get('CHAT_ANSWER_CACHE_SIMILARITY', '0.92'))
+
+# Chat analytics logs (communication/logwriter.py): buffered per process and bulk-inserted
+# every CHAT_LOG_FLUSH_INTERVAL seconds or CHAT_LOG_BATCH_SIZE rows; rolled up into daily
+# stats and deleted after CHAT_LOG_RETENTION_DAYS
+CHAT_LOG_BATCH_SIZE = int(os.environ.get('CHAT_LOG_BATCH_SIZE', '200'))
+CHAT_LOG_FLUSH_INTERVAL = float(os.environ.get('CHAT_LOG_FLUSH_INTERVAL', '5'))
+CHAT_LOG_MAX_BUFFER = int(os.environ.get('CHAT_LOG_MAX_BUFFER', '10000'))
+CHAT_LOG_RETENTION_DAYS = int(os.environ.get('CHAT_LOG_RETENTION_DAYS', '90'))
+
+# Chatbot function calling (communication/tools.py): the model looks data up through scoped
+# read-only tools instead of getting prefetched context; up to CHAT_TOOL_MAX_ROUNDS rounds
+CHAT_TOOLS_ENABLED = os.environ.get('CHAT_TOOLS_ENABLED', 'True').lower() in ('true', '1', 'yes')
+CHAT_TOOL_MAX_ROUNDS = int(os.environ.get('CHAT_TOOL_MAX_ROUNDS', '3'))
+
+# Chatbot retrieval: embed portfolio records (pgvector) and only send the top-k to the LLM
+CHAT_RETRIEVAL_ENABLED = os.environ.get('CHAT_RETRIEVAL_ENABLED', 'True').lower() in ('true', '1', 'yes')
+CHAT_RETRIEVAL_TOP_K = int(os.environ.get('CHAT_RETRIEVAL_TOP_K', '12'))
+# 'gemini' (text-embedding-004) or 'hashing' (offline). Changing it requires `manage.py rebuild_chat_index`.
+AI_EMBEDDER = os.environ.get('AI_EMBEDDER', 'gemini' if os.environ.get('GENAI_API_KEY') else 'hashing')
+
+# 'live' = real Gemini/Groq, 'stub' = local fake provider for offline load tests (ai/stub.py)
+AI_BACKEND = os.environ.get('AI_BACKEND', 'live')
+AI_STUB = {
+    'latency_ms': float(os.environ.get('AI_STUB_LATENCY_MS', '300')),
+    'jitter_ms': float(os.environ.get('AI_STUB_JITTER_MS', '100')),
+    'token_ms': float(os.environ.get('AI_STUB_TOKEN_MS', '20')),
+    'rate_limit_rate': float(os.environ.get('AI_STUB_429_RATE', '0')),
+    'malformed_rate': float(os.environ.get('AI_STUB_MALFORMED_RATE', '0')),
+    'seed': int(os.environ.get('AI_STUB_SEED', '42')),
+}
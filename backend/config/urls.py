@@ -6,7 +6,11 @@ from django.conf.urls.static import static
 
 # Import Views
 from core.views import dashboard_stats, MyTokenObtainPairView, manager_stats, update_property_rules
-from finance.views import ChequeViewSet
+from core.instrumentation import metrics_view
+from finance.views import (
+    ChequeViewSet, aging_report, apply_bank_statement, bank_statement_detail, bank_statements, rent_roll_report,
+    revenue_report,
+)
 from properties.views import PropertyViewSet, UnitViewSet, smart_pricing
 from tenants.views import TenantViewSet, LeaseViewSet, MyTenantProfileView, generate_ejari
 from rest_framework_simplejwt.views import TokenRefreshView
@@ -50,9 +54,22 @@ urlpatterns = [
     path('api/manager/stats/', manager_stats, name='manager_stats'),
     path('api/properties/<int:property_id>/rules/', update_property_rules, name='update_property_rules'),
     
+    # Finance reports (finance/reports.py); add ?export=csv to download
+    path('api/reports/rent-roll/', rent_roll_report, name='rent_roll_report'),
+    path('api/reports/aging/', aging_report, name='aging_report'),
+    path('api/reports/revenue/', revenue_report, name='revenue_report'),
+
+    # Bank statement reconciliation (finance/reconciliation.py)
+    path('api/reconciliation/', bank_statements, name='bank_statements'),
+    path('api/reconciliation/<int:statement_id>/', bank_statement_detail, name='bank_statement_detail'),
+    path('api/reconciliation/<int:statement_id>/apply/', apply_bank_statement, name='apply_bank_statement'),
+
     # Authentication
     path('api/token/', MyTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+
+    # Prometheus scrape endpoint (core/instrumentation.py)
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 if settings.DEBUG:
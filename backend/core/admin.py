@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Organization
+from django.utils.html import format_html, format_html_join
+from .models import User, Organization, RequestProfile
 
 class CustomUserAdmin(UserAdmin):
     # 1. Add your new fields to the "Edit User" form
@@ -21,4 +22,33 @@ class CustomUserAdmin(UserAdmin):
 
 # Register the models
 admin.site.register(User, CustomUserAdmin)
-admin.site.register(Organization)
\ No newline at end of file
+admin.site.register(Organization)
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    """Profiled requests (core/profiling.py), slowest first."""
+    list_display = ('view', 'method', 'status', 'duration_ms', 'query_count', 'query_ms', 'trigger', 'user', 'created_at')
+    list_filter = ('view', 'trigger', 'method', 'status')
+    list_select_related = ('user',)
+    search_fields = ('path', 'request_id')
+    ordering = ('-duration_ms',)
+    date_hierarchy = 'created_at'
+    exclude = ('queries', 'report')
+    readonly_fields = ('request_id', 'user', 'method', 'path', 'view', 'status', 'duration_ms',
+                       'query_count', 'query_ms', 'trigger', 'profiler', 'created_at', 'report_text', 'query_list')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description='Profile')
+    def report_text(self, obj):
+        return format_html('<pre style="white-space: pre; overflow-x: auto">{}</pre>', obj.report)
+
+    @admin.display(description='Queries')
+    def query_list(self, obj):
+        return format_html('<pre style="white-space: pre-wrap">{}</pre>', format_html_join(
+            '\n', '{} ms  {}', ((f"{query['ms']:8.2f}", query['sql']) for query in obj.queries)))
@@ -0,0 +1,130 @@
+"""
+JWT authentication with a cached user.
+
+A plain JWTAuthentication loads the user on every request, and most views
+then touch user.organization / user.managed_property (one query each). Here
+the user is loaded once with both relations and kept in the cache for
+AUTH_USER_CACHE_TTL seconds, so an authenticated request costs no queries
+before the view does its own work.
+
+The cached entry is dropped when the user, their organization or their
+managed property is saved or deleted (core/signals.py). Changes made with
+queryset.update() don't send signals; for those the token's claims act as a
+check: a token issued after the entry was cached whose `role` or
+`organization_id` claim disagrees with it forces a reload. Otherwise the
+entry is at most AUTH_USER_CACHE_TTL old.
+
+DRF's authentication classes are sync-only, so the async chat view validates
+the same simplejwt access token itself with aauthenticate().
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import User
+
+
+def _cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def invalidate_users(user_ids):
+    """Drop the cached principals of these users."""
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
+
+
+def _users():
+    return User.objects.select_related('organization', 'managed_property')
+
+
+def _is_fresh(entry, token):
+    """False if the token was issued after `entry` was cached and its claims disagree with it."""
+    user, cached_at = entry
+    if token.get('iat', 0) < cached_at:
+        return True
+    return (
+        token.get('role', user.role) == user.role
+        and token.get('organization_id', user.organization_id) == user.organization_id
+    )
+
+
+def _check(user, token):
+    """simplejwt's checks on a loaded user."""
+    if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+        raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+    if api_settings.CHECK_REVOKE_TOKEN and token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+        raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+    return user
+
+
+def _user_id(token):
+    try:
+        return token[api_settings.USER_ID_CLAIM]
+    except KeyError as e:
+        raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that serves the user (with organization and managed property) from the cache."""
+
+    def get_user(self, validated_token):
+        user_id = _user_id(validated_token)
+        key = _cache_key(user_id)
+        entry = cache.get(key)
+        if entry is None or not _is_fresh(entry, validated_token):
+            cached_at = int(time.time())
+            user = _users().filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+            if user is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            entry = (user, cached_at)
+            cache.set(key, entry, settings.AUTH_USER_CACHE_TTL)
+        return _check(entry[0], validated_token)
+
+
+async def aauthenticate(request):
+    """
+    User for the request's `Authorization: Bearer <access token>` header, or None.
+    Same cache as CachedJWTAuthentication; the organization and managed property
+    are always loaded with the user, since lazy relation access is not allowed
+    from async code.
+    """
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    if header is None:
+        return None
+    raw_token = auth.get_raw_token(header)
+    if raw_token is None:
+        return None
+    user, _ = await aauthenticate_token(raw_token)
+    return user
+
+
+async def aauthenticate_token(raw_token):
+    """(user, validated token) for a raw access token, or (None, None). Used as-is by WebSockets (?token=)."""
+    try:
+        token = JWTAuthentication().get_validated_token(raw_token)
+        user_id = _user_id(token)
+    except (InvalidToken, TokenError):
+        return None, None
+
+    key = _cache_key(user_id)
+    entry = await cache.aget(key)
+    if entry is None or not _is_fresh(entry, token):
+        cached_at = int(time.time())
+        user = await _users().filter(**{api_settings.USER_ID_FIELD: user_id}).afirst()
+        if user is None:
+            return None, None
+        entry = (user, cached_at)
+        await cache.aset(key, entry, settings.AUTH_USER_CACHE_TTL)
+
+    try:
+        return _check(entry[0], token), token
+    except AuthenticationFailed:
+        return None, None
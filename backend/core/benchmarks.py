@@ -0,0 +1,72 @@
+"""
+Small helpers shared by the load-test / benchmark management commands.
+"""
+
+import asyncio
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)."""
+    if not values:
+        return 0
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100.0 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def run_load(worker, total, concurrency):
+    """
+    Call `worker(i)` `total` times from `concurrency` threads.
+    `worker` returns a dict; each result gets `latency_ms` added.
+    Returns (results, wall_seconds).
+    """
+    def timed(i):
+        started = time.perf_counter()
+        try:
+            result = worker(i)
+        finally:
+            connections.close_all()  # each worker thread holds its own DB connection
+        result['latency_ms'] = (time.perf_counter() - started) * 1000
+        return result
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(total)))
+    return results, time.perf_counter() - started
+
+
+async def arun_load(worker, total, concurrency):
+    """
+    run_load() for coroutines: `await worker(i)` `total` times with at most
+    `concurrency` in flight on the current event loop.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(i):
+        async with semaphore:
+            started = time.perf_counter()
+            result = await worker(i)
+            result['latency_ms'] = (time.perf_counter() - started) * 1000
+            return result
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(timed(i) for i in range(total)))
+    return list(results), time.perf_counter() - started
+
+
+def summarize(results, wall_seconds):
+    """Latency percentiles and throughput for a list of run_load() results."""
+    latencies = [r['latency_ms'] for r in results]
+    return {
+        'requests': len(results),
+        'throughput_rps': round(len(results) / wall_seconds, 2) if wall_seconds else 0,
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+        'p99_ms': round(percentile(latencies, 99), 1),
+        'max_ms': round(max(latencies), 1) if latencies else 0,
+    }
@@ -0,0 +1,297 @@
+"""
+Per-request SQL and latency instrumentation.
+
+RequestMetricsMiddleware times every request and counts the SQL it runs:
+
+  - Server-Timing header:  `app;dur=41.2, db;dur=12.8;desc="14 queries"`,
+    visible in the browser's network tab.
+  - /metrics:              Prometheus text format, per view (URL name):
+    requests, latency histogram, queries and DB time, repeated-query
+    requests, plus the AI client's counters (ai.get_metrics()).
+  - N+1 detection:         the same statement (SQL normalized: parameters
+    and IN-lists collapsed) running N_PLUS_ONE_THRESHOLD times or more in one
+    request is logged with the view name and counted in /metrics.
+
+Queries are seen through an execute wrapper installed on every database
+connection (core/signals.py) that reports to the request in a context
+variable, so ORM calls made from async views via sync_to_async are counted
+too. Rows fetched while a streaming response is being sent are not.
+
+Metrics live in process memory: each uvicorn worker serves its own numbers.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from ai import get_metrics as get_ai_metrics
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_metrics', default=None)
+
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Repeated statements kept per view for /metrics
+MAX_REPEATED_PER_VIEW = 10
+
+_IN_LIST_RE = re.compile(r"\(\s*%s(?:\s*,\s*%s)*\s*\)")
+_VALUES_RE = re.compile(r"(\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+")
+_NUMBER_RE = re.compile(r"\b\d+\b")
+
+
+def normalize_sql(sql):
+    """Statement shape: `IN (%s, %s)` / `VALUES (%s), (%s)` → `(...)`, inline numbers (LIMIT 21) → `?`."""
+    sql = _IN_LIST_RE.sub('(...)', sql)
+    sql = _VALUES_RE.sub(r'\1', sql)
+    return _NUMBER_RE.sub('?', sql)
+
+
+# ═══════════════════════════════════════════════════
+# QUERY RECORDING
+# ═══════════════════════════════════════════════════
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements = Counter()
+        # [(sql, ms)] of every statement, only while query_log() is active
+        self.log = None
+
+    def repeated(self):
+        """[(normalized sql, count)] of statements run at least N_PLUS_ONE_THRESHOLD times."""
+        threshold = settings.N_PLUS_ONE_THRESHOLD
+        return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+
+def record_queries(execute, sql, params, many, context):
+    """Execute wrapper (connection.execute_wrapper) reporting to the current request, if any."""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_seconds += time.perf_counter() - started
+        stats.queries += 1
+        stats.statements[normalize_sql(sql)] += 1
+        if stats.log is not None:
+            stats.log.append((sql, (time.perf_counter() - started) * 1000))
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """connection_created receiver: keep record_queries on every connection wrapper."""
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_queries)
+
+
+@contextmanager
+def query_log():
+    """
+    Keep every statement of the current request in `stats.log` while active
+    (profiling.py). Yields the request's RequestStats, or a private one when
+    the metrics middleware is disabled.
+    """
+    stats = _current.get()
+    reset = None
+    if stats is None:
+        stats = RequestStats()
+        reset = _current.set(stats)
+    stats.log = []
+    try:
+        yield stats
+    finally:
+        if reset is not None:
+            _current.reset(reset)
+
+
+# ═══════════════════════════════════════════════════
+# METRICS REGISTRY
+# ═══════════════════════════════════════════════════
+
+_views = defaultdict(lambda: defaultdict(float))
+_buckets = defaultdict(lambda: [0] * len(LATENCY_BUCKETS))
+_repeated = defaultdict(dict)
+_lock = threading.Lock()
+
+
+def _observe(view, method, status, stats, seconds, repeated):
+    with _lock:
+        values = _views[(view, method)]
+        values['requests'] += 1
+        values[f'status_{status // 100}xx'] += 1
+        values['seconds'] += seconds
+        values['queries'] += stats.queries
+        values['db_seconds'] += stats.db_seconds
+        values['max_queries'] = max(values['max_queries'], stats.queries)
+        if repeated:
+            values['n_plus_one'] += 1
+        counts = _buckets[(view, method)]
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                counts[i] += 1
+
+        known = _repeated[view]
+        for sql, count in repeated:
+            if sql in known or len(known) < MAX_REPEATED_PER_VIEW:
+                known[sql] = max(known.get(sql, 0), count)
+
+
+def get_request_metrics():
+    """Snapshot: {(view, method): {requests, seconds, queries, db_seconds, max_queries, n_plus_one, status_Nxx}}."""
+    with _lock:
+        return {key: dict(values) for key, values in _views.items()}
+
+
+def reset_request_metrics():
+    with _lock:
+        _views.clear()
+        _buckets.clear()
+        _repeated.clear()
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+def render_metrics():
+    """All counters in the Prometheus text exposition format."""
+    with _lock:
+        views = {key: dict(values) for key, values in _views.items()}
+        buckets = {key: list(counts) for key, counts in _buckets.items()}
+        repeated = {view: dict(statements) for view, statements in _repeated.items()}
+
+    lines = []
+
+    def sample(name, labels, value):
+        label_text = ','.join(f'{key}="{_label(val)}"' for key, val in labels.items())
+        lines.append(f"{name}{{{label_text}}} {value:g}")
+
+    def family(name, kind, help_text, samples, suffix=''):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            sample(name + suffix, labels, value)
+
+    def by_view(field):
+        return [({'view': view, 'method': method}, values.get(field, 0)) for (view, method), values in sorted(views.items())]
+
+    family('propos_http_requests_total', 'counter', "HTTP requests by view, method and status class.", [
+        ({'view': view, 'method': method, 'status': key[len('status_'):]}, value)
+        for (view, method), values in sorted(views.items())
+        for key, value in sorted(values.items()) if key.startswith('status_')
+    ])
+
+    histogram = []
+    for (view, method), counts in sorted(buckets.items()):
+        for bound, count in zip(LATENCY_BUCKETS, counts):
+            histogram.append(({'view': view, 'method': method, 'le': f"{bound:g}"}, count))
+        histogram.append(({'view': view, 'method': method, 'le': '+Inf'}, views[(view, method)]['requests']))
+    family('propos_http_request_duration_seconds', 'histogram', "Request latency.", histogram, suffix='_bucket')
+    for labels, value in by_view('seconds'):
+        sample('propos_http_request_duration_seconds_sum', labels, value)
+    for labels, value in by_view('requests'):
+        sample('propos_http_request_duration_seconds_count', labels, value)
+    family('propos_db_queries_total', 'counter', "SQL statements run by requests.", by_view('queries'))
+    family('propos_db_query_duration_seconds_sum', 'counter', "Time spent in SQL by requests.", by_view('db_seconds'))
+    family('propos_db_queries_max', 'gauge', "Most SQL statements run by a single request.", by_view('max_queries'))
+    family('propos_n_plus_one_requests_total', 'counter',
+           f"Requests that ran one statement {settings.N_PLUS_ONE_THRESHOLD}+ times.", by_view('n_plus_one'))
+    family('propos_repeated_query_max', 'gauge', "Most runs of a repeated statement in one request.", [
+        ({'view': view, 'sql': sql[:200]}, count)
+        for view, statements in sorted(repeated.items()) for sql, count in sorted(statements.items())
+    ])
+
+    ai_metrics = get_ai_metrics()
+    fields = sorted({field for values in ai_metrics.values() for field in values})
+    for field in fields:
+        family(f'propos_ai_{field}', 'gauge' if field.endswith('_max_seconds') else 'counter', f"AI client {field}.", [
+            ({'provider': provider, 'task': task}, values.get(field, 0))
+            for (provider, task), values in sorted(ai_metrics.items())
+        ])
+
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    GET /metrics for Prometheus. With METRICS_TOKEN set it must be sent as
+    `Authorization: Bearer <token>`; without one it is only served in DEBUG.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        if not constant_time_compare(request.headers.get('Authorization', ''), f"Bearer {token}"):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# ═══════════════════════════════════════════════════
+# MIDDLEWARE
+# ═══════════════════════════════════════════════════
+
+class RequestMetricsMiddleware:
+    """Times each request, counts its SQL, adds Server-Timing and feeds /metrics. Sync and async."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.REQUEST_METRICS_ENABLED:
+            return self.get_response(request)
+        stats = RequestStats()
+        reset = _current.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(reset)
+        return self._finish(request, response, stats)
+
+    async def __acall__(self, request):
+        if not settings.REQUEST_METRICS_ENABLED:
+            return await self.get_response(request)
+        stats = RequestStats()
+        reset = _current.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(reset)
+        return self._finish(request, response, stats)
+
+    def _finish(self, request, response, stats):
+        seconds = time.perf_counter() - stats.started
+        match = request.resolver_match
+        view = (match.view_name or match._func_path) if match else 'unresolved'
+        if view == 'metrics':
+            return response
+
+        repeated = stats.repeated()
+        for sql, count in repeated:
+            logger.warning("Possible N+1 in %s %s: statement ran %d times: %s", request.method, view, count, sql[:300])
+        _observe(view, request.method, response.status_code, stats, seconds, repeated)
+
+        timing = f'app;dur={seconds * 1000:.1f}, db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries"'
+        if response.has_header('Server-Timing'):
+            timing = f"{response['Server-Timing']}, {timing}"
+        response['Server-Timing'] = timing
+        return response
@@ -0,0 +1,168 @@
+"""
+Logging plumbing: request IDs, JSON records and a non-blocking handler.
+
+    LOGGING = {... 'handlers': {'queue': {'()': 'core.log.QueueingHandler', 'as_json': True}} ...}
+
+  - RequestIdMiddleware     gives every request an id (the incoming
+                            X-Request-ID header if it looks sane, else a new
+                            one), echoes it in the response, and keeps it in a
+                            context variable for the duration of the request.
+                            Celery tasks inherit the id of the request that
+                            queued them (config/celery.py).
+  - RequestIdFilter         stamps `request_id` on each record.
+  - JSONFormatter           one JSON object per line: time, level, logger,
+                            message, request_id, source location, exception,
+                            and any `extra={...}` fields.
+  - QueueingHandler         the calling thread only puts the record on a
+                            queue; a QueueListener thread formats and writes
+                            it, so a slow stdout never stalls a request.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+request_id = ContextVar('request_id', default=None)
+
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+# Attributes every LogRecord has; anything else came from `extra=`
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+
+def current_request_id():
+    return request_id.get()
+
+
+# ═══════════════════════════════════════════════════
+# RECORDS
+# ═══════════════════════════════════════════════════
+
+class RequestIdFilter(logging.Filter):
+    """Adds `record.request_id` ('-' outside a request). Runs in the emitting thread."""
+
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            record.request_id = request_id.get() or '-'
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', '-'),
+            'where': f"{record.module}.{record.funcName}:{record.lineno}",
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data['exception'] = record.exc_text
+        if record.stack_info:
+            data['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+TEXT_FORMAT = "%(asctime)s %(levelname)-7s [%(request_id)s] %(name)s: %(message)s"
+
+
+class QueueingHandler(QueueHandler):
+    """
+    Queue in front of a stdout StreamHandler (JSON or text lines). The listener
+    thread starts with the handler, is restarted in forked children (Celery's
+    prefork pool) and is stopped, draining the queue, at exit.
+    """
+
+    def __init__(self, as_json=True, stream=None):
+        super().__init__(queue.SimpleQueue())
+        target = logging.StreamHandler(stream or sys.stdout)
+        target.setFormatter(JSONFormatter() if as_json else logging.Formatter(TEXT_FORMAT))
+        self.addFilter(RequestIdFilter())
+        self.listener = QueueListener(self.queue, target)
+        self.listener.start()
+        atexit.register(self._stop)
+        os.register_at_fork(after_in_child=self._restart)
+
+    def _stop(self):
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def _restart(self):
+        # The listener thread doesn't survive fork(); give the child its own
+        self.queue = self.listener.queue = queue.SimpleQueue()
+        self.listener._thread = None
+        self.listener.start()
+
+    def prepare(self, record):
+        # Resolve the message now (its args may change after the call) but
+        # leave formatting to the listener thread.
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+# ═══════════════════════════════════════════════════
+# MIDDLEWARE
+# ═══════════════════════════════════════════════════
+
+class RequestIdMiddleware:
+    """Sets the request id for everything logged while handling the request. Sync and async."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def _start(self, request):
+        incoming = request.headers.get('X-Request-ID', '')
+        value = incoming if _REQUEST_ID_RE.match(incoming) else uuid.uuid4().hex
+        request.request_id = value
+        return request_id.set(value)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = self._start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            request_id.reset(token)
+        response['X-Request-ID'] = request.request_id
+        return response
+
+    async def __acall__(self, request):
+        token = self._start(request)
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            request_id.reset(token)
+            raise
+        # A streamed body (chat SSE) is produced after this returns, in the
+        # same per-request task: keep the id for it, the context ends with the task
+        if not response.streaming:
+            request_id.reset(token)
+        response['X-Request-ID'] = request.request_id
+        return response
@@ -0,0 +1,184 @@
+"""
+Offline load test of the AI endpoints against the stub LLM provider.
+
+    python manage.py ai_loadtest --user owner1 --endpoint chat --requests 200 --concurrency 20
+    python manage.py ai_loadtest --user owner1 --endpoint all --rate-limit-rate 0.2 --malformed-rate 0.1
+
+Requests go through the full Django/DRF stack in-process (auth, RAG context,
+serializers, DB writes) with the AI backend switched to 'stub', so the numbers
+show how rate limiting, retries, the circuit breaker and the fallbacks behave
+under concurrency without calling Gemini or Groq.
+"""
+
+import io
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ai import client as ai_client
+from ai.stub import stub_backend
+from core.benchmarks import run_load, summarize
+from core.models import User
+from maintenance.models import MaintenanceTicket
+from properties.models import Unit
+
+CHAT_QUESTIONS = [
+    "How many vacant units do we have?",
+    "When is my next payment?",
+    "What are the gym hours?",
+    "Show me open maintenance tickets",
+    "Which cheques bounced this month?",
+]
+
+
+def _tiny_png():
+    from PIL import Image
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), (200, 40, 40)).save(buffer, format='PNG')
+    buffer.seek(0)
+    buffer.name = 'loadtest.png'
+    return buffer
+
+
+class Command(BaseCommand):
+    help = "Load-test chat, smart pricing and ticket triage against the stub AI provider."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help="Username to authenticate as.")
+        parser.add_argument('--endpoint', choices=['chat', 'pricing', 'ticket', 'all'], default='all')
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--unit-id', type=int, help="Unit used for pricing/ticket requests.")
+        parser.add_argument('--latency-ms', type=float)
+        parser.add_argument('--jitter-ms', type=float)
+        parser.add_argument('--rate-limit-rate', type=float, help="Fraction of provider calls that return 429.")
+        parser.add_argument('--malformed-rate', type=float, help="Fraction of provider calls that return bad output.")
+        parser.add_argument('--rpm', type=int, help="Override the per-provider requests/minute limit.")
+        parser.add_argument('--keep-tickets', action='store_true', help="Don't delete tickets created by the test.")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' not found.")
+
+        unit = self._pick_unit(user, options['unit_id'])
+
+        stub_conf = dict(settings.AI_STUB)
+        for option, key in [('latency_ms', 'latency_ms'), ('jitter_ms', 'jitter_ms'),
+                            ('rate_limit_rate', 'rate_limit_rate'), ('malformed_rate', 'malformed_rate')]:
+            if options[option] is not None:
+                stub_conf[key] = options[option]
+
+        rate_limits = dict(settings.AI_RATE_LIMITS)
+        if options['rpm']:
+            rate_limits = {provider: options['rpm'] for provider in rate_limits}
+
+        endpoints = ['chat', 'pricing', 'ticket'] if options['endpoint'] == 'all' else [options['endpoint']]
+
+        with override_settings(
+            AI_BACKEND='stub',
+            AI_STUB=stub_conf,
+            AI_RATE_LIMITS=rate_limits,
+            EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+        ):
+            ai_client.reset_guards()
+            ai_client.reset_metrics()
+            stub_backend.reset()
+
+            self.stdout.write(f"Stub provider: {stub_conf}")
+            self.stdout.write(f"Rate limits (rpm): {rate_limits}\n")
+
+            for endpoint in endpoints:
+                if endpoint != 'chat' and unit is None:
+                    self.stdout.write(self.style.WARNING(f"Skipping {endpoint}: no unit available."))
+                    continue
+                self._run(endpoint, user, unit, options)
+
+            self._print_ai_metrics()
+            ai_client.reset_guards()
+
+    def _pick_unit(self, user, unit_id):
+        units = Unit.objects.select_related('property')
+        if not user.is_superuser:
+            units = units.filter(organization=user.organization)
+        if unit_id:
+            return units.filter(id=unit_id).first()
+        return units.first()
+
+    def _run(self, endpoint, user, unit, options):
+        local = threading.local()
+        created_tickets = []
+        token = AccessToken.for_user(user)
+
+        def api():
+            if not hasattr(local, 'client'):
+                local.client = APIClient(SERVER_NAME='localhost')
+                local.client.force_authenticate(user=user)
+                # /api/chat/ is a plain async view: it reads the bearer token itself
+                local.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+            return local.client
+
+        def chat(i):
+            response = api().post('/api/chat/', {'message': CHAT_QUESTIONS[i % len(CHAT_QUESTIONS)]}, format='json')
+            if response.status_code != 200:
+                return {'outcome': f'http_{response.status_code}'}
+            text = response.json().get('response', '')
+            return {'outcome': 'busy_fallback' if 'a lot of questions' in text else 'answered'}
+
+        def pricing(i):
+            response = api().get(f'/api/units/{unit.id}/smart-pricing/')
+            if response.status_code != 200:
+                return {'outcome': f'http_{response.status_code}'}
+            return {'outcome': 'ai' if response.data.get('source') == 'AI' else 'market_data_fallback'}
+
+        def ticket(i):
+            response = api().post('/api/maintenance/', {
+                'unit': unit.id,
+                'title': f'Load test ticket {i}',
+                'description': 'Water leaking from the ceiling',
+                'image': _tiny_png(),
+            }, format='multipart')
+            if response.status_code != 201:
+                return {'outcome': f'http_{response.status_code}'}
+            created_tickets.append(response.data['id'])
+            source = MaintenanceTicket.objects.filter(id=response.data['id']).values_list('source', flat=True).first()
+            return {'outcome': 'ai_triaged' if source == 'SYSTEM' else 'keyword_fallback'}
+
+        worker = {'chat': chat, 'pricing': pricing, 'ticket': ticket}[endpoint]
+        results, wall = run_load(worker, options['requests'], options['concurrency'])
+
+        stats = summarize(results, wall)
+        outcomes = {}
+        for result in results:
+            outcomes[result['outcome']] = outcomes.get(result['outcome'], 0) + 1
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"{endpoint} (concurrency={options['concurrency']})"))
+        self.stdout.write(
+            f"  {stats['requests']} requests in {wall:.1f}s — {stats['throughput_rps']} req/s | "
+            f"p50 {stats['p50_ms']}ms  p95 {stats['p95_ms']}ms  p99 {stats['p99_ms']}ms  max {stats['max_ms']}ms"
+        )
+        self.stdout.write(f"  outcomes: {outcomes}")
+
+        if created_tickets and not options['keep_tickets']:
+            for ticket_obj in MaintenanceTicket.objects.filter(id__in=created_tickets):
+                if ticket_obj.image:
+                    ticket_obj.image.delete(save=False)
+                ticket_obj.delete()
+
+    def _print_ai_metrics(self):
+        self.stdout.write(self.style.MIGRATE_HEADING("AI client metrics"))
+        for (provider, task), values in sorted(ai_client.get_metrics().items()):
+            calls = values.get('calls', 0)
+            avg = values.get('latency_seconds', 0) / max(1, calls + values.get('errors', 0))
+            self.stdout.write(
+                f"  {provider}/{task}: calls={calls:.0f} errors={values.get('errors', 0):.0f} "
+                f"retries={values.get('retries', 0):.0f} throttled={values.get('throttled', 0):.0f} "
+                f"breaker_rejections={values.get('breaker_rejections', 0):.0f} "
+                f"avg={avg * 1000:.0f}ms max={values.get('latency_max_seconds', 0) * 1000:.0f}ms "
+                f"tokens={values.get('prompt_tokens', 0):.0f}+{values.get('completion_tokens', 0):.0f}"
+            )
@@ -0,0 +1,303 @@
+"""
+Benchmark every API endpoint: query count, latency and payload size.
+
+    python manage.py api_benchmark                                  # print the table
+    python manage.py api_benchmark --save benchmarks/api_baseline.json
+    python manage.py api_benchmark --compare benchmarks/api_baseline.json   # fails on regressions
+
+Seeds a synthetic portfolio (core/synthetic.py) inside a transaction, then
+calls each endpoint in ENDPOINTS `--repeat` times in-process through the full
+Django/DRF stack as the role that uses it, and rolls everything back. AI
+calls go to the stub provider with no simulated latency, the answer cache is
+off, so the numbers are our own code and SQL.
+
+--compare fails when an endpoint runs more queries than in the baseline, or
+its p95 got slower by more than --tolerance (and by more than
+--min-delta-ms, so scheduler noise on fast endpoints doesn't count). Query
+counts and payload sizes are deterministic for a given dataset; latencies
+are only comparable on the same machine, so refresh the baseline with
+--save when the hardware changes.
+"""
+
+import json
+import platform
+import time
+from datetime import date
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from ai import client as ai_client
+from communication.logwriter import chat_log_writer
+from core.benchmarks import percentile
+from core.instrumentation import reset_request_metrics
+from core.models import User
+from core.synthetic import seed_portfolio
+from finance.models import Cheque
+from maintenance.models import MaintenanceTicket
+from properties.models import Property
+from tenants.models import Lease
+
+PASSWORD = 'benchmark-password'
+METRICS_TOKEN = 'benchmark'
+
+# (label, URL name, role, method, path, body). Paths are formatted with the sample rows.
+ENDPOINTS = [
+    ("api root", 'api-root', 'owner', 'get', '/api/', None),
+    ("dashboard stats", 'dashboard_stats', 'owner', 'get', '/api/dashboard/stats/', None),
+    ("manager stats", 'manager_stats', 'manager', 'get', '/api/manager/stats/', None),
+    ("technician stats", 'technician_stats', 'technician', 'get', '/api/technician/stats/', None),
+    ("my profile (tenant)", 'my_profile', 'tenant', 'get', '/api/me/', None),
+    ("property list", 'property-list', 'owner', 'get', '/api/properties/', None),
+    ("property detail", 'property-detail', 'owner', 'get', '/api/properties/{property}/', None),
+    ("unit list", 'unit-list', 'owner', 'get', '/api/units/', None),
+    ("unit detail", 'unit-detail', 'owner', 'get', '/api/units/{unit}/', None),
+    ("tenant list", 'tenant-list', 'owner', 'get', '/api/tenants/', None),
+    ("tenant detail", 'tenant-detail', 'owner', 'get', '/api/tenants/{tenant}/', None),
+    ("lease list", 'lease-list', 'owner', 'get', '/api/leases/', None),
+    ("lease detail", 'lease-detail', 'owner', 'get', '/api/leases/{lease}/', None),
+    ("cheque list", 'cheque-list', 'owner', 'get', '/api/cheques/', None),
+    ("cheque export (csv)", 'cheque-list', 'owner', 'get', '/api/cheques/?export=csv', None),
+    ("lease export (xlsx)", 'lease-list', 'owner', 'get', '/api/leases/?export=xlsx', None),
+    ("cheque detail", 'cheque-detail', 'owner', 'get', '/api/cheques/{cheque}/', None),
+    ("ticket list", 'maintenance-list', 'owner', 'get', '/api/maintenance/', None),
+    ("ticket list (technician)", 'maintenance-list', 'technician', 'get', '/api/maintenance/', None),
+    ("ticket list (tenant)", 'maintenance-list', 'tenant', 'get', '/api/maintenance/', None),
+    ("ticket detail", 'maintenance-detail', 'owner', 'get', '/api/maintenance/{ticket}/', None),
+    ("rent roll report", 'rent_roll_report', 'owner', 'get', '/api/reports/rent-roll/', None),
+    ("aging report", 'aging_report', 'owner', 'get', '/api/reports/aging/', None),
+    ("aging report (tenant, csv)", 'aging_report', 'owner', 'get', '/api/reports/aging/?by=tenant&export=csv', None),
+    ("revenue report", 'revenue_report', 'owner', 'get', '/api/reports/revenue/', None),
+    ("reconciliation list", 'bank_statements', 'owner', 'get', '/api/reconciliation/', None),
+    ("smart pricing", 'smart_pricing', 'owner', 'get', '/api/units/{unit}/smart-pricing/', None),
+    ("ejari pdf", 'generate_ejari', 'owner', 'get', '/api/leases/{lease}/ejari/', None),
+    ("update rules", 'update_property_rules', 'owner', 'patch', '/api/properties/{property}/rules/',
+     {'rules_and_regulations': "Gym: 6am-11pm.\nPool: 7am-10pm, no glass.\nQuiet hours after 10pm."}),
+    ("chat (owner)", 'chat', 'owner', 'post', '/api/chat/', {'message': "How many vacant units do we have?"}),
+    ("chat (tenant)", 'chat', 'tenant', 'post', '/api/chat/', {'message': "When is my next payment?"}),
+    ("notification feed", 'notification_feed', 'owner', 'get', '/api/notifications/', None),
+    ("notification feed (tenant, unread)", 'notification_feed', 'tenant', 'get', '/api/notifications/?unread=1', None),
+    ("mark notifications read", 'mark_notifications_read', 'tenant', 'post', '/api/notifications/read/', {}),
+    ("token obtain", 'token_obtain_pair', None, 'post', '/api/token/', {'username': '{owner_username}', 'password': PASSWORD}),
+    ("token refresh", 'token_refresh', None, 'post', '/api/token/refresh/', {'refresh': '{refresh}'}),
+    ("metrics", 'metrics', None, 'get', '/metrics', None),
+]
+
+# Routes that are not part of the API surface
+IGNORED_NAMESPACES = ('admin',)
+
+
+class Command(BaseCommand):
+    help = "Call every API endpoint on a seeded portfolio and report queries, p50/p95 latency and payload size."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organizations', type=int, default=3)
+        parser.add_argument('--properties', type=int, default=4, help="Properties per organization.")
+        parser.add_argument('--units', type=int, default=50, help="Units per property.")
+        parser.add_argument('--repeat', type=int, default=20, help="Timed calls per endpoint.")
+        parser.add_argument('--only', help="Only endpoints whose label contains this text.")
+        parser.add_argument('--save', metavar='PATH', help="Write the results as a baseline file.")
+        parser.add_argument('--compare', metavar='PATH', help="Compare with a baseline file; fail on regressions.")
+        parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed p95 slowdown (0.25 = 25%%).")
+        parser.add_argument('--min-delta-ms', type=float, default=5.0, help="Ignore p95 slowdowns smaller than this.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("The benchmark runs on PostgreSQL.")
+        baseline = self._load(options['compare']) if options['compare'] else None
+        self._check_coverage()
+
+        with override_settings(
+            AI_BACKEND='stub',
+            AI_STUB={'latency_ms': 0, 'jitter_ms': 0, 'token_ms': 0, 'rate_limit_rate': 0, 'malformed_rate': 0, 'seed': 42},
+            AI_EMBEDDER='hashing',
+            AI_RATE_LIMITS={'groq': 100000, 'gemini': 100000},
+            CHAT_ANSWER_CACHE_ENABLED=False,
+            # Chat logs are flushed in this thread after each call so they land in the transaction
+            CHAT_LOG_FLUSH_INTERVAL=3600,
+            METRICS_TOKEN=METRICS_TOKEN,
+        ), transaction.atomic():
+            summary = seed_portfolio(
+                organizations=options['organizations'],
+                properties_per_org=options['properties'],
+                units_per_property=options['units'],
+                tenant_users=1,
+                chat_logs_per_org=200,
+                password=PASSWORD,
+            )
+            self.stdout.write(
+                f"Seeded {summary['units']} units, {summary['leases']} leases, {summary['cheques']} cheques, "
+                f"{summary['tickets']} tickets in {options['organizations']} orgs; {options['repeat']} calls per endpoint\n"
+            )
+            sample = self._sample(summary)
+            ai_client.reset_guards()
+            try:
+                results = self._run(sample, options)
+            finally:
+                ai_client.reset_guards()
+            transaction.set_rollback(True)
+
+        if options['save']:
+            self._save(options['save'], results, options)
+            self.stdout.write(self.style.SUCCESS(f"\nBaseline written to {options['save']}"))
+        if baseline is not None:
+            regressions = self._compare(results, baseline, options)
+            if regressions:
+                raise CommandError(f"{regressions} endpoint(s) regressed against {options['compare']}.")
+            self.stdout.write(self.style.SUCCESS("\nNo regressions against the baseline."))
+
+    def _check_coverage(self):
+        """Warn about API routes that have no entry in ENDPOINTS."""
+        covered = {name for _, name, *_ in ENDPOINTS}
+        missing = sorted(set(_route_names(get_resolver().url_patterns)) - covered)
+        if missing:
+            self.stdout.write(self.style.WARNING(f"Not benchmarked: {', '.join(missing)}"))
+
+    def _sample(self, summary):
+        org_id = summary['organizations'][0]
+        users = summary['users'][org_id]
+        lease = Lease.objects.filter(organization_id=org_id, is_active=True, tenant__user_id__in=users['tenants']) \
+            .select_related('unit').first() or Lease.objects.filter(organization_id=org_id, is_active=True).select_related('unit').first()
+        owner = User.objects.get(id=users['owner'])
+        return {
+            'users': {
+                'owner': owner,
+                'manager': User.objects.get(id=users['manager']),
+                'technician': User.objects.get(id=users['technician']),
+                'tenant': User.objects.get(id=users['tenants'][0]) if users['tenants'] else None,
+            },
+            'owner_username': owner.username,
+            'refresh': str(RefreshToken.for_user(owner)),
+            'property': Property.objects.filter(organization_id=org_id).order_by('id').values_list('id', flat=True).first(),
+            'unit': lease.unit_id,
+            'lease': lease.id,
+            'tenant': lease.tenant_id,
+            'cheque': Cheque.objects.filter(lease=lease).values_list('id', flat=True).first(),
+            'ticket': MaintenanceTicket.objects.filter(organization_id=org_id).values_list('id', flat=True).first(),
+        }
+
+    def _client(self, user):
+        client = APIClient(SERVER_NAME='localhost')
+        if user is not None:
+            # The async chat view reads the bearer token itself, so authenticate for real
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+        return client
+
+    def _run(self, sample, options):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{'endpoint':<26} {'status':>6} {'queries':>8} {'p50':>9} {'p95':>9} {'bytes':>9}"
+        ))
+        clients = {role: self._client(user) for role, user in sample['users'].items() if user is not None}
+        clients[None] = self._client(None)
+        fields = {key: value for key, value in sample.items() if key != 'users'}
+
+        results = {}
+        for label, _name, role, method, path, body in ENDPOINTS:
+            if options['only'] and options['only'] not in label:
+                continue
+            if role not in clients:
+                self.stdout.write(self.style.WARNING(f"{label:<26} skipped: no {role} user"))
+                continue
+            client = clients[role]
+            path = path.format(**fields)
+            if body is not None:
+                body = {key: value.format(**fields) if isinstance(value, str) else value for key, value in body.items()}
+            headers = {'HTTP_AUTHORIZATION': f"Bearer {METRICS_TOKEN}"} if path == '/metrics' else {}
+
+            timings, queries = [], []
+            for _ in range(options['repeat'] + 1):  # the first call warms caches and is not timed
+                reset_queries()  # with DEBUG the log may already be full (it is capped), hiding new queries
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = getattr(client, method)(path, body, format='json', **headers)
+                    payload = b''.join(response.streaming_content) if response.streaming else response.content
+                    elapsed = (time.perf_counter() - started) * 1000
+                chat_log_writer.flush()
+                timings.append(elapsed)
+                queries.append(len(captured))
+            timings, queries = timings[1:], queries[1:]
+
+            result = {
+                'status': response.status_code,
+                'queries': max(queries),
+                'p50_ms': round(percentile(timings, 50), 2),
+                'p95_ms': round(percentile(timings, 95), 2),
+                'bytes': len(payload),
+            }
+            results[label] = result
+            style = self.style.ERROR if result['status'] >= 400 else (lambda text: text)
+            self.stdout.write(style(
+                f"{label:<26} {result['status']:>6} {result['queries']:>8} {result['p50_ms']:>7.1f}ms "
+                f"{result['p95_ms']:>7.1f}ms {result['bytes']:>9}"
+            ))
+        reset_request_metrics()
+        return results
+
+    def _load(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Can't read baseline {path}: {e}")
+
+    def _save(self, path, results, options):
+        data = {
+            'generated': date.today().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'postgresql': connection.pg_version,
+                'machine': platform.machine(),
+            },
+            'dataset': {key: options[key] for key in ('organizations', 'properties', 'units', 'repeat')},
+            'endpoints': results,
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=False)
+            f.write('\n')
+
+    def _compare(self, results, baseline, options):
+        dataset = {key: options[key] for key in ('organizations', 'properties', 'units')}
+        base_dataset = {key: baseline.get('dataset', {}).get(key) for key in dataset}
+        if dataset != base_dataset:
+            self.stdout.write(self.style.WARNING(f"\nBaseline was recorded on a different dataset: {base_dataset}"))
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{'endpoint':<26} {'queries':>13} {'p95':>21} {'bytes':>19}"))
+        regressions = 0
+        for label, result in results.items():
+            before = baseline['endpoints'].get(label)
+            if before is None:
+                self.stdout.write(f"{label:<26} new endpoint")
+                continue
+            problems = []
+            if result['status'] != before['status']:
+                problems.append(f"status {before['status']} → {result['status']}")
+            if result['queries'] > before['queries']:
+                problems.append("more queries")
+            slower = result['p95_ms'] - before['p95_ms']
+            if slower > options['min_delta_ms'] and result['p95_ms'] > before['p95_ms'] * (1 + options['tolerance']):
+                problems.append("slower")
+            regressions += bool(problems)
+
+            line = (
+                f"{label:<26} {before['queries']:>5} → {result['queries']:<5} "
+                f"{before['p95_ms']:>8.1f} → {result['p95_ms']:<8.1f}ms "
+                f"{before['bytes']:>8} → {result['bytes']:<8}"
+            )
+            self.stdout.write(self.style.ERROR(f"{line} {', '.join(problems)}") if problems else line)
+        return regressions
+
+
+def _route_names(patterns, namespace=None):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace not in IGNORED_NAMESPACES:
+                yield from _route_names(pattern.url_patterns, pattern.namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name and namespace not in IGNORED_NAMESPACES:
+            yield pattern.name
@@ -0,0 +1,148 @@
+"""
+Concurrent chat capacity of one process: WSGI (sync workers) vs ASGI (event loop).
+
+    python manage.py chat_capacity --user owner1 --requests 200 --concurrency 50 --wsgi-threads 8
+    python manage.py chat_capacity --user ten0 --mode asgi --latency-ms 2000
+
+Both modes send the same /api/chat/ requests through the full Django stack
+in-process, with the LLM replaced by the stub provider (AI_BACKEND='stub') so
+the only slow part is the simulated Groq round-trip (--latency-ms).
+
+  wsgi  `--concurrency` clients share `--wsgi-threads` request threads, like a
+        gunicorn/runserver process with that many sync workers. Each request
+        holds its thread for the whole LLM wait.
+  asgi  `--concurrency` clients on one event loop, like a uvicorn process
+        serving config/asgi.py. LLM and DB waits are awaited, not blocked on.
+
+Latency is measured from the client's side, so time spent queueing for a free
+WSGI thread is included.
+"""
+
+import asyncio
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from ai import client as ai_client
+from ai.stub import stub_backend
+from core.benchmarks import arun_load, run_load, summarize
+from core.models import User
+from .ai_loadtest import CHAT_QUESTIONS
+
+
+class Command(BaseCommand):
+    help = "Compare concurrent /api/chat/ capacity per process under WSGI and ASGI (stub LLM)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help="Username to chat as.")
+        parser.add_argument('--mode', choices=['wsgi', 'asgi', 'both'], default='both')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=50, help="Simultaneous clients.")
+        parser.add_argument('--wsgi-threads', type=int, default=8, help="Request threads in the WSGI process.")
+        parser.add_argument('--latency-ms', type=float, default=1000, help="Simulated LLM round-trip.")
+        parser.add_argument('--rpm', type=int, default=100000, help="Local Groq rate limit (high = off).")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' not found.")
+
+        headers = {'authorization': f"Bearer {AccessToken.for_user(user)}"}
+        stub_conf = dict(settings.AI_STUB, latency_ms=options['latency_ms'], jitter_ms=0,
+                         rate_limit_rate=0, malformed_rate=0)
+        modes = ['wsgi', 'asgi'] if options['mode'] == 'both' else [options['mode']]
+
+        with override_settings(
+            AI_BACKEND='stub',
+            AI_STUB=stub_conf,
+            AI_RATE_LIMITS={provider: options['rpm'] for provider in settings.AI_RATE_LIMITS},
+            ALLOWED_HOSTS=['*'],
+        ):
+            ai_client.reset_guards()
+            stub_backend.reset()
+            self.stdout.write(
+                f"Stub LLM latency {options['latency_ms']:.0f}ms | {options['requests']} requests | "
+                f"{options['concurrency']} concurrent clients\n"
+            )
+
+            throughput = {}
+            for mode in modes:
+                run = self._run_wsgi if mode == 'wsgi' else self._run_asgi
+                results, wall, peak = run(headers, options)
+                stats = summarize(results, wall)
+                throughput[mode] = stats['throughput_rps']
+                errors = sum(1 for r in results if r['status'] != 200)
+
+                label = f"wsgi ({options['wsgi_threads']} threads)" if mode == 'wsgi' else "asgi (1 event loop)"
+                self.stdout.write(self.style.MIGRATE_HEADING(label))
+                self.stdout.write(
+                    f"  {stats['requests']} requests in {wall:.1f}s — {stats['throughput_rps']} req/s | "
+                    f"peak in flight {peak} | p50 {stats['p50_ms']}ms  p95 {stats['p95_ms']}ms  "
+                    f"p99 {stats['p99_ms']}ms  max {stats['max_ms']}ms | errors {errors}"
+                )
+
+            if len(throughput) == 2 and throughput['wsgi']:
+                self.stdout.write(f"\nASGI / WSGI throughput: {throughput['asgi'] / throughput['wsgi']:.1f}x")
+            ai_client.reset_guards()
+
+    def _run_wsgi(self, headers, options):
+        workers = threading.BoundedSemaphore(options['wsgi_threads'])
+        local = threading.local()
+        in_flight = _Gauge()
+
+        def chat(i):
+            if not hasattr(local, 'client'):
+                local.client = Client(headers=headers)
+            with workers:  # wait for a free request thread
+                with in_flight:
+                    response = local.client.post(
+                        '/api/chat/', {'message': CHAT_QUESTIONS[i % len(CHAT_QUESTIONS)]},
+                        content_type='application/json',
+                    )
+            return {'status': response.status_code}
+
+        results, wall = run_load(chat, options['requests'], options['concurrency'])
+        return results, wall, in_flight.peak
+
+    def _run_asgi(self, headers, options):
+        in_flight = _Gauge()
+
+        async def main():
+            client = AsyncClient()
+
+            async def chat(i):
+                with in_flight:
+                    response = await client.post(
+                        '/api/chat/', {'message': CHAT_QUESTIONS[i % len(CHAT_QUESTIONS)]},
+                        content_type='application/json', headers=headers,
+                    )
+                return {'status': response.status_code}
+
+            return await arun_load(chat, options['requests'], options['concurrency'])
+
+        results, wall = asyncio.run(main())
+        connections.close_all()
+        return results, wall, in_flight.peak
+
+
+class _Gauge:
+    """Counts requests in flight and remembers the peak."""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.current -= 1
@@ -0,0 +1,142 @@
+"""
+Request latency under concurrent load for each database connection mode.
+
+    python manage.py db_connection_benchmark --user owner1
+    python manage.py db_connection_benchmark --user owner1 --path /api/properties/ --requests 1000 --concurrency 32
+    python manage.py db_connection_benchmark --user owner1 --modes none,pool --pool-max-size 10
+
+Runs the same authenticated GET through the full Django/DRF stack from
+`--concurrency` threads once per mode:
+
+  none        CONN_MAX_AGE=0: a new PostgreSQL connection for every request
+  persistent  CONN_MAX_AGE=60 + health checks: each thread keeps its connection
+  pool        psycopg 3 pool (OPTIONS['pool']), connections shared by all threads
+              and checked when handed out
+
+Like the real request handler, connections are released with
+close_old_connections() after every request (the test client skips that).
+"""
+
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.benchmarks import summarize
+from core.models import User
+
+MODES = {
+    'none': {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'OPTIONS': {}},
+    'persistent': {'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': True, 'OPTIONS': {}},
+    'pool': {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': True, 'OPTIONS': {'pool': {}}},
+}
+
+
+class Command(BaseCommand):
+    help = "Compare request latency with no persistent connections, CONN_MAX_AGE and a psycopg connection pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help="Username to authenticate as.")
+        parser.add_argument('--path', default='/api/dashboard/stats/', help="GET endpoint to load.")
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--modes', default='none,persistent,pool', help=f"Comma-separated, from: {', '.join(MODES)}.")
+        parser.add_argument('--pool-max-size', type=int, help="Pool size (default: --concurrency).")
+
+    def handle(self, *args, **options):
+        if connections['default'].vendor != 'postgresql':
+            raise CommandError("Connection modes are only benchmarked on PostgreSQL.")
+        modes = options['modes'].split(',')
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f"Unknown mode(s): {', '.join(sorted(unknown))}")
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' not found.")
+
+        db_settings = connections.settings['default']
+        original = {key: db_settings.get(key) for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS', 'OPTIONS')}
+        pool_size = options['pool_max_size'] or options['concurrency']
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"GET {options['path']} — {options['requests']} requests, concurrency {options['concurrency']}\n"
+            f"{'mode':<11} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9}   connections opened   errors"
+        ))
+        try:
+            for mode in modes:
+                self._configure(db_settings, MODES[mode], pool_size, original['OPTIONS'])
+                stats, opened, errors = self._run(user, options)
+                self.stdout.write(
+                    f"{mode:<11} {stats['throughput_rps']:>8} {stats['p50_ms']:>7}ms {stats['p95_ms']:>7}ms "
+                    f"{stats['p99_ms']:>7}ms   {opened:>18}   {errors:>6}"
+                )
+        finally:
+            self._reset()
+            db_settings.update(original)
+
+    def _configure(self, db_settings, mode, pool_size, base_options):
+        self._reset()
+        options = {key: value for key, value in (base_options or {}).items() if key != 'pool'}
+        if 'pool' in mode['OPTIONS']:
+            options['pool'] = {'min_size': pool_size, 'max_size': pool_size, 'timeout': 30}
+        db_settings.update(CONN_MAX_AGE=mode['CONN_MAX_AGE'], CONN_HEALTH_CHECKS=mode['CONN_HEALTH_CHECKS'], OPTIONS=options)
+
+    def _reset(self):
+        """Close this thread's connection and any pool, so the next mode starts cold."""
+        connection = connections['default']
+        connection.close()
+        connection.close_pool()
+        del connections['default']
+
+    def _run(self, user, options):
+        token = AccessToken.for_user(user)
+        remaining = iter(range(options['requests']))
+        lock = threading.Lock()
+        results = []
+        errors = []
+        opened = []
+
+        def count_connection(sender, connection, **kwargs):
+            opened.append(1)
+
+        def client_thread():
+            client = APIClient(SERVER_NAME='localhost')
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+            try:
+                while True:
+                    with lock:
+                        if next(remaining, None) is None:
+                            return
+                    started = time.perf_counter()
+                    try:
+                        response = client.get(options['path'])
+                        if response.status_code != 200:
+                            errors.append(response.status_code)
+                    finally:
+                        close_old_connections()  # what request_finished does outside the test client
+                    results.append({'latency_ms': (time.perf_counter() - started) * 1000})
+            finally:
+                connections.close_all()
+
+        connection_created.connect(count_connection)
+        try:
+            threads = [threading.Thread(target=client_thread) for _ in range(options['concurrency'])]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            wall = time.perf_counter() - started
+        finally:
+            connection_created.disconnect(count_connection)
+
+        pool = connections['default'].pool
+        if pool is not None:
+            # connection_created fires per checkout; the pool knows how many it really opened
+            opened = range(pool.get_stats().get('connections_num', 0))
+        return summarize(results, wall), len(opened), len(errors)
@@ -0,0 +1,151 @@
+"""
+Check that the hot dashboard / list queries are served by indexes.
+
+    python manage.py explain_queries                      # seed 20 orgs, check, roll back
+    python manage.py explain_queries --organizations 50 --units 400 --analyze
+    python manage.py explain_queries --no-seed --organization 3
+
+Seeds a large synthetic dataset (core/synthetic.py) inside a transaction,
+runs ANALYZE so the planner sees realistic statistics, then EXPLAINs each
+query in CHECKS for one organization and fails (non-zero exit) if any of them
+reads its table with a sequential scan. The seeded rows are rolled back
+unless --keep is given.
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Sum
+
+from core.models import Organization, User
+from core.synthetic import seed_portfolio
+from finance.models import Cheque
+from maintenance.models import MaintenanceTicket
+from properties.models import Property, Unit
+from tenants.models import Lease, Tenant
+
+OPEN_STATUSES = ['OPEN', 'IN_PROGRESS']
+INDEX_NODES = ('Index Scan', 'Index Only Scan', 'Bitmap Heap Scan')
+
+# (label, model whose table must be read through an index, queryset builder)
+CHECKS = [
+    ("Cheque list: org + status, by date", Cheque,
+     lambda s: Cheque.objects.filter(organization=s['org'], status='PENDING').order_by('cheque_date')[:50]),
+    ("Dashboard revenue: org + CLEARED", Cheque,
+     lambda s: Cheque.objects.filter(organization=s['org'], status='CLEARED').values('organization').annotate(total=Sum('amount'))),
+    ("Tenant payment schedule", Cheque,
+     lambda s: Cheque.objects.filter(tenant=s['tenant']).order_by('cheque_date')),
+    ("Open tickets: org + status", MaintenanceTicket,
+     lambda s: MaintenanceTicket.objects.filter(organization=s['org'], status='OPEN').values('pk')),
+    ("Emergency open tickets", MaintenanceTicket,
+     lambda s: MaintenanceTicket.objects.filter(organization=s['org'], priority='EMERGENCY', status__in=OPEN_STATUSES).values('pk')),
+    ("Ticket list: org, newest first", MaintenanceTicket,
+     lambda s: MaintenanceTicket.objects.filter(organization=s['org']).order_by('-created_at')[:50]),
+    ("Technician queue: assignee + status", MaintenanceTicket,
+     lambda s: MaintenanceTicket.objects.filter(assigned_to=s['technician'], status='IN_PROGRESS')),
+    ("Units: org + status", Unit,
+     lambda s: Unit.objects.filter(organization=s['org'], status='VACANT').values('pk')),
+    ("Tenant list: org, newest first", Tenant,
+     lambda s: Tenant.objects.filter(organization=s['org']).order_by('-created_at')[:50]),
+    ("Lease list: org, latest start", Lease,
+     lambda s: Lease.objects.filter(organization=s['org']).order_by('-start_date')[:50]),
+    ("Units: property + status", Unit,
+     lambda s: Unit.objects.filter(property=s['property'], status='VACANT')),
+    ("Active lease of a tenant", Lease,
+     lambda s: Lease.objects.filter(tenant=s['tenant'], is_active=True)),
+    ("Active lease of a unit", Lease,
+     lambda s: Lease.objects.filter(unit=s['unit'], is_active=True)),
+]
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the hot organization-scoped queries on a large seeded dataset and fail on sequential scans."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organizations', type=int, default=20)
+        parser.add_argument('--properties', type=int, default=5, help="Properties per organization.")
+        parser.add_argument('--units', type=int, default=200, help="Units per property.")
+        parser.add_argument('--no-seed', action='store_true', help="Use the existing data instead of seeding.")
+        parser.add_argument('--organization', type=int, help="With --no-seed: organization to query as.")
+        parser.add_argument('--analyze', action='store_true', help="EXPLAIN ANALYZE (runs the queries, shows timings).")
+        parser.add_argument('--keep', action='store_true', help="Commit the seeded data instead of rolling it back.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Query plans are only checked on PostgreSQL.")
+
+        with transaction.atomic():
+            if options['no_seed']:
+                org = Organization.objects.filter(id=options['organization']).first() if options['organization'] \
+                    else Organization.objects.order_by('id').first()
+                if org is None:
+                    raise CommandError("Organization not found.")
+            else:
+                summary = seed_portfolio(
+                    organizations=options['organizations'],
+                    properties_per_org=options['properties'],
+                    units_per_property=options['units'],
+                )
+                self.stdout.write(
+                    f"Seeded {summary['tag']}: {summary['units']} units, {summary['leases']} leases, "
+                    f"{summary['cheques']} cheques, {summary['tickets']} tickets"
+                )
+                org = Organization.objects.get(id=summary['organizations'][0])
+
+            with connection.cursor() as cursor:
+                for model in (Cheque, MaintenanceTicket, Unit, Lease, Tenant, Property):
+                    cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+
+            failures = self._run_checks(self._sample(org), options['analyze'])
+
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"{failures} of {len(CHECKS)} queries read their table with a sequential scan.")
+        self.stdout.write(self.style.SUCCESS(f"All {len(CHECKS)} queries use index scans."))
+
+    def _sample(self, org):
+        """Rows of `org` to parametrize the checks with."""
+        lease = Lease.objects.filter(organization=org, is_active=True).select_related('unit').first()
+        if lease is None:
+            raise CommandError(f"Organization {org.id} has no active leases to sample.")
+        return {
+            'org': org,
+            'tenant': lease.tenant_id,
+            'unit': lease.unit_id,
+            'property': lease.unit.property_id,
+            'technician': User.objects.filter(organization=org, role='MAINTENANCE').values_list('id', flat=True).first(),
+        }
+
+    def _run_checks(self, sample, analyze):
+        failures = 0
+        for label, model, build in CHECKS:
+            plan = json.loads(build(sample).explain(format='json', analyze=analyze))[0]
+            scans = [node for node in _walk(plan['Plan']) if node.get('Relation Name') == model._meta.db_table]
+            ok = bool(scans) and all(node['Node Type'] in INDEX_NODES for node in scans)
+            failures += not ok
+
+            detail = ', '.join(_describe(node) for node in scans) or 'table not read'
+            if analyze:
+                detail += f" | {plan['Execution Time']:.2f}ms"
+            style = self.style.SUCCESS if ok else self.style.ERROR
+            self.stdout.write(f"{style('OK  ' if ok else 'FAIL')} {label:<40} {detail}")
+        return failures
+
+
+def _walk(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from _walk(child)
+
+
+def _describe(node):
+    """'Index Scan using cheque_org_status_date' (bitmap scans: the index(es) feeding them)."""
+    if node['Node Type'] == 'Bitmap Heap Scan':
+        indexes = [child['Index Name'] for child in _walk(node) if 'Index Name' in child]
+        return f"Bitmap Heap Scan using {' + '.join(indexes)}"
+    if 'Index Name' in node:
+        return f"{node['Node Type']} using {node['Index Name']}"
+    return node['Node Type']
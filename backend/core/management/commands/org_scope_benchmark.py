@@ -0,0 +1,100 @@
+"""
+Organization scoping: joining through unit/property vs the denormalized FK.
+
+    python manage.py org_scope_benchmark                  # ~100k leases, rolled back afterwards
+    python manage.py org_scope_benchmark --leases 20000 --repeat 50
+
+Seeds a synthetic portfolio (core/synthetic.py, no cheques or tickets) inside
+a transaction, runs ANALYZE, then times each list/dashboard query for one
+organization both ways: the old join (`leases__unit__property__organization`
++ DISTINCT) and the direct `organization` filter. Both must return the same
+rows. The seeded data is rolled back at the end.
+"""
+
+import math
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.benchmarks import percentile
+from core.models import Organization
+from core.synthetic import seed_portfolio
+from properties.models import Property, Unit
+from tenants.models import Lease, Tenant
+
+LEASES_PER_UNIT = 0.85 + 1  # occupancy + one past lease per unit (seed_portfolio defaults)
+
+# label → (join query, direct query), for one organization
+QUERIES = {
+    "Tenant list (first page)": (
+        lambda org: Tenant.objects.filter(leases__unit__property__organization=org).distinct().order_by('-created_at', '-id')[:50],
+        lambda org: Tenant.objects.filter(organization=org).order_by('-created_at', '-id')[:50],
+    ),
+    "Tenant count (dashboard)": (
+        lambda org: Tenant.objects.filter(leases__unit__property__organization=org).distinct().values('pk'),
+        lambda org: Tenant.objects.filter(organization=org).values('pk'),
+    ),
+    "Lease list (first page)": (
+        lambda org: Lease.objects.filter(unit__property__organization=org).order_by('-start_date', 'id')[:50],
+        lambda org: Lease.objects.filter(organization=org).order_by('-start_date', 'id')[:50],
+    ),
+    "Occupied units (dashboard)": (
+        lambda org: Unit.objects.filter(property__organization=org, status='OCCUPIED').values('pk'),
+        lambda org: Unit.objects.filter(organization=org, status='OCCUPIED').values('pk'),
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = "Benchmark org-scoped queries: join through unit/property vs the denormalized organization FK."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--leases', type=int, default=100000, help="Approximate leases to seed.")
+        parser.add_argument('--organizations', type=int, default=25)
+        parser.add_argument('--properties', type=int, default=5, help="Properties per organization.")
+        parser.add_argument('--repeat', type=int, default=20, help="Timed runs per query.")
+
+    def handle(self, *args, **options):
+        units_per_property = math.ceil(options['leases'] / (options['organizations'] * options['properties'] * LEASES_PER_UNIT))
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            summary = seed_portfolio(
+                organizations=options['organizations'],
+                properties_per_org=options['properties'],
+                units_per_property=units_per_property,
+                cheques_per_lease=0,
+                tickets_per_unit=0,
+            )
+            self.stdout.write(
+                f"Seeded {summary['units']} units, {summary['tenants']} tenants, {summary['leases']} leases "
+                f"in {summary['properties']} properties / {options['organizations']} orgs "
+                f"({time.perf_counter() - started:.0f}s)"
+            )
+            with connection.cursor() as cursor:
+                for model in (Property, Unit, Lease, Tenant):
+                    cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+
+            org = Organization.objects.get(id=summary['organizations'][0])
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{'query':<28} {'join p50':>10} {'direct p50':>11} {'speedup':>8}   rows"))
+            for label, (join, direct) in QUERIES.items():
+                join_rows, join_ms = self._time(join, org, options['repeat'])
+                direct_rows, direct_ms = self._time(direct, org, options['repeat'])
+                speedup = f"{join_ms / direct_ms:.1f}x" if direct_ms else '-'
+                self.stdout.write(f"{label:<28} {join_ms:>8.2f}ms {direct_ms:>9.2f}ms {speedup:>8}   {len(direct_rows)}")
+                if join_rows != direct_rows:
+                    self.stdout.write(self.style.ERROR(f"  results differ: {len(join_rows)} rows via join, {len(direct_rows)} direct"))
+
+            transaction.set_rollback(True)
+
+    def _time(self, build, org, repeat):
+        """Rows (for comparing both variants) and the median run time in ms."""
+        timings = []
+        rows = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = list(build(org))
+            timings.append((time.perf_counter() - started) * 1000)
+            rows = rows or [r['pk'] if isinstance(r, dict) else r.pk for r in result]
+        return sorted(rows), percentile(timings, 50)
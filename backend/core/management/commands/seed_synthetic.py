@@ -0,0 +1,71 @@
+"""
+Generate (or remove) a large synthetic portfolio for benchmarks and local testing.
+
+    python manage.py seed_synthetic --organizations 10 --properties 5 --units 200 --password bench123
+    python manage.py seed_synthetic --organizations 2 --tenant-users 5 --chat-logs 20000
+    python manage.py seed_synthetic --delete syn1a2b3c
+
+Rows are bulk-inserted by core/synthetic.py (no signals, so the chatbot's
+vector index is not updated; run `manage.py rebuild_chat_index` if the chat
+should see them). Usernames are `<tag>_owner0`, `<tag>_manager0`,
+`<tag>_tech0` and `<tag>_tenant<org id>_0`.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.synthetic import delete_portfolio, seed_portfolio
+
+
+class Command(BaseCommand):
+    help = "Bulk-insert a synthetic portfolio (orgs, properties, units, tenants, leases, cheques, tickets, chat logs)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organizations', type=int, default=5)
+        parser.add_argument('--properties', type=int, default=5, help="Properties per organization.")
+        parser.add_argument('--units', type=int, default=100, help="Units per property.")
+        parser.add_argument('--occupancy', type=float, default=0.85)
+        parser.add_argument('--past-leases', type=int, default=1, help="Ended leases per unit.")
+        parser.add_argument('--cheques', type=int, default=4, help="Cheques per lease.")
+        parser.add_argument('--tickets', type=int, default=1, help="Maintenance tickets per unit.")
+        parser.add_argument('--tenant-users', type=int, default=1, help="Tenants with a login, per organization.")
+        parser.add_argument('--chat-logs', type=int, default=1000, help="Chat logs per organization.")
+        parser.add_argument('--chat-log-days', type=int, default=120, help="Spread chat logs over this many days.")
+        parser.add_argument('--password', help="Password for every seeded user (default: none, can't log in).")
+        parser.add_argument('--seed', type=int, default=0, help="RNG seed.")
+        parser.add_argument('--tag', help="Prefix for names/usernames (default: random).")
+        parser.add_argument('--delete', metavar='TAG', help="Delete a previously seeded portfolio instead.")
+
+    def handle(self, *args, **options):
+        if options['delete']:
+            deleted = delete_portfolio(options['delete'])
+            if not deleted:
+                raise CommandError(f"Nothing tagged '{options['delete']}' found.")
+            for label, rows in sorted(deleted.items()):
+                self.stdout.write(f"  {label}: {rows}")
+            return
+
+        started = time.perf_counter()
+        summary = seed_portfolio(
+            organizations=options['organizations'],
+            properties_per_org=options['properties'],
+            units_per_property=options['units'],
+            occupancy=options['occupancy'],
+            past_leases_per_unit=options['past_leases'],
+            cheques_per_lease=options['cheques'],
+            tickets_per_unit=options['tickets'],
+            tenant_users=options['tenant_users'],
+            chat_logs_per_org=options['chat_logs'],
+            chat_log_days=options['chat_log_days'],
+            password=options['password'],
+            seed=options['seed'],
+            tag=options['tag'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Seeded '{summary['tag']}' in {time.perf_counter() - started:.1f}s"))
+        for key in ('properties', 'units', 'tenants', 'leases', 'cheques', 'tickets', 'chat_logs'):
+            self.stdout.write(f"  {key}: {summary[key]}")
+        first = summary['organizations'][0] if summary['organizations'] else None
+        if first is not None:
+            self.stdout.write(f"  first organization: {first} (owner {summary['tag']}_owner0)")
+        self.stdout.write(f"Remove with: python manage.py seed_synthetic --delete {summary['tag']}")
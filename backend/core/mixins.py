@@ -1,7 +1,16 @@
+from rest_framework.response import Response
+
+from .exports import EXPORT_FORMATS, export_response
+
+
 class OrganizationQuerySetMixin:
     """
     Magic SaaS Filter: Only show data belonging to the User's Organization.
     🔧 FIX #12: Now safely handles users without an organization.
+
+    Every scoped model (Property, Unit, Lease, Tenant, Cheque, MaintenanceTicket)
+    has its own indexed `organization` FK, so this is a single-table filter —
+    no joins through unit/property and no DISTINCT.
     """
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -15,4 +24,29 @@ class OrganizationQuerySetMixin:
         if not hasattr(user, 'organization') or not user.organization:
             return queryset.none()
             
-        return queryset.filter(organization=user.organization)
\ No newline at end of file
+        return queryset.filter(organization=user.organization)
+
+
+class ExportMixin:
+    """
+    `GET <list endpoint>?export=csv` (or `xlsx`) streams the same filtered,
+    ordered rows as a file instead of JSON (core/exports.py).
+
+    Rows come from `.values(*export_fields lookups)` read with a server-side
+    cursor, so only the joins the columns need are made, no model instances
+    or serializers are built, and memory stays flat for any row count.
+    """
+    # [(column header, values() lookup)]
+    export_fields = ()
+    export_name = 'export'
+    export_chunk_size = 2000
+
+    def list(self, request, *args, **kwargs):
+        file_format = request.query_params.get('export')
+        if not file_format:
+            return super().list(request, *args, **kwargs)
+        if file_format not in EXPORT_FORMATS:
+            return Response({"error": f"export must be one of: {', '.join(EXPORT_FORMATS)}."}, status=400)
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values(*(lookup for _, lookup in self.export_fields)).iterator(chunk_size=self.export_chunk_size)
+        return export_response(request, file_format, self.export_name, self.export_fields, rows)
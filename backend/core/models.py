@@ -58,4 +58,34 @@ class Organization(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+class RequestProfile(models.Model):
+    """A profiled request (core/profiling.py), listed slowest first in the admin."""
+
+    TRIGGER_CHOICES = [
+        ('header', 'X-Profile header'),
+        ('sample', 'Sampled'),
+    ]
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    request_id = models.CharField(max_length=64, blank=True)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    view = models.CharField(max_length=200, db_index=True)
+    status = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField(db_index=True)
+    query_count = models.PositiveIntegerField(default=0)
+    query_ms = models.FloatField(default=0)
+    # [{"sql": ..., "ms": ...}] in execution order
+    queries = models.JSONField(default=list, blank=True)
+    trigger = models.CharField(max_length=10, choices=TRIGGER_CHOICES)
+    profiler = models.CharField(max_length=20)
+    report = models.TextField()
+
+    class Meta:
+        ordering = ['-duration_ms']
+
+    def __str__(self):
+        return f"{self.method} {self.view} {self.duration_ms:.0f}ms"
@@ -0,0 +1,193 @@
+"""
+Opt-in request profiling (PROFILING_ENABLED).
+
+ProfilingMiddleware runs a request under a profiler when
+
+  - it carries `X-Profile: <PROFILING_TOKEN>` (any value when DEBUG), or
+  - it is picked by PROFILING_SAMPLE_RATE (0.0–1.0).
+
+Header requests are always kept; sampled ones only when they took at least
+PROFILING_SLOW_MS, so `PROFILING_SAMPLE_RATE=1.0` with a threshold captures
+every slow request. Each kept request is stored as a RequestProfile with its
+view name, timings, the SQL it ran and the profiler report, and listed in the
+admin slowest first. The newest PROFILING_KEEP rows are kept.
+
+The profiler is pyinstrument when installed (a sampling profiler, cheap
+enough to leave on for a sample of traffic), otherwise cProfile; see
+PROFILING_BACKEND. One request per process is profiled at a time, others run
+normally. Both profilers follow the thread that started them: for async views
+(chat) work done in sync_to_async threads shows up as the await, not the code.
+"""
+
+import cProfile
+import io
+import logging
+import pstats
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.crypto import constant_time_compare
+
+from .instrumentation import query_log
+from .log import current_request_id
+
+logger = logging.getLogger(__name__)
+
+_busy = threading.Lock()
+
+
+# ═══════════════════════════════════════════════════
+# PROFILERS
+# ═══════════════════════════════════════════════════
+
+class _PyinstrumentProfiler:
+    name = 'pyinstrument'
+
+    def __init__(self, is_async):
+        from pyinstrument import Profiler
+        self.profiler = Profiler(interval=0.001, async_mode='enabled' if is_async else 'disabled')
+
+    def start(self):
+        self.profiler.start()
+
+    def stop(self):
+        self.profiler.stop()
+        return self.profiler.output_text(unicode=True, color=False, show_all=False)
+
+
+class _CProfileProfiler:
+    name = 'cprofile'
+
+    def __init__(self, is_async):
+        self.profiler = cProfile.Profile()
+
+    def start(self):
+        self.profiler.enable()
+
+    def stop(self):
+        self.profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats('cumulative').print_stats(80)
+        return out.getvalue()
+
+
+def _make_profiler(is_async):
+    backend = settings.PROFILING_BACKEND
+    if backend in ('auto', 'pyinstrument'):
+        try:
+            return _PyinstrumentProfiler(is_async)
+        except ImportError:
+            if backend == 'pyinstrument':
+                raise
+    return _CProfileProfiler(is_async)
+
+
+# ═══════════════════════════════════════════════════
+# STORAGE
+# ═══════════════════════════════════════════════════
+
+def save_profile(request, response, trigger, profiler, report, seconds, stats):
+    from .models import RequestProfile
+
+    match = request.resolver_match
+    user = getattr(request, 'user', None)
+    queries = stats.log[:settings.PROFILING_MAX_QUERIES]
+    try:
+        RequestProfile.objects.create(
+            request_id=current_request_id() or '',
+            user=user if user is not None and user.is_authenticated else None,
+            method=request.method,
+            path=request.get_full_path()[:500],
+            view=(match.view_name or match._func_path) if match else 'unresolved',
+            status=response.status_code,
+            duration_ms=seconds * 1000,
+            query_count=len(stats.log),
+            query_ms=sum(ms for _, ms in stats.log),
+            queries=[{'sql': sql, 'ms': round(ms, 3)} for sql, ms in queries],
+            trigger=trigger,
+            profiler=profiler.name,
+            report=report,
+        )
+        stale = RequestProfile.objects.order_by('-id').values_list('id', flat=True)[settings.PROFILING_KEEP:settings.PROFILING_KEEP + 1]
+        if stale:
+            RequestProfile.objects.filter(id__lte=stale[0]).delete()
+    except Exception:
+        logger.exception("Could not store request profile")
+
+
+# ═══════════════════════════════════════════════════
+# MIDDLEWARE
+# ═══════════════════════════════════════════════════
+
+class ProfilingMiddleware:
+    """Profiles requests picked by header or sampling and stores the slow ones. Sync and async."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def _trigger(self, request):
+        header = request.headers.get('X-Profile')
+        if header is not None:
+            token = settings.PROFILING_TOKEN
+            if (token and constant_time_compare(header, token)) or (not token and settings.DEBUG):
+                return 'header'
+        if settings.PROFILING_SAMPLE_RATE and random.random() < settings.PROFILING_SAMPLE_RATE:
+            return 'sample'
+        return None
+
+    def _keep(self, trigger, seconds):
+        return trigger == 'header' or seconds * 1000 >= settings.PROFILING_SLOW_MS
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        trigger = self._trigger(request)
+        if trigger is None or not _busy.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            profiler = _make_profiler(False)
+            with query_log() as stats:
+                started = time.perf_counter()
+                profiler.start()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    report = profiler.stop()
+                seconds = time.perf_counter() - started
+        finally:
+            _busy.release()
+        if self._keep(trigger, seconds):
+            save_profile(request, response, trigger, profiler, report, seconds, stats)
+        return response
+
+    async def __acall__(self, request):
+        trigger = self._trigger(request)
+        if trigger is None or not _busy.acquire(blocking=False):
+            return await self.get_response(request)
+        try:
+            profiler = _make_profiler(True)
+            with query_log() as stats:
+                started = time.perf_counter()
+                profiler.start()
+                try:
+                    response = await self.get_response(request)
+                finally:
+                    report = profiler.stop()
+                seconds = time.perf_counter() - started
+        finally:
+            _busy.release()
+        if self._keep(trigger, seconds):
+            await sync_to_async(save_profile)(request, response, trigger, profiler, report, seconds, stats)
+        return response
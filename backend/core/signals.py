@@ -0,0 +1,32 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from properties.models import Property
+from .authentication import invalidate_users
+from .instrumentation import install_query_recorder
+from .models import Organization, User
+
+
+# ═══════════════════════════════════════════════════
+# CACHED JWT PRINCIPALS (authentication.py)
+# ═══════════════════════════════════════════════════
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    invalidate_users([instance.pk])
+
+
+# pre_delete: once deleted, SET_NULL has already detached the users
+@receiver([post_save, pre_delete], sender=Organization)
+def invalidate_organization_users(sender, instance, **kwargs):
+    invalidate_users(User.objects.filter(organization=instance).values_list('pk', flat=True))
+
+
+@receiver([post_save, pre_delete], sender=Property)
+def invalidate_property_managers(sender, instance, **kwargs):
+    invalidate_users(User.objects.filter(managed_property=instance).values_list('pk', flat=True))
+
+
+# Per-request query counting (instrumentation.py)
+connection_created.connect(install_query_recorder)
@@ -0,0 +1,193 @@
+"""
+Synthetic portfolio data for benchmarks and query-plan checks.
+
+    seed_portfolio(organizations=20, properties_per_org=5, units_per_property=200)
+    delete_portfolio('syn1a2b3c')
+
+Everything is written with bulk_create (no model signals, no chatbot
+re-indexing), with a fixed RNG seed so two runs produce the same shape of
+data. Every row is tagged with `tag` in its name/email/username so a seeded
+portfolio is easy to spot and delete_portfolio() can remove it again.
+`manage.py seed_synthetic` wraps both.
+"""
+
+import random
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from communication.models import ChatLog
+from finance.models import Cheque
+from maintenance.models import MaintenanceTicket
+from properties.models import Property, Unit
+from tenants.models import Lease, Tenant
+from .models import Organization, User
+
+BATCH_SIZE = 2000
+
+UNIT_TYPES = [('STUDIO', 0), ('1BHK', 1), ('2BHK', 2), ('3BHK', 3)]
+TICKET_STATUSES = ['OPEN'] * 10 + ['IN_PROGRESS'] * 10 + ['RESOLVED'] * 30 + ['CLOSED'] * 50
+TICKET_PRIORITIES = ['LOW'] * 30 + ['MEDIUM'] * 45 + ['HIGH'] * 20 + ['EMERGENCY'] * 5
+CHAT_QUESTIONS = [
+    ("How many vacant units do we have?", "You have {n} vacant units across your properties."),
+    ("Which cheques bounced this month?", "{n} cheques bounced this month; the tenants have been notified."),
+    ("Show me open maintenance tickets", "There are {n} open tickets, most of them plumbing."),
+    ("When is my next payment?", "Your next cheque of AED {n},000 is due on the 1st."),
+    ("What are the gym hours?", "The gym is open from 6am to 11pm every day."),
+]
+
+
+def seed_portfolio(organizations=1, properties_per_org=5, units_per_property=100, occupancy=0.85,
+                   past_leases_per_unit=1, cheques_per_lease=4, tickets_per_unit=1, tenant_users=0,
+                   chat_logs_per_org=0, chat_log_days=120, password=None, seed=0, tag=None):
+    """
+    Create `organizations` complete portfolios: an owner, a manager (of the
+    first property) and a technician each, properties, units, tenants, active
+    leases on `occupancy` of the units plus `past_leases_per_unit` ended leases
+    per unit, cheques (quarterly) and maintenance tickets. The first
+    `tenant_users` current tenants of each organization get a login, and
+    `chat_logs_per_org` chat logs are spread over the last `chat_log_days` days.
+    All users get `password` (unusable without one).
+
+    Returns a summary dict: tag, organization ids, per-organization user ids
+    (`users[org_id] = {'owner': id, 'manager': id, 'technician': id, 'tenants': [ids]}`)
+    and row counts.
+    """
+    rng = random.Random(seed)
+    tag = tag or f"syn{uuid.uuid4().hex[:6]}"
+    today = date.today()
+    now = timezone.now()
+    # One hash for everyone: hashing per user would dominate the seeding time
+    password = make_password(password)
+    counts = dict.fromkeys(['properties', 'units', 'tenants', 'leases', 'cheques', 'tickets', 'chat_logs'], 0)
+    users = {}
+
+    with transaction.atomic():
+        owners = User.objects.bulk_create([
+            User(username=f"{tag}_owner{i}", role='OWNER', email=f"{tag}_owner{i}@example.com", password=password)
+            for i in range(organizations)
+        ])
+        orgs = Organization.objects.bulk_create([
+            Organization(name=f"{tag} Org {i}", owner=owner) for i, owner in enumerate(owners)
+        ])
+        for owner, org in zip(owners, orgs):
+            owner.organization = org
+        User.objects.bulk_update(owners, ['organization'])
+        technicians = User.objects.bulk_create([
+            User(username=f"{tag}_tech{i}", role='MAINTENANCE', organization=org, specialty='GENERAL', password=password)
+            for i, org in enumerate(orgs)
+        ])
+
+        for i, (owner, org, technician) in enumerate(zip(owners, orgs, technicians)):
+            properties = Property.objects.bulk_create([
+                Property(organization=org, name=f"{tag} Tower {org.id}-{p}", address=f"Plot {p}, Dubai")
+                for p in range(properties_per_org)
+            ])
+            [manager] = User.objects.bulk_create([User(
+                username=f"{tag}_manager{i}", role='MANAGER', organization=org, password=password,
+                managed_property=properties[0] if properties else None,
+            )])
+            units = []
+            for prop in properties:
+                for n in range(units_per_property):
+                    unit_type, bedrooms = rng.choice(UNIT_TYPES)
+                    units.append(Unit(
+                        property=prop, organization=org, unit_number=f"{n // 20 + 1}{n % 20:02d}", unit_type=unit_type,
+                        bedrooms=bedrooms, yearly_rent=Decimal(40000 + bedrooms * 25000 + rng.randrange(0, 20000, 500)),
+                        status='VACANT',
+                    ))
+            units = Unit.objects.bulk_create(units, batch_size=BATCH_SIZE)
+            occupied = [u for u in units if rng.random() < occupancy]
+            for u in occupied:
+                u.status = 'OCCUPIED'
+            Unit.objects.bulk_update(occupied, ['status'], batch_size=BATCH_SIZE)
+
+            # One tenant per lease (current and past)
+            leases_wanted = [(u, True) for u in occupied] + [(u, False) for u in units for _ in range(past_leases_per_unit)]
+            logins = User.objects.bulk_create([
+                User(username=f"{tag}_tenant{org.id}_{n}", role='TENANT', email=f"{tag}-{org.id}-{n}@example.com", password=password)
+                for n in range(min(tenant_users, len(occupied)))
+            ])
+            tenants = Tenant.objects.bulk_create([
+                Tenant(organization=org, name=f"{tag} Tenant {org.id}-{n}", phone=f"05{rng.randrange(10**7, 10**8)}",
+                       email=f"{tag}-{org.id}-{n}@example.com", user=logins[n] if n < len(logins) else None)
+                for n in range(len(leases_wanted))
+            ], batch_size=BATCH_SIZE)
+
+            leases = []
+            for tenant, (unit, active) in zip(tenants, leases_wanted):
+                start = today - timedelta(days=rng.randrange(0, 330)) if active else today - timedelta(days=rng.randrange(400, 1500))
+                leases.append(Lease(tenant=tenant, unit=unit, organization=org, start_date=start, end_date=start + timedelta(days=365),
+                                    rent_amount=unit.yearly_rent, is_active=active))
+            leases = Lease.objects.bulk_create(leases, batch_size=BATCH_SIZE)
+
+            cheques = []
+            for lease in leases:
+                for q in range(cheques_per_lease):
+                    due = lease.start_date + timedelta(days=91 * q)
+                    if due > today:
+                        status = 'PENDING'
+                    else:
+                        status = rng.choices(['CLEARED', 'BOUNCED', 'DEPOSITED', 'PENDING'], [88, 4, 3, 5])[0]
+                    cheques.append(Cheque(organization=org, tenant_id=lease.tenant_id, lease=lease,
+                                          cheque_number=f"{lease.id:07d}{q}", cheque_date=due,
+                                          amount=lease.rent_amount / 4, status=status))
+            Cheque.objects.bulk_create(cheques, batch_size=BATCH_SIZE)
+
+            tenant_by_unit = {lease.unit_id: lease.tenant_id for lease in leases if lease.is_active}
+            tickets = []
+            for unit in units:
+                for _ in range(tickets_per_unit):
+                    status = rng.choice(TICKET_STATUSES)
+                    tickets.append(MaintenanceTicket(
+                        organization=org, unit=unit, tenant_id=tenant_by_unit.get(unit.id),
+                        assigned_to=technician if status != 'OPEN' else None,
+                        title=f"{tag} issue", description="Synthetic ticket.",
+                        priority=rng.choice(TICKET_PRIORITIES), status=status,
+                    ))
+            MaintenanceTicket.objects.bulk_create(tickets, batch_size=BATCH_SIZE)
+
+            askers = [owner, manager] + logins
+            logs = []
+            for _ in range(chat_logs_per_org):
+                question, answer = rng.choice(CHAT_QUESTIONS)
+                logs.append(ChatLog.build(
+                    organization=org, user=rng.choice(askers), user_message=question,
+                    response=answer.format(n=rng.randrange(1, 40)), cache_hit=rng.random() < 0.3,
+                    timestamp=now - timedelta(seconds=rng.randrange(chat_log_days * 86400)),
+                ))
+            ChatLog.objects.bulk_create(logs, batch_size=BATCH_SIZE)
+
+            users[org.id] = {
+                'owner': owner.id, 'manager': manager.id, 'technician': technician.id,
+                'tenants': [login.id for login in logins],
+            }
+            counts['properties'] += len(properties)
+            counts['units'] += len(units)
+            counts['tenants'] += len(tenants)
+            counts['leases'] += len(leases)
+            counts['cheques'] += len(cheques)
+            counts['tickets'] += len(tickets)
+            counts['chat_logs'] += len(logs)
+
+    return {'tag': tag, 'organizations': [org.id for org in orgs], 'users': users, **counts}
+
+
+def delete_portfolio(tag):
+    """Delete everything seed_portfolio() created under `tag`. Returns {model label: rows deleted}."""
+    with transaction.atomic():
+        deleted = {}
+        # Tenants only lose their organization when it goes, so remove them first
+        for queryset in (
+            Tenant.objects.filter(name__startswith=f"{tag} Tenant "),
+            Organization.objects.filter(name__startswith=f"{tag} Org "),
+            User.objects.filter(username__startswith=f"{tag}_"),
+        ):
+            _, per_model = queryset.delete()
+            for label, rows in per_model.items():
+                deleted[label] = deleted.get(label, 0) + rows
+    return deleted
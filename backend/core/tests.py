@@ -1,3 +1,17 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
 
-# Create your tests here.
+from core.management.commands.explain_queries import CHECKS
+
+
+@skipUnless(connection.vendor == 'postgresql', "Query plans are only checked on PostgreSQL.")
+class QueryPlanTests(TestCase):
+    def test_hot_queries_use_indexes(self):
+        # Seeds a large portfolio (rolled back) and raises CommandError on any sequential scan
+        out = StringIO()
+        call_command('explain_queries', stdout=out)
+        self.assertIn(f"All {len(CHECKS)} queries use index scans.", out.getvalue())
@@ -1,16 +1,22 @@
+import logging
+
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.views import TokenObtainPairView
+from django.db import transaction
 from django.db.models import Sum, Count, Q
 
 from properties.models import Property, Unit
+from properties.rules import reindex_property_rules
 from tenants.models import Tenant
 from finance.models import Cheque
 from maintenance.models import MaintenanceTicket
 from core.models import User
 from .serializers import MyTokenObtainPairSerializer
 
+logger = logging.getLogger(__name__)
+
 
 class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
@@ -30,9 +36,9 @@ def dashboard_stats(request):
     elif hasattr(user, 'organization') and user.organization:
         org = user.organization
         properties = Property.objects.filter(organization=org)
-        units = Unit.objects.filter(property__organization=org)
+        units = Unit.objects.filter(organization=org)
         cheques = Cheque.objects.filter(organization=org)
-        tenants = Tenant.objects.filter(leases__unit__property__organization=org).distinct()
+        tenants = Tenant.objects.filter(organization=org)
         tickets = MaintenanceTicket.objects.filter(organization=org)
     else:
         return Response({
@@ -226,8 +232,10 @@ def update_property_rules(request, property_id):
 
     rules = request.data.get('rules_and_regulations', '')
     prop.rules_and_regulations = rules
-    prop.save()
+    with transaction.atomic():
+        prop.save()
+        reindex_property_rules(prop)
 
-    print(f"📋 Rules updated for {prop.name} by {user.username}")
+    logger.info("Rules updated for property #%s by user %s", prop.id, user.pk, extra={'property_id': prop.id})
 
     return Response({"message": "Rules updated successfully.", "rules": prop.rules_and_regulations})
\ No newline at end of file
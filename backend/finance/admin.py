@@ -1,5 +1,16 @@
 from django.contrib import admin
-from .models import Cheque
+from .models import BankStatement, BankStatementLine, Cheque, ChequeTransition
+
+class ChequeTransitionInline(admin.TabularInline):
+    model = ChequeTransition
+    extra = 0
+    can_delete = False
+    fields = ('created_at', 'from_status', 'to_status', 'source', 'changed_by')
+    readonly_fields = fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
 
 @admin.register(Cheque)
 class ChequeAdmin(admin.ModelAdmin):
@@ -7,4 +18,49 @@ class ChequeAdmin(admin.ModelAdmin):
     list_filter = ('status', 'organization', 'bank_name')
     search_fields = ('cheque_number', 'tenant__name')
     list_editable = ('status',)
-    ordering = ('-cheque_date',)
\ No newline at end of file
+    ordering = ('-cheque_date',)
+    inlines = [ChequeTransitionInline]
+
+
+@admin.register(ChequeTransition)
+class ChequeTransitionAdmin(admin.ModelAdmin):
+    """Append-only: read-only in the admin."""
+    list_display = ('cheque', 'from_status', 'to_status', 'source', 'changed_by', 'created_at')
+    list_filter = ('source', 'to_status', 'organization')
+    list_select_related = ('cheque', 'changed_by')
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(BankStatement)
+class BankStatementAdmin(admin.ModelAdmin):
+    list_display = ('filename', 'organization', 'uploaded_by', 'uploaded_at', 'line_count', 'matched_count', 'applied_at')
+    list_filter = ('organization',)
+    list_select_related = ('organization', 'uploaded_by')
+    readonly_fields = ('organization', 'filename', 'uploaded_by', 'uploaded_at', 'line_count', 'matched_count',
+                       'applied_by', 'applied_at')
+    date_hierarchy = 'uploaded_at'
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(BankStatementLine)
+class BankStatementLineAdmin(admin.ModelAdmin):
+    list_display = ('statement', 'line_number', 'date', 'amount', 'kind', 'cheque', 'match_rule', 'proposed_status',
+                    'applied', 'note')
+    list_filter = ('kind', 'match_rule', 'proposed_status', 'applied')
+    list_select_related = ('statement', 'cheque')
+    search_fields = ('description', 'reference', 'cheque__cheque_number')
+    raw_id_fields = ('statement', 'cheque')
+
+    def has_add_permission(self, request):
+        return False
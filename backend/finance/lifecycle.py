@@ -0,0 +1,118 @@
+"""
+Cheque status lifecycle.
+
+    PENDING ──(cheque date arrives)──▶ DEPOSITED ──▶ CLEARED
+                                            └──────▶ BOUNCED ──(re-presented)──▶ DEPOSITED
+
+transition() moves a set of cheques to a new status in batches: per source
+status it locks the rows, applies one UPDATE per batch and bulk-inserts the
+matching ChequeTransition rows, all in one transaction. Because update()
+skips model signals, it then does once per batch what the signals would have
+done per cheque (chat context / report cache versions, vector index), and
+sends `cheques_transitioned` once per organization with the totals, which is
+what notifications hang off (one message per organization, not per cheque).
+
+deposit_due_cheques() is the daily beat job (tasks.py): every PENDING cheque
+dated today or earlier goes to DEPOSITED.
+"""
+
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from communication.context import bump_versions
+from communication.signals import _org_scopes
+from communication.tasks import index_context_documents
+from .models import Cheque, ChequeTransition
+
+logger = logging.getLogger(__name__)
+
+# Status → statuses it may move to
+TRANSITIONS = {
+    'PENDING': ('DEPOSITED',),
+    'DEPOSITED': ('CLEARED', 'BOUNCED'),
+    'BOUNCED': ('DEPOSITED',),
+    'CLEARED': (),
+}
+
+# Sent once per organization after a batch transition commits, with
+# organization_id, source and changes: [{'from_status', 'to_status', 'count', 'amount', 'cheque_ids'}]
+cheques_transitioned = Signal()
+
+
+def allowed_sources(to_status):
+    return [status for status, targets in TRANSITIONS.items() if to_status in targets]
+
+
+def transition(cheques, to_status, source, user=None, from_statuses=None):
+    """
+    Move `cheques` (a queryset) to `to_status`, from `from_statuses` (default:
+    every status allowed to move there; others are left alone). Rows locked
+    by a concurrent change are skipped and picked up next time.
+    Returns {organization_id: changes}.
+    """
+    batch_size = settings.CHEQUE_TRANSITION_BATCH_SIZE
+    allowed = allowed_sources(to_status)
+    summary = defaultdict(dict)
+    changed_ids = []
+    tenant_ids = set()
+    with transaction.atomic():
+        for from_status in from_statuses or allowed:
+            if from_status not in allowed:
+                raise ValueError(f"Cheques can't move from {from_status} to {to_status}.")
+            rows = list(
+                cheques.filter(status=from_status).order_by()
+                .select_for_update(skip_locked=True, of=('self',))
+                .values_list('id', 'organization_id', 'tenant_id', 'amount')
+            )
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                ids = [row[0] for row in batch]
+                Cheque.objects.filter(id__in=ids).update(status=to_status, updated_at=timezone.now())
+                ChequeTransition.objects.bulk_create([
+                    ChequeTransition(
+                        cheque_id=cheque_id, organization_id=org_id, from_status=from_status,
+                        to_status=to_status, source=source, changed_by=user,
+                    )
+                    for cheque_id, org_id, _, _ in batch
+                ])
+            for cheque_id, org_id, tenant_id, amount in rows:
+                change = summary[org_id].setdefault(from_status, {
+                    'from_status': from_status, 'to_status': to_status,
+                    'count': 0, 'amount': Decimal('0'), 'cheque_ids': [],
+                })
+                change['count'] += 1
+                change['amount'] += amount
+                change['cheque_ids'].append(cheque_id)
+                tenant_ids.add(tenant_id)
+            changed_ids += [row[0] for row in rows]
+
+        result = {org_id: list(changes.values()) for org_id, changes in summary.items()}
+        if changed_ids:
+            transaction.on_commit(lambda: _after_commit(result, changed_ids, tenant_ids, source), robust=True)
+    return result
+
+
+def _after_commit(summary, changed_ids, tenant_ids, source):
+    # What communication/signals.py does per saved cheque, once for the batch
+    bump_versions(_org_scopes(list(summary), 'cheque') + [f"tenant:{tenant_id}" for tenant_id in tenant_ids])
+    batch_size = settings.CHEQUE_TRANSITION_BATCH_SIZE
+    for start in range(0, len(changed_ids), batch_size):
+        index_context_documents.delay('CHEQUE', changed_ids[start:start + batch_size])
+
+    for org_id, changes in summary.items():
+        cheques_transitioned.send(sender=Cheque, organization_id=org_id, source=source, changes=changes)
+
+
+def deposit_due_cheques(today=None):
+    """Daily: PENDING cheques dated today or earlier → DEPOSITED. Returns {organization_id: changes}."""
+    today = today or timezone.localdate()
+    summary = transition(Cheque.objects.filter(cheque_date__lte=today), 'DEPOSITED', 'SCHEDULE', from_statuses=['PENDING'])
+    count = sum(change['count'] for changes in summary.values() for change in changes)
+    logger.info("Moved %d due cheques to DEPOSITED across %d organizations", count, len(summary))
+    return summary
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:33
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY: no write lock on live tables, can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('core', '0004_user_managed_property'),
+        ('finance', '0004_cheque_lease_alter_cheque_cheque_number'),
+        ('tenants', '0006_hot_path_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='cheque',
+            index=models.Index(fields=['organization', 'status', 'cheque_date'], name='cheque_org_status_date'),
+        ),
+        AddIndexConcurrently(
+            model_name='cheque',
+            index=models.Index(fields=['tenant', 'cheque_date'], name='cheque_tenant_date'),
+        ),
+    ]
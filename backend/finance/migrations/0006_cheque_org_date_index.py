@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:11
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY: no write lock on live tables, can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('finance', '0005_hot_path_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='cheque',
+            index=models.Index(fields=['organization', 'cheque_date'], name='cheque_org_date'),
+        ),
+    ]
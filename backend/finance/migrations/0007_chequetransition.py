@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_requestprofile'),
+        ('finance', '0006_cheque_org_date_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChequeTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(choices=[('PENDING', 'Pending (Safe with Landlord)'), ('DEPOSITED', 'Deposited to Bank'), ('CLEARED', 'Cleared (Money Received)'), ('BOUNCED', 'Bounced (Action Required)')], max_length=20)),
+                ('to_status', models.CharField(choices=[('PENDING', 'Pending (Safe with Landlord)'), ('DEPOSITED', 'Deposited to Bank'), ('CLEARED', 'Cleared (Money Received)'), ('BOUNCED', 'Bounced (Action Required)')], max_length=20)),
+                ('source', models.CharField(choices=[('SCHEDULE', 'Scheduled job'), ('MANUAL', 'Manual edit'), ('RECONCILIATION', 'Bank reconciliation')], max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('cheque', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transitions', to='finance.cheque')),
+                ('organization', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='cheque_transitions', to='core.organization')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['cheque', 'created_at'], name='cheque_transition_cheque'), models.Index(fields=['organization', '-created_at'], name='cheque_transition_org')],
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_requestprofile'),
+        ('finance', '0007_chequetransition'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankStatement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(max_length=255)),
+                ('uploaded_at', models.DateTimeField(auto_now_add=True)),
+                ('line_count', models.PositiveIntegerField(default=0)),
+                ('matched_count', models.PositiveIntegerField(default=0)),
+                ('applied_at', models.DateTimeField(blank=True, null=True)),
+                ('applied_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bank_statements', to='core.organization')),
+                ('uploaded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-uploaded_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='BankStatementLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('line_number', models.PositiveIntegerField()),
+                ('date', models.DateField()),
+                ('description', models.CharField(blank=True, max_length=255)),
+                ('reference', models.CharField(blank=True, max_length=50)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('kind', models.CharField(choices=[('CREDIT', 'Credit'), ('RETURN', 'Returned cheque'), ('OTHER', 'Other (ignored)')], max_length=10)),
+                ('match_rule', models.CharField(blank=True, choices=[('CHEQUE_NUMBER', 'Cheque number and amount'), ('TENANT', 'Amount, date and tenant name'), ('AMOUNT', 'Amount and date')], max_length=20)),
+                ('proposed_status', models.CharField(blank=True, choices=[('PENDING', 'Pending (Safe with Landlord)'), ('DEPOSITED', 'Deposited to Bank'), ('CLEARED', 'Cleared (Money Received)'), ('BOUNCED', 'Bounced (Action Required)')], max_length=20)),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('applied', models.BooleanField(default=False)),
+                ('cheque', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='statement_lines', to='finance.cheque')),
+                ('statement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='finance.bankstatement')),
+            ],
+            options={
+                'ordering': ['statement', 'line_number'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='bankstatement',
+            index=models.Index(fields=['organization', '-uploaded_at'], name='bank_statement_org'),
+        ),
+        migrations.AddIndex(
+            model_name='bankstatementline',
+            index=models.Index(fields=['statement', 'line_number'], name='bank_statement_line'),
+        ),
+    ]
@@ -40,5 +40,127 @@ class Cheque(models.Model):
     def __str__(self):
         return f"#{self.cheque_number} - {self.amount} AED"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Status as loaded, so saving a change records a ChequeTransition (signals.py)
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
+    class Meta:
+        ordering = ['-cheque_date']
+        indexes = [
+            # Cheque list / dashboard: one org, filtered by status, ordered by date
+            models.Index(fields=['organization', 'status', 'cheque_date'], name='cheque_org_status_date'),
+            # Unfiltered list and exports in date order: first rows without sorting the org
+            models.Index(fields=['organization', 'cheque_date'], name='cheque_org_date'),
+            # Tenant payment schedule and next-cheque lookups
+            models.Index(fields=['tenant', 'cheque_date'], name='cheque_tenant_date'),
+        ]
+
+
+class ChequeTransition(models.Model):
+    """
+    Append-only history of cheque status changes: one row per cheque per
+    change, written by lifecycle.transition() for batch moves and by
+    signals.py for single edits (admin, API).
+    """
+    SOURCE_CHOICES = [
+        ('SCHEDULE', 'Scheduled job'),
+        ('MANUAL', 'Manual edit'),
+        ('RECONCILIATION', 'Bank reconciliation'),
+    ]
+
+    cheque = models.ForeignKey(Cheque, on_delete=models.CASCADE, related_name='transitions')
+    organization = models.ForeignKey(
+        'core.Organization', on_delete=models.CASCADE, related_name='cheque_transitions',
+        null=True, blank=True, db_index=False,
+    )
+    from_status = models.CharField(max_length=20, choices=Cheque.STATUS_CHOICES)
+    to_status = models.CharField(max_length=20, choices=Cheque.STATUS_CHOICES)
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    changed_by = models.ForeignKey(
+        'core.User', on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['cheque', 'created_at'], name='cheque_transition_cheque'),
+            models.Index(fields=['organization', '-created_at'], name='cheque_transition_org'),
+        ]
+
+    def __str__(self):
+        return f"Cheque {self.cheque_id}: {self.from_status} → {self.to_status}"
+
+    def save(self, *args, **kwargs):
+        if self.pk is not None:
+            raise ValueError("Cheque transitions are append-only.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("Cheque transitions are append-only.")
+
+
+class BankStatement(models.Model):
+    """An imported bank statement file; its lines carry the proposed cheque matches (reconciliation.py)."""
+    organization = models.ForeignKey('core.Organization', on_delete=models.CASCADE, related_name='bank_statements')
+    filename = models.CharField(max_length=255)
+    uploaded_by = models.ForeignKey(
+        'core.User', on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+    )
+    uploaded_at = models.DateTimeField(auto_now_add=True)
+    line_count = models.PositiveIntegerField(default=0)
+    matched_count = models.PositiveIntegerField(default=0)
+    applied_by = models.ForeignKey(
+        'core.User', on_delete=models.SET_NULL, null=True, blank=True, related_name='+',
+    )
+    applied_at = models.DateTimeField(null=True, blank=True)
+
     class Meta:
-        ordering = ['-cheque_date']
\ No newline at end of file
+        ordering = ['-uploaded_at']
+        indexes = [
+            models.Index(fields=['organization', '-uploaded_at'], name='bank_statement_org'),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.uploaded_at:%Y-%m-%d})"
+
+
+class BankStatementLine(models.Model):
+    KIND_CHOICES = [
+        ('CREDIT', 'Credit'),
+        ('RETURN', 'Returned cheque'),
+        ('OTHER', 'Other (ignored)'),
+    ]
+    RULE_CHOICES = [
+        ('CHEQUE_NUMBER', 'Cheque number and amount'),
+        ('TENANT', 'Amount, date and tenant name'),
+        ('AMOUNT', 'Amount and date'),
+    ]
+
+    statement = models.ForeignKey(BankStatement, on_delete=models.CASCADE, related_name='lines')
+    line_number = models.PositiveIntegerField()
+    date = models.DateField()
+    description = models.CharField(max_length=255, blank=True)
+    reference = models.CharField(max_length=50, blank=True)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+
+    cheque = models.ForeignKey(
+        Cheque, on_delete=models.SET_NULL, null=True, blank=True, related_name='statement_lines',
+    )
+    match_rule = models.CharField(max_length=20, choices=RULE_CHOICES, blank=True)
+    proposed_status = models.CharField(max_length=20, choices=Cheque.STATUS_CHOICES, blank=True)
+    note = models.CharField(max_length=255, blank=True)
+    applied = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ['statement', 'line_number']
+        indexes = [
+            models.Index(fields=['statement', 'line_number'], name='bank_statement_line'),
+        ]
+
+    def __str__(self):
+        return f"Line {self.line_number}: {self.amount} on {self.date}"
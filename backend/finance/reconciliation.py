@@ -0,0 +1,430 @@
+"""
+Bank statement reconciliation: match statement lines to cheques and clear or
+bounce them in bulk.
+
+    statement = import_statement(organization_id, 'march.csv', data, user)   # parse + propose
+    apply_statement(statement, user)                                          # CLEARED / BOUNCED
+
+import_statement() parses a bank CSV export (columns found by header name,
+see COLUMN_ALIASES), loads the organization's cheques dated within the
+statement's range for the amounts on it in one query, and indexes them in
+dicts by cheque number and by (amount, date). Each line is then matched with a few dict lookups, in three
+passes so the surest matches claim their cheque first:
+
+  1. CHEQUE_NUMBER  cheque number on the line (column or "CHQ 001234" in the
+                    description) and the same amount
+  2. TENANT         same amount, dated within the window, and the tenant's
+                    name in the description — only when one cheque fits
+  3. AMOUNT         same amount, dated within the window — only when one
+                    cheque fits
+
+Credits propose CLEARED, returned-cheque lines (RETURN_WORDS) BOUNCED; a
+return matching a cheque credited earlier in the same statement replaces that
+proposal. Lines are stored with their match, proposal or the reason they
+didn't match, for review before apply_statement() moves the cheques through
+lifecycle.transition() (source RECONCILIATION, one UPDATE per batch).
+
+The window is RECONCILIATION_DATE_WINDOW_DAYS after the cheque date: a cheque
+can't be paid before its date, and clears a few days after deposit.
+"""
+
+import csv
+import io
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .lifecycle import allowed_sources, transition
+from .models import BankStatement, BankStatementLine, Cheque
+
+RECONCILIATION_ROLES = ('SUPER_ADMIN', 'OWNER', 'FINANCE')
+
+MAX_STATEMENT_LINES = 50_000
+
+# Normalized header → column. The first header that matches wins.
+COLUMN_ALIASES = {
+    'date': ('date', 'transaction date', 'txn date', 'value date', 'posting date', 'booking date', 'trans date'),
+    'description': ('description', 'narrative', 'narration', 'details', 'transaction details', 'particulars', 'remarks'),
+    'reference': ('cheque no', 'cheque number', 'chq no', 'cheque', 'check no', 'check number', 'instrument no',
+                  'reference', 'ref no', 'reference no', 'reference number', 'ref'),
+    'credit': ('credit', 'credit amount', 'credits', 'deposit', 'deposits', 'money in', 'cr'),
+    'debit': ('debit', 'debit amount', 'debits', 'withdrawal', 'withdrawals', 'money out', 'dr'),
+    'amount': ('amount', 'transaction amount', 'amount aed', 'value'),
+}
+
+DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%d-%b-%Y', '%d %b %Y', '%d/%m/%y', '%d-%b-%y')
+
+RETURN_WORDS = re.compile(r'\b(RETURN(ED)?|RTN|RTD|RET|BOUNCED?|UNPAID|DISHONOU?RED|INSUFFICIENT|REJECTED)\b')
+_NOT_ALNUM = re.compile(r'[^0-9A-Z]')
+_WORD = re.compile(r'[A-Z0-9]+')
+CHEQUE_IN_TEXT = re.compile(r'\b(?:CHQ|CHEQUE|CHECK|CHK|CLG)\b\.?\s*(?:NO\.?|NUMBER|#)?\s*[:#-]?\s*(\d{4,})')
+
+
+class StatementError(ValueError):
+    """The file can't be read as a bank statement; the message is shown to the user."""
+
+
+def can_reconcile(user):
+    return bool(user.organization_id) and (user.is_superuser or user.role in RECONCILIATION_ROLES)
+
+
+# ═══════════════════════════════════════════════════
+# PARSING
+# ═══════════════════════════════════════════════════
+
+def _normalize_header(value):
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', value.lower()).split())
+
+
+def _find_columns(header):
+    names = [_normalize_header(cell) for cell in header]
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in names:
+                columns[field] = names.index(alias)
+                break
+    if 'date' in columns and ('amount' in columns or 'credit' in columns):
+        return columns
+    return None
+
+
+def _parse_date(value):
+    value = value.strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _parse_amount(value):
+    """'1,250.00', '(1,250.00)', 'AED 1250', '-1250' → Decimal (negative for the last two forms); None if blank."""
+    value = value.strip().upper().replace('AED', '').replace(',', '').replace(' ', '')
+    if not value:
+        return None
+    negative = value.startswith('(') and value.endswith(')')
+    if negative:
+        value = value[1:-1]
+    if value.endswith('CR'):
+        value = value[:-2]
+    elif value.endswith('DR'):
+        value, negative = value[:-2], True
+    try:
+        amount = Decimal(value).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        raise StatementError(f"Unreadable amount: {value!r}.")
+    return -amount if negative else amount
+
+
+def normalize_cheque_number(value):
+    """Upper-case letters and digits only; all-digit numbers without leading zeros."""
+    value = _NOT_ALNUM.sub('', (value or '').upper())
+    return value.lstrip('0') or value if value.isdigit() else value
+
+
+def parse_statement(data):
+    """
+    Bank CSV (bytes) → [{'line_number', 'date', 'description', 'reference', 'amount', 'kind'}].
+    Rows before the header and rows without a date (balances, footers) are skipped.
+    """
+    try:
+        text = data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        text = data.decode('latin-1')
+    try:
+        dialect = csv.Sniffer().sniff(text[:4096], delimiters=',;\t|')
+    except csv.Error:
+        dialect = csv.excel
+    rows = csv.reader(io.StringIO(text), dialect)
+
+    columns = None
+    for row in rows:
+        columns = _find_columns(row)
+        if columns or rows.line_num >= 30:
+            break
+    if not columns:
+        raise StatementError("No header row with a date and an amount (or credit) column was found.")
+
+    def cell(row, field):
+        index = columns.get(field)
+        return row[index].strip() if index is not None and index < len(row) else ''
+
+    lines = []
+    for row in rows:
+        day = _parse_date(cell(row, 'date'))
+        if day is None:
+            continue
+        try:
+            if 'credit' in columns:
+                credit, debit = _parse_amount(cell(row, 'credit')), _parse_amount(cell(row, 'debit'))
+                amount = credit if credit else (-abs(debit) if debit else None)
+            else:
+                amount = _parse_amount(cell(row, 'amount'))
+        except StatementError as error:
+            raise StatementError(f"Line {rows.line_num}: {error}")
+        if not amount:
+            continue
+        description = ' '.join(cell(row, 'description').split())
+        reference = cell(row, 'reference')
+        if not normalize_cheque_number(reference).isdigit():
+            found = CHEQUE_IN_TEXT.search(description.upper())
+            reference = found.group(1) if found else reference
+        if RETURN_WORDS.search(description.upper()):
+            kind = 'RETURN'
+        else:
+            kind = 'CREDIT' if amount > 0 else 'OTHER'
+        lines.append({
+            'line_number': rows.line_num, 'date': day, 'description': description[:255],
+            'reference': reference[:50], 'amount': abs(amount), 'kind': kind,
+        })
+        if len(lines) > MAX_STATEMENT_LINES:
+            raise StatementError(f"Statements are limited to {MAX_STATEMENT_LINES:,} lines; split the file.")
+    if not lines:
+        raise StatementError("The statement has no transactions.")
+    return lines
+
+
+# ═══════════════════════════════════════════════════
+# MATCHING
+# ═══════════════════════════════════════════════════
+
+def _words(text):
+    return set(_WORD.findall(text.upper()))
+
+
+def _name_words(name):
+    """Words of a tenant name that must all be on a line to match it (short ones like AL, BIN are skipped)."""
+    words = _words(name)
+    return {word for word in words if len(word) >= 3 or word.isdigit()} or words
+
+
+class Matcher:
+    """In-memory indexes over one organization's cheques for a statement's dates."""
+
+    def __init__(self, cheques, window_days):
+        self.window = window_days
+        self.by_number = defaultdict(list)
+        self.by_amount_date = defaultdict(list)
+        self.names = {}  # tenant name → _name_words(), filled as needed
+        for cheque in cheques:
+            self.by_number[normalize_cheque_number(cheque['cheque_number'])].append(cheque)
+            self.by_amount_date[cheque['amount'], cheque['cheque_date']].append(cheque)
+
+    def _in_window(self, cheque, line):
+        return 0 <= (line['date'] - cheque['cheque_date']).days <= self.window
+
+    def by_cheque_number(self, line):
+        number = normalize_cheque_number(line['reference'])
+        if not number:
+            return [], None
+        found = self.by_number.get(number, [])
+        fits = [c for c in found if c['amount'] == line['amount'] and self._in_window(c, line)]
+        if found and not fits:
+            return [], f"Cheque {line['reference']} found, but its amount or date doesn't fit this line."
+        return fits, None
+
+    def by_amount(self, line):
+        return [
+            cheque
+            for days in range(self.window + 1)
+            for cheque in self.by_amount_date.get((line['amount'], line['date'] - timedelta(days=days)), ())
+        ]
+
+    def by_tenant(self, candidates, line):
+        words = _words(line['description'])
+        named = []
+        for cheque in candidates:
+            name = cheque['tenant_name'] or ''
+            if name not in self.names:
+                self.names[name] = _name_words(name)
+            if self.names[name] and self.names[name] <= words:
+                named.append(cheque)
+        return named
+
+
+def match_lines(lines, cheques, window_days):
+    """
+    Set 'cheque_id', 'match_rule', 'proposed_status' and 'note' on each line
+    (dicts from parse_statement()); `cheques` are dicts with id,
+    cheque_number, amount, cheque_date, status and tenant_name.
+    """
+    matcher = Matcher(cheques, window_days)
+    claimed = {}  # cheque id → line that took it
+    pending = []
+    for line in lines:
+        line.update(cheque_id=None, match_rule='', proposed_status='', note='')
+        if line['kind'] == 'OTHER':
+            line['note'] = "Debit; not a cheque payment."
+        else:
+            pending.append(line)
+
+    def available(candidates, line):
+        # A return may take the cheque a credit in this statement claimed; nothing else may
+        return [
+            c for c in candidates
+            if c['id'] not in claimed or (line['kind'] == 'RETURN' and claimed[c['id']]['kind'] == 'CREDIT')
+        ]
+
+    def claim(line, cheque, rule):
+        previous = claimed.get(cheque['id'])
+        if previous is not None:
+            previous.update(proposed_status='', note=f"Returned on line {line['line_number']}.")
+        claimed[cheque['id']] = line
+        target = 'BOUNCED' if line['kind'] == 'RETURN' else 'CLEARED'
+        line.update(cheque_id=cheque['id'], match_rule=rule, note='')
+        if cheque['status'] == target:
+            line['note'] = f"Already {target}."
+        elif cheque['status'] in ('PENDING', *allowed_sources(target)):
+            line['proposed_status'] = target
+        else:
+            line['note'] = f"Cheque is {cheque['status']}; it can't become {target}."
+
+    # Pass 1: cheque number
+    unmatched = []
+    for line in pending:
+        candidates, note = matcher.by_cheque_number(line)
+        candidates = available(candidates, line)
+        if candidates:
+            claim(line, min(candidates, key=lambda c: line['date'] - c['cheque_date']), 'CHEQUE_NUMBER')
+        else:
+            line['note'] = note or ''
+            unmatched.append(line)
+
+    # Passes 2 and 3: amount and date, narrowed by tenant name, unambiguous only
+    for line in unmatched:
+        candidates = available(matcher.by_amount(line), line)
+        named = matcher.by_tenant(candidates, line)
+        if len(named) == 1:
+            claim(line, named[0], 'TENANT')
+        elif len(candidates) == 1 and not named:
+            claim(line, candidates[0], 'AMOUNT')
+        elif len(named) > 1 or len(candidates) > 1:
+            line['note'] = (
+                f"{len(named) or len(candidates)} cheques of AED {line['amount']:,.2f} fit; "
+                "add the cheque number to tell them apart."
+            )
+        elif not line['note']:
+            line['note'] = f"No cheque of AED {line['amount']:,.2f} dated up to {window_days} days before."
+    return lines
+
+
+# ═══════════════════════════════════════════════════
+# IMPORT / APPLY
+# ═══════════════════════════════════════════════════
+
+def import_statement(organization_id, filename, data, user=None):
+    """Parse `data` (CSV bytes), match it against the organization's cheques and store the proposals."""
+    lines = parse_statement(data)
+    window = settings.RECONCILIATION_DATE_WINDOW_DAYS
+    first = min(line['date'] for line in lines)
+    last = max(line['date'] for line in lines)
+    cheques = Cheque.objects.filter(
+        organization_id=organization_id, cheque_date__range=(first - timedelta(days=window), last),
+        amount__in={line['amount'] for line in lines if line['kind'] != 'OTHER'},
+    ).order_by().values('id', 'cheque_number', 'amount', 'cheque_date', 'status', tenant_name=F('tenant__name'))
+    match_lines(lines, cheques.iterator(chunk_size=5000), window)
+
+    with transaction.atomic():
+        statement = BankStatement.objects.create(
+            organization_id=organization_id, filename=filename[:255], uploaded_by=user,
+            line_count=len(lines), matched_count=sum(line['cheque_id'] is not None for line in lines),
+        )
+        BankStatementLine.objects.bulk_create([BankStatementLine(statement=statement, **line) for line in lines], batch_size=2000)
+    return statement
+
+
+def apply_statement(statement, user=None, line_ids=None):
+    """
+    Move the cheques of the statement's open proposals (or just `line_ids`)
+    to their proposed status. PENDING cheques are recorded as DEPOSITED first.
+    Returns {'CLEARED': n, 'BOUNCED': n, 'applied': lines applied}; lines whose
+    cheque was changed meanwhile (or locked) stay open.
+    """
+    with transaction.atomic():
+        statement = BankStatement.objects.select_for_update().get(pk=statement.pk)
+        lines = statement.lines.filter(applied=False, cheque__isnull=False).exclude(proposed_status='')
+        if line_ids is not None:
+            lines = lines.filter(id__in=line_ids)
+        proposed = defaultdict(list)
+        for cheque_id, status in lines.values_list('cheque_id', 'proposed_status'):
+            proposed[status].append(cheque_id)
+
+        result = {'CLEARED': 0, 'BOUNCED': 0}
+        for to_status, cheque_ids in proposed.items():
+            cheques = Cheque.objects.filter(organization_id=statement.organization_id, id__in=cheque_ids)
+            transition(cheques, 'DEPOSITED', 'RECONCILIATION', user, from_statuses=['PENDING'])
+            changes = transition(cheques, to_status, 'RECONCILIATION', user, from_statuses=['DEPOSITED'])
+            result[to_status] = sum(change['count'] for org_changes in changes.values() for change in org_changes)
+
+        result['applied'] = lines.filter(cheque__status=F('proposed_status')).update(applied=True)
+        statement.applied_at = timezone.now()
+        statement.applied_by = user
+        statement.save(update_fields=['applied_at', 'applied_by'])
+    return result
+
+
+# ═══════════════════════════════════════════════════
+# REPORT
+# ═══════════════════════════════════════════════════
+
+STATEMENT_COLUMNS = [
+    ('Line', 'line_number'), ('Date', 'date'), ('Description', 'description'), ('Reference', 'reference'),
+    ('Amount', 'amount'), ('Kind', 'kind'), ('Cheque', 'cheque_number'), ('Cheque date', 'cheque_date'),
+    ('Tenant', 'tenant_name'), ('Cheque status', 'cheque_status'), ('Matched by', 'match_rule'),
+    ('Proposed', 'proposed_status'), ('Applied', 'applied'), ('Note', 'note'),
+]
+
+
+def statement_lines(statement):
+    return statement.lines.values(
+        'id', 'line_number', 'date', 'description', 'reference', 'amount', 'kind', 'cheque_id',
+        'match_rule', 'proposed_status', 'applied', 'note',
+        cheque_number=F('cheque__cheque_number'), cheque_date=F('cheque__cheque_date'),
+        cheque_status=F('cheque__status'), tenant_name=F('cheque__tenant__name'),
+    ).order_by('line_number')
+
+
+def statement_report(statement):
+    """Proposals, lines matched with nothing to do, and unmatched cheque lines, with totals."""
+    proposals, settled, unmatched = [], [], []
+    ignored = 0
+    for line in statement_lines(statement):
+        if line['kind'] == 'OTHER':
+            ignored += 1
+        elif line['cheque_id'] is None:
+            unmatched.append(line)
+        elif line['proposed_status']:
+            proposals.append(line)
+        else:
+            settled.append(line)
+
+    def total(rows):
+        return sum((row['amount'] for row in rows), Decimal('0'))
+
+    return {
+        'id': statement.id,
+        'filename': statement.filename,
+        'uploaded_at': statement.uploaded_at,
+        'applied_at': statement.applied_at,
+        'totals': {
+            'lines': statement.line_count,
+            'ignored': ignored,
+            'proposed': len(proposals),
+            'proposed_amount': total(proposals),
+            'applied': sum(row['applied'] for row in proposals),
+            'settled': len(settled),
+            'unmatched': len(unmatched),
+            'unmatched_amount': total(unmatched),
+        },
+        'proposals': proposals,
+        'settled': settled,
+        'unmatched': unmatched,
+    }
@@ -0,0 +1,267 @@
+"""
+Finance reports: rent roll, receivables aging and monthly collections.
+
+Each report is one grouped SQL query (conditional SUMs, date_trunc for the
+months), so its cost depends on the number of units / groups returned, not
+on how many cheques sit behind them. Results are cached per scope under the
+chatbot's data version counters (communication/context.py, bumped by
+communication/signals.py on every Property, Unit, Tenant, Lease or Cheque
+change), so a report is rebuilt only after the data it reads has changed;
+REPORTS_CACHE_TTL is a safety net.
+
+Scope: superusers see every organization, owners and finance staff their
+organization, managers their managed property (report_scope()).
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, F, FilteredRelation, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncMonth
+from django.utils import timezone
+
+from communication.context import _version_key
+from properties.models import Unit
+from .models import Cheque
+
+REPORT_ROLES = ('SUPER_ADMIN', 'OWNER', 'FINANCE', 'MANAGER')
+
+RECEIVABLE_STATUSES = ('PENDING', 'BOUNCED')
+OUTSTANDING_STATUSES = ('PENDING', 'DEPOSITED', 'BOUNCED')
+
+# Data each report reads (version counter topics)
+_TOPICS = ('property', 'unit', 'tenant', 'lease', 'cheque')
+
+
+def report_scope(user):
+    """
+    (organization id or None for all, property id or None) the user's reports
+    cover, or None when they may not see finance reports.
+    """
+    if user.is_superuser:
+        return None, None
+    if user.role not in REPORT_ROLES or not user.organization_id:
+        return None
+    if user.role == 'MANAGER':
+        if not user.managed_property_id:
+            return None
+        return user.organization_id, user.managed_property_id
+    return user.organization_id, None
+
+
+def _total(field, condition=None):
+    return Coalesce(
+        Sum(field, filter=condition), Value(Decimal('0')),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+
+
+def _cached(name, org_id, params, build):
+    scope = f"org:{org_id}" if org_id else 'all'
+    stored = cache.get_many([_version_key(scope, topic) for topic in _TOPICS])
+    versions = '.'.join(str(stored.get(_version_key(scope, topic), 1)) for topic in _TOPICS)
+    key = f"report:{name}:{scope}:{params}:{versions}"
+    report = cache.get(key)
+    if report is None:
+        report = build()
+        cache.set(key, report, settings.REPORTS_CACHE_TTL)
+    return report
+
+
+# ═══════════════════════════════════════════════════
+# RENT ROLL
+# ═══════════════════════════════════════════════════
+
+RENT_ROLL_COLUMNS = [
+    ('Property', 'property_name'), ('Unit', 'unit_number'), ('Type', 'unit_type'), ('Status', 'status'),
+    ('Market rent', 'yearly_rent'), ('Tenant', 'tenant_name'), ('Lease start', 'lease_start'),
+    ('Lease end', 'lease_end'), ('Contract rent', 'rent_amount'), ('Cheques total', 'expected'),
+    ('Collected', 'collected'), ('Outstanding', 'outstanding'), ('Bounced', 'bounced'),
+]
+
+
+def rent_roll(org_id=None, property_id=None):
+    """
+    Every unit with its active lease and that lease's cheques (total, cleared,
+    outstanding, bounced), plus per-property and overall totals.
+    """
+    def build():
+        units = Unit.objects.all()
+        if org_id:
+            units = units.filter(organization_id=org_id)
+        if property_id:
+            units = units.filter(property_id=property_id)
+        cheque_amount = 'active_lease__cheques__amount'
+        cheque_status = 'active_lease__cheques__status'
+        rows = list(
+            units.annotate(active_lease=FilteredRelation('leases', condition=Q(leases__is_active=True)))
+            .values(
+                'id', 'unit_number', 'unit_type', 'status', 'yearly_rent', 'property_id',
+                property_name=F('property__name'),
+                lease_id=F('active_lease__id'),
+                tenant_name=F('active_lease__tenant__name'),
+                lease_start=F('active_lease__start_date'),
+                lease_end=F('active_lease__end_date'),
+                rent_amount=F('active_lease__rent_amount'),
+            )
+            .annotate(
+                expected=_total(cheque_amount),
+                collected=_total(cheque_amount, Q(**{cheque_status: 'CLEARED'})),
+                outstanding=_total(cheque_amount, Q(**{f'{cheque_status}__in': OUTSTANDING_STATUSES})),
+                bounced=_total(cheque_amount, Q(**{cheque_status: 'BOUNCED'})),
+            )
+            .order_by('property_name', 'unit_number')
+        )
+
+        fields = ('yearly_rent', 'rent_amount', 'expected', 'collected', 'outstanding', 'bounced')
+        properties = {}
+        for row in rows:
+            group = properties.setdefault(row['property_id'], {
+                'property_id': row['property_id'], 'property_name': row['property_name'],
+                'units': 0, 'occupied': 0, **{field: Decimal('0') for field in fields},
+            })
+            group['units'] += 1
+            group['occupied'] += row['lease_id'] is not None
+            for field in fields:
+                group[field] += row[field] or 0
+        totals = {'units': len(rows), 'occupied': sum(group['occupied'] for group in properties.values())}
+        for field in fields:
+            totals[field] = sum((group[field] for group in properties.values()), Decimal('0'))
+        return {'rows': rows, 'properties': list(properties.values()), 'totals': totals}
+
+    return _cached('rent_roll', org_id, property_id, build)
+
+
+# ═══════════════════════════════════════════════════
+# RECEIVABLES AGING
+# ═══════════════════════════════════════════════════
+
+AGING_BUCKETS = ('not_due', 'days_0_30', 'days_31_60', 'days_61_90', 'days_90_plus')
+
+# (plain fields, expressions) each report row is grouped by
+AGING_GROUPS = {
+    'property': ((), {'property_id': F('lease__unit__property_id'), 'property_name': F('lease__unit__property__name')}),
+    'tenant': (('tenant_id',), {'tenant_name': F('tenant__name'), 'tenant_phone': F('tenant__phone')}),
+}
+
+AGING_COLUMNS = {
+    'property': [('Property', 'property_name')],
+    'tenant': [('Tenant', 'tenant_name'), ('Phone', 'tenant_phone')],
+}
+AGING_VALUE_COLUMNS = [
+    ('Status', 'status'), ('Cheques', 'cheques'), ('Not yet due', 'not_due'), ('0-30 days', 'days_0_30'),
+    ('31-60 days', 'days_31_60'), ('61-90 days', 'days_61_90'), ('90+ days', 'days_90_plus'), ('Total', 'total'),
+]
+
+
+def aging(org_id=None, property_id=None, as_of=None, by='property'):
+    """
+    PENDING and BOUNCED cheques per property (or tenant) and status, summed into
+    buckets by days past their cheque date on `as_of`; post-dated cheques are
+    `not_due`. Cheques not linked to a lease have no property.
+    """
+    as_of = as_of or timezone.localdate()
+
+    def build():
+        cheques = Cheque.objects.filter(status__in=RECEIVABLE_STATUSES)
+        if org_id:
+            cheques = cheques.filter(organization_id=org_id)
+        if property_id:
+            cheques = cheques.filter(lease__unit__property_id=property_id)
+
+        def overdue(low, high=None):
+            # cheques between `low` and `high` days past due, inclusive
+            condition = Q(cheque_date__lte=as_of - timedelta(days=low))
+            if high is not None:
+                condition &= Q(cheque_date__gte=as_of - timedelta(days=high))
+            return _total('amount', condition)
+
+        fields, expressions = AGING_GROUPS[by]
+        rows = list(
+            cheques.values(*fields, 'status', **expressions)
+            .annotate(
+                cheques=Count('id'),
+                not_due=_total('amount', Q(cheque_date__gt=as_of)),
+                days_0_30=overdue(0, 30),
+                days_31_60=overdue(31, 60),
+                days_61_90=overdue(61, 90),
+                days_90_plus=overdue(91),
+                total=_total('amount'),
+            )
+            .order_by(f'{by}_name', 'status')
+        )
+        totals = {bucket: sum((row[bucket] for row in rows), Decimal('0')) for bucket in (*AGING_BUCKETS, 'total')}
+        totals['cheques'] = sum(row['cheques'] for row in rows)
+        return {'as_of': as_of, 'by': by, 'rows': rows, 'totals': totals}
+
+    return _cached('aging', org_id, f"{property_id}:{as_of}:{by}", build)
+
+
+# ═══════════════════════════════════════════════════
+# COLLECTED VS EXPECTED
+# ═══════════════════════════════════════════════════
+
+REVENUE_COLUMNS = [
+    ('Month', 'month'), ('Cheques', 'cheques'), ('Expected', 'expected'), ('Collected', 'collected'),
+    ('Deposited', 'deposited'), ('Pending', 'pending'), ('Bounced', 'bounced'), ('Collection rate %', 'collection_rate'),
+]
+
+
+def add_months(day, months):
+    """First day of the month `months` after (or before) `day`'s month."""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def revenue(org_id=None, property_id=None, start=None, end=None):
+    """
+    Per month from `start` to `end` (first days of months, inclusive): the
+    cheques dated in it (expected) and how much of that has cleared, is
+    deposited, pending or bounced. Defaults to the last 12 months.
+    """
+    end = add_months(end or timezone.localdate(), 0)
+    start = add_months(start, 0) if start else add_months(end, -11)
+
+    def build():
+        cheques = Cheque.objects.filter(cheque_date__gte=start, cheque_date__lt=add_months(end, 1))
+        if org_id:
+            cheques = cheques.filter(organization_id=org_id)
+        if property_id:
+            cheques = cheques.filter(lease__unit__property_id=property_id)
+        found = {
+            row['month']: row for row in
+            cheques.values(month=TruncMonth('cheque_date'))
+            .annotate(
+                cheques=Count('id'),
+                expected=_total('amount'),
+                collected=_total('amount', Q(status='CLEARED')),
+                deposited=_total('amount', Q(status='DEPOSITED')),
+                pending=_total('amount', Q(status='PENDING')),
+                bounced=_total('amount', Q(status='BOUNCED')),
+            )
+            .order_by('month')
+        }
+
+        rows = []
+        month = start
+        while month <= end:
+            row = found.get(month) or {
+                'month': month, 'cheques': 0,
+                **{field: Decimal('0') for field in ('expected', 'collected', 'deposited', 'pending', 'bounced')},
+            }
+            row['collection_rate'] = round(row['collected'] / row['expected'] * 100, 1) if row['expected'] else None
+            rows.append(row)
+            month = add_months(month, 1)
+        expected = sum((row['expected'] for row in rows), Decimal('0'))
+        collected = sum((row['collected'] for row in rows), Decimal('0'))
+        totals = {
+            'cheques': sum(row['cheques'] for row in rows),
+            'expected': expected,
+            'collected': collected,
+            'collection_rate': round(collected / expected * 100, 1) if expected else None,
+        }
+        return {'start': start, 'end': end, 'rows': rows, 'totals': totals}
+
+    return _cached('revenue', org_id, f"{property_id}:{start}:{end}", build)
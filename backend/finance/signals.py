@@ -0,0 +1,50 @@
+import logging
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from core.models import Organization
+from .lifecycle import cheques_transitioned
+from .models import Cheque, ChequeTransition
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Cheque)
+def record_status_change(sender, instance, created, **kwargs):
+    """Single-cheque status edits (admin, API) go into the transition history too."""
+    previous = getattr(instance, '_loaded_status', None)
+    if not created and previous and previous != instance.status:
+        ChequeTransition.objects.create(
+            cheque=instance, organization_id=instance.organization_id,
+            from_status=previous, to_status=instance.status, source='MANUAL',
+            changed_by=getattr(instance, '_changed_by', None),
+        )
+    instance._loaded_status = instance.status
+
+
+@receiver(cheques_transitioned)
+def email_transition_summary(sender, organization_id, source, changes, **kwargs):
+    """One email per organization and batch, to the owner."""
+    owner_email = Organization.objects.filter(pk=organization_id).values_list('owner__email', flat=True).first()
+    if not owner_email:
+        return
+    labels = dict(Cheque.STATUS_CHOICES)
+    count = sum(change['count'] for change in changes)
+    amount = sum(change['amount'] for change in changes)
+    lines = [
+        f"{change['count']} cheque{'s' if change['count'] != 1 else ''} (AED {change['amount']:,.2f}): "
+        f"{labels[change['from_status']]} → {labels[change['to_status']]}"
+        for change in changes
+    ]
+    try:
+        send_mail(
+            f"PropOS: {count} cheque status update{'s' if count != 1 else ''} (AED {amount:,.0f})",
+            "\n".join(lines) + "\n\nOpen the PropOS Finance page for the details.",
+            settings.EMAIL_HOST_USER,
+            [owner_email],
+        )
+    except Exception:
+        logger.exception("Failed to email the cheque summary to organization %s", organization_id)
@@ -0,0 +1,10 @@
+from celery import shared_task
+
+from . import lifecycle
+
+
+@shared_task
+def deposit_due_cheques():
+    """PENDING cheques whose date has arrived → DEPOSITED (celery beat, daily)."""
+    summary = lifecycle.deposit_due_cheques()
+    return {org_id: sum(change['count'] for change in changes) for org_id, changes in summary.items()}
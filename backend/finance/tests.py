@@ -1,3 +1,154 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from .reconciliation import StatementError, match_lines, normalize_cheque_number, parse_statement
+
+
+def _cheque(id, number, amount, cheque_date, status='DEPOSITED', tenant_name=''):
+    return {
+        'id': id, 'cheque_number': number, 'amount': Decimal(amount), 'cheque_date': cheque_date,
+        'status': status, 'tenant_name': tenant_name,
+    }
+
+
+def _line(line_number, day, amount, description='', reference='', kind='CREDIT'):
+    return {
+        'line_number': line_number, 'date': day, 'description': description,
+        'reference': reference, 'amount': Decimal(amount), 'kind': kind,
+    }
+
+
+class NormalizeChequeNumberTests(SimpleTestCase):
+    def test_values(self):
+        self.assertEqual(normalize_cheque_number('001234'), '1234')
+        self.assertEqual(normalize_cheque_number(' chq-00 1234 '), 'CHQ001234')
+        self.assertEqual(normalize_cheque_number('000'), '000')
+        self.assertEqual(normalize_cheque_number(None), '')
+
+
+class ParseStatementTests(SimpleTestCase):
+    def test_header_found_below_preamble(self):
+        data = (
+            "Emirates NBD,Account statement\n"
+            "Account,1012345678\n"
+            "\n"
+            "Value Date,Narrative,Cheque No,Debit,Credit,Balance\n"
+            "02/03/2026,CLG CHQ DEPOSIT,001234,,\"20,000.00\",120000.00\n"
+            "03/03/2026,DEWA BILL,,450.00,,119550.00\n"
+            ",Closing balance,,,,119550.00\n"
+        ).encode()
+        lines = parse_statement(data)
+        self.assertEqual([(line['line_number'], line['date'], line['amount'], line['kind']) for line in lines], [
+            (5, date(2026, 3, 2), Decimal('20000.00'), 'CREDIT'),
+            (6, date(2026, 3, 3), Decimal('450.00'), 'OTHER'),
+        ])
+        self.assertEqual(lines[0]['reference'], '001234')
+
+    def test_signed_amount_column(self):
+        data = (
+            "Transaction Date;Description;Amount\n"
+            "2026-03-02;CHEQUE NO. 004567 SALEM;AED 15,000.00\n"
+            "2026-03-04;RETURNED CHQ 004567 INSUFFICIENT FUNDS;(15,000.00)\n"
+            "2026-03-05;CARD PURCHASE;-99.50\n"
+        ).encode()
+        lines = parse_statement(data)
+        self.assertEqual([(line['amount'], line['kind']) for line in lines], [
+            (Decimal('15000.00'), 'CREDIT'),
+            (Decimal('15000.00'), 'RETURN'),
+            (Decimal('99.50'), 'OTHER'),
+        ])
+        # Cheque numbers are read from the description when there's no column
+        self.assertEqual([line['reference'] for line in lines[:2]], ['004567', '004567'])
+
+    def test_cr_dr_suffixes(self):
+        lines = parse_statement(b"Date,Details,Amount\n02-Mar-2026,TRANSFER,500.00 CR\n03-Mar-2026,FEE,25.00DR\n")
+        self.assertEqual([(line['amount'], line['kind']) for line in lines], [
+            (Decimal('500.00'), 'CREDIT'), (Decimal('25.00'), 'OTHER'),
+        ])
+
+    def test_unreadable_files(self):
+        with self.assertRaisesMessage(StatementError, "No header row"):
+            parse_statement(b"foo,bar\n1,2\n")
+        with self.assertRaisesMessage(StatementError, "no transactions"):
+            parse_statement(b"Date,Amount\n,100\n")
+        with self.assertRaisesMessage(StatementError, "Line 2: Unreadable amount"):
+            parse_statement(b"Date,Amount\n2026-03-02,abc\n")
+
+
+class MatchLinesTests(SimpleTestCase):
+    def test_cheque_number_match(self):
+        cheques = [_cheque(1, '001234', '20000', date(2026, 3, 1)), _cheque(2, '5555', '20000', date(2026, 3, 1))]
+        [line] = match_lines([_line(2, date(2026, 3, 4), '20000', reference='1234')], cheques, 14)
+        self.assertEqual((line['cheque_id'], line['match_rule'], line['proposed_status']), (1, 'CHEQUE_NUMBER', 'CLEARED'))
+
+    def test_cheque_number_with_wrong_amount_is_not_matched(self):
+        cheques = [_cheque(1, '1234', '20000', date(2026, 3, 1))]
+        [line] = match_lines([_line(2, date(2026, 3, 4), '19000', reference='1234')], cheques, 14)
+        self.assertIsNone(line['cheque_id'])
+        self.assertIn("amount or date doesn't fit", line['note'])
+
+    def test_tenant_name_narrows_an_amount(self):
+        cheques = [
+            _cheque(1, '1111', '15000', date(2026, 3, 1), tenant_name='Ahmed Al Mansouri'),
+            _cheque(2, '2222', '15000', date(2026, 3, 2), tenant_name='Sara Khan'),
+        ]
+        [line] = match_lines([_line(2, date(2026, 3, 5), '15000', description='CLG AHMED AL MANSOURI')], cheques, 14)
+        self.assertEqual((line['cheque_id'], line['match_rule']), (1, 'TENANT'))
+
+    def test_amount_only_match(self):
+        cheques = [_cheque(1, '1111', '15000', date(2026, 3, 1)), _cheque(2, '2222', '15000', date(2026, 2, 1))]
+        [line] = match_lines([_line(2, date(2026, 3, 5), '15000', description='INWARD CLEARING')], cheques, 14)
+        self.assertEqual((line['cheque_id'], line['match_rule'], line['proposed_status']), (1, 'AMOUNT', 'CLEARED'))
+
+    def test_ambiguous_amount_is_left_for_review(self):
+        cheques = [_cheque(1, '1111', '15000', date(2026, 3, 1)), _cheque(2, '2222', '15000', date(2026, 3, 3))]
+        [line] = match_lines([_line(2, date(2026, 3, 5), '15000', description='INWARD CLEARING')], cheques, 14)
+        self.assertIsNone(line['cheque_id'])
+        self.assertEqual(line['note'], "2 cheques of AED 15,000.00 fit; add the cheque number to tell them apart.")
+
+    def test_cheque_is_claimed_once(self):
+        cheques = [_cheque(1, '1111', '15000', date(2026, 3, 1))]
+        first, second = match_lines([
+            _line(2, date(2026, 3, 4), '15000', reference='1111'),
+            _line(3, date(2026, 3, 5), '15000'),
+        ], cheques, 14)
+        self.assertEqual(first['cheque_id'], 1)
+        self.assertIsNone(second['cheque_id'])
+
+    def test_return_replaces_an_earlier_credit(self):
+        cheques = [_cheque(1, '1111', '15000', date(2026, 3, 1))]
+        credit, returned = match_lines([
+            _line(2, date(2026, 3, 4), '15000', reference='1111'),
+            _line(3, date(2026, 3, 6), '15000', reference='1111', kind='RETURN'),
+        ], cheques, 14)
+        self.assertEqual((returned['cheque_id'], returned['proposed_status']), (1, 'BOUNCED'))
+        self.assertEqual(credit['proposed_status'], '')
+        self.assertEqual(credit['note'], "Returned on line 3.")
+
+    def test_status_checks(self):
+        cheques = [
+            _cheque(1, '1111', '100', date(2026, 3, 1), status='CLEARED'),
+            _cheque(2, '2222', '200', date(2026, 3, 1), status='PENDING'),
+            _cheque(3, '3333', '300', date(2026, 3, 1), status='CLEARED'),
+        ]
+        cleared, pending, bounced = match_lines([
+            _line(2, date(2026, 3, 4), '100', reference='1111'),
+            _line(3, date(2026, 3, 4), '200', reference='2222'),
+            _line(4, date(2026, 3, 4), '300', reference='3333', kind='RETURN'),
+        ], cheques, 14)
+        self.assertEqual((cleared['proposed_status'], cleared['note']), ('', "Already CLEARED."))
+        self.assertEqual(pending['proposed_status'], 'CLEARED')
+        self.assertEqual(bounced['note'], "Cheque is CLEARED; it can't become BOUNCED.")
+
+    def test_debits_and_dates_outside_the_window(self):
+        cheques = [_cheque(1, '1111', '15000', date(2026, 3, 1))]
+        debit, early, late = match_lines([
+            _line(2, date(2026, 3, 4), '15000', kind='OTHER'),
+            _line(3, date(2026, 2, 28), '15000'),
+            _line(4, date(2026, 3, 20), '15000'),
+        ], cheques, 14)
+        self.assertEqual(debit['note'], "Debit; not a cheque payment.")
+        self.assertIsNone(early['cheque_id'])
+        self.assertIsNone(late['cheque_id'])
@@ -1,11 +1,37 @@
+from datetime import date, datetime
+
 from rest_framework import viewsets
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
-from .models import Cheque
+from rest_framework.response import Response
+
+from core.exports import EXPORT_FORMATS, export_response
+from core.mixins import ExportMixin
+from .models import BankStatement, Cheque
+from .reconciliation import (
+    STATEMENT_COLUMNS, StatementError, apply_statement, can_reconcile, import_statement, statement_lines,
+    statement_report,
+)
+from .reports import (
+    AGING_COLUMNS, AGING_GROUPS, AGING_VALUE_COLUMNS, RENT_ROLL_COLUMNS, REVENUE_COLUMNS,
+    add_months, aging, rent_roll, report_scope, revenue,
+)
 from .serializers import ChequeSerializer
 
-class ChequeViewSet(viewsets.ModelViewSet):
+# Longest range the revenue report accepts
+MAX_REPORT_MONTHS = 60
+# Largest bank statement file accepted for reconciliation
+MAX_STATEMENT_BYTES = 10 * 1024 * 1024
+
+class ChequeViewSet(ExportMixin, viewsets.ModelViewSet):
     serializer_class = ChequeSerializer
     permission_classes = [IsAuthenticated]
+    export_name = 'cheques'
+    export_fields = [
+        ('ID', 'id'), ('Cheque number', 'cheque_number'), ('Bank', 'bank_name'), ('Date', 'cheque_date'),
+        ('Amount', 'amount'), ('Status', 'status'), ('Tenant', 'tenant__name'),
+        ('Property', 'lease__unit__property__name'), ('Unit', 'lease__unit__unit_number'), ('Lease', 'lease_id'),
+    ]
 
     def get_queryset(self):
         """
@@ -26,4 +52,156 @@ class ChequeViewSet(viewsets.ModelViewSet):
         if status:
             queryset = queryset.filter(status=status)
         
-        return queryset.order_by('cheque_date')
\ No newline at end of file
+        return queryset.order_by('cheque_date')
+
+    def perform_update(self, serializer):
+        # Credited in the transition history (signals.record_status_change)
+        serializer.instance._changed_by = self.request.user
+        serializer.save()
+
+
+# ═══════════════════════════════════════════════════
+# REPORTS (reports.py) — JSON, or ?export=csv / xlsx
+# ═══════════════════════════════════════════════════
+
+def _parse_date(value, month=False):
+    """`YYYY-MM-DD` (or `YYYY-MM` when month=True) → date; ValueError if malformed."""
+    if month:
+        return datetime.strptime(value, '%Y-%m').date()
+    return date.fromisoformat(value)
+
+
+def _report_scope_or_error(request):
+    scope = report_scope(request.user)
+    if scope is None:
+        return None, Response({"error": "Finance reports are not available for your role."}, status=403)
+    org_id, property_id = scope
+    requested = request.query_params.get('property')
+    if requested:
+        if not requested.isdigit() or (property_id and int(requested) != property_id):
+            return None, Response({"error": "Invalid property."}, status=400)
+        property_id = int(requested)
+    return (org_id, property_id), None
+
+
+def _export(request, name, columns, report):
+    """File response when ?export= asks for one, else None."""
+    file_format = request.query_params.get('export')
+    if not file_format:
+        return None
+    if file_format not in EXPORT_FORMATS:
+        return Response({"error": f"export must be one of: {', '.join(EXPORT_FORMATS)}."}, status=400)
+    return export_response(request, file_format, name, columns, report['rows'])
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def rent_roll_report(request):
+    scope, error = _report_scope_or_error(request)
+    if error:
+        return error
+    report = rent_roll(*scope)
+    return _export(request, 'rent-roll', RENT_ROLL_COLUMNS, report) or Response(report)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def aging_report(request):
+    scope, error = _report_scope_or_error(request)
+    if error:
+        return error
+    by = request.query_params.get('by', 'property')
+    if by not in AGING_GROUPS:
+        return Response({"error": "by must be 'property' or 'tenant'."}, status=400)
+    try:
+        as_of = _parse_date(request.query_params['as_of']) if 'as_of' in request.query_params else None
+    except ValueError:
+        return Response({"error": "as_of must be YYYY-MM-DD."}, status=400)
+    report = aging(*scope, as_of=as_of, by=by)
+    return _export(request, f"aging-by-{by}", AGING_COLUMNS[by] + AGING_VALUE_COLUMNS, report) or Response(report)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def revenue_report(request):
+    scope, error = _report_scope_or_error(request)
+    if error:
+        return error
+    try:
+        start = _parse_date(request.query_params['from'], month=True) if 'from' in request.query_params else None
+        end = _parse_date(request.query_params['to'], month=True) if 'to' in request.query_params else None
+    except ValueError:
+        return Response({"error": "from / to must be YYYY-MM."}, status=400)
+    if start and end and not start <= end < add_months(start, MAX_REPORT_MONTHS):
+        return Response({"error": f"from must be before to, at most {MAX_REPORT_MONTHS} months apart."}, status=400)
+    report = revenue(*scope, start=start, end=end)
+    return _export(request, 'revenue', REVENUE_COLUMNS, report) or Response(report)
+
+
+# ═══════════════════════════════════════════════════
+# BANK RECONCILIATION (reconciliation.py)
+# ═══════════════════════════════════════════════════
+
+def _statement_or_error(request, statement_id):
+    if not can_reconcile(request.user):
+        return None, Response({"error": "Bank reconciliation is not available for your role."}, status=403)
+    statement = BankStatement.objects.filter(id=statement_id, organization_id=request.user.organization_id).first()
+    if statement is None:
+        return None, Response({"error": "Statement not found."}, status=404)
+    return statement, None
+
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def bank_statements(request):
+    """GET: recent imports. POST (multipart `file`): import a bank CSV and return the proposed matches."""
+    if not can_reconcile(request.user):
+        return Response({"error": "Bank reconciliation is not available for your role."}, status=403)
+    org_id = request.user.organization_id
+    if request.method == 'GET':
+        return Response(list(
+            BankStatement.objects.filter(organization_id=org_id)
+            .values('id', 'filename', 'uploaded_at', 'line_count', 'matched_count', 'applied_at')[:50]
+        ))
+
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({"error": "Attach the bank statement CSV as `file`."}, status=400)
+    if upload.size > MAX_STATEMENT_BYTES:
+        return Response({"error": f"Statements are limited to {MAX_STATEMENT_BYTES // (1024 * 1024)} MB."}, status=400)
+    try:
+        statement = import_statement(org_id, upload.name, upload.read(), request.user)
+    except StatementError as error:
+        return Response({"error": str(error)}, status=400)
+    return Response(statement_report(statement), status=201)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def bank_statement_detail(request, statement_id):
+    """Proposals, settled and unmatched lines; ?export=csv / xlsx downloads every line."""
+    statement, error = _statement_or_error(request, statement_id)
+    if error:
+        return error
+    file_format = request.query_params.get('export')
+    if file_format:
+        if file_format not in EXPORT_FORMATS:
+            return Response({"error": f"export must be one of: {', '.join(EXPORT_FORMATS)}."}, status=400)
+        return export_response(request, file_format, f"reconciliation-{statement.id}", STATEMENT_COLUMNS,
+                               statement_lines(statement).iterator(chunk_size=2000))
+    return Response(statement_report(statement))
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def apply_bank_statement(request, statement_id):
+    """Apply the statement's proposals, or only {"lines": [line ids]}."""
+    statement, error = _statement_or_error(request, statement_id)
+    if error:
+        return error
+    line_ids = request.data.get('lines')
+    if line_ids is not None and (not isinstance(line_ids, list) or not all(isinstance(i, int) for i in line_ids)):
+        return Response({"error": "lines must be a list of line ids."}, status=400)
+    result = apply_statement(statement, request.user, line_ids)
+    statement.refresh_from_db()
+    return Response({'result': result, **statement_report(statement)})
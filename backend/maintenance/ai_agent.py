@@ -1,34 +1,30 @@
-import google.generativeai as genai
-from django.conf import settings
+import logging
 import os
-import time
 
-GENAI_API_KEY = os.environ.get("GENAI_API_KEY")
+from django.conf import settings
+
+import ai
 
-if GENAI_API_KEY:
-    genai.configure(api_key=GENAI_API_KEY)
+logger = logging.getLogger(__name__)
 
-def analyze_maintenance_image(image_path, retry=False):
-    if not GENAI_API_KEY:
-        print("❌ AI Skipped: No API Key found.")
+def analyze_maintenance_image(image_path):
+    if not ai.is_configured(ai.GEMINI):
+        logger.info("Image triage skipped: Gemini is not configured")
         return None
 
     try:
         # 👇 UPDATED: Using the exact name found in your logs
         model_name = 'gemini-flash-latest'
-        
-        print(f"🤖 Connecting to AI Model: {model_name}...")
-        model = genai.GenerativeModel(model_name)
-        
+
         # Construct full path
         img_path = os.path.join(settings.MEDIA_ROOT, str(image_path).replace('/media/', ''))
         
         if not os.path.exists(img_path):
-            print(f"❌ Image not found at {img_path}")
+            logger.warning("Triage image not found: %s", img_path)
             return None
 
         # Upload file
-        sample_file = genai.upload_file(path=img_path, display_name="Maintenance Issue")
+        sample_file = ai.upload_file(img_path, display_name="Maintenance Issue", task='triage')
 
         prompt = """
         You are an expert Property Manager AI. 
@@ -40,9 +36,8 @@ def analyze_maintenance_image(image_path, retry=False):
         Description: [Technical description and suggested repair]
         """
 
-        response = model.generate_content([sample_file, prompt])
-        text = response.text
-        print(f"✅ AI Response: {text}")
+        text = ai.generate_content([sample_file, prompt], model=model_name, task='triage')
+        logger.debug("Image triage response: %s", text[:500])
 
         # Parse
         result = {'priority': 'MEDIUM', 'title': '', 'description': ''}
@@ -63,11 +58,6 @@ def analyze_maintenance_image(image_path, retry=False):
         return result
 
     except Exception as e:
-        # Handle Rate Limit (429) by waiting once
-        if "429" in str(e) and not retry:
-            print("⚠️ Quota Exceeded. Waiting 10 seconds and retrying...")
-            time.sleep(10)
-            return analyze_maintenance_image(image_path, retry=True)
-            
-        print(f"❌ AI Analysis Failed: {e}")
+        # Rate limits & retries are handled by the shared AI client
+        logger.warning("Image triage failed: %s", e)
         return None
\ No newline at end of file
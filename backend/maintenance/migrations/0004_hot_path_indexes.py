@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:33
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY: no write lock on live tables, can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('core', '0004_user_managed_property'),
+        ('maintenance', '0003_maintenanceticket_ai_category_and_more'),
+        ('properties', '0005_hot_path_indexes'),
+        ('tenants', '0006_hot_path_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='maintenanceticket',
+            index=models.Index(fields=['organization', 'status', 'priority'], name='ticket_org_status_priority'),
+        ),
+        AddIndexConcurrently(
+            model_name='maintenanceticket',
+            index=models.Index(fields=['organization', '-created_at'], name='ticket_org_created'),
+        ),
+        AddIndexConcurrently(
+            model_name='maintenanceticket',
+            index=models.Index(fields=['assigned_to', 'status'], name='ticket_assignee_status'),
+        ),
+        AddIndexConcurrently(
+            model_name='maintenanceticket',
+            index=models.Index(condition=models.Q(('status__in', ['OPEN', 'IN_PROGRESS'])), fields=['organization', 'priority'], name='ticket_open_org_priority'),
+        ),
+    ]
@@ -74,5 +74,34 @@ class MaintenanceTicket(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['organization', 'status', 'priority'], name='ticket_org_status_priority'),
+            # Ticket list: newest first within an organization
+            models.Index(fields=['organization', '-created_at'], name='ticket_org_created'),
+            # Technician dashboard
+            models.Index(fields=['assigned_to', 'status'], name='ticket_assignee_status'),
+            # Open work is a small slice of all tickets ever filed
+            models.Index(
+                fields=['organization', 'priority'], name='ticket_open_org_priority',
+                condition=models.Q(status__in=['OPEN', 'IN_PROGRESS']),
+            ),
+        ]
+
     def __str__(self):
-        return f"#{self.id} - {self.title} ({self.status})"
\ No newline at end of file
+        return f"#{self.id} - {self.title} ({self.status})"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # As loaded, so post_save receivers can tell what a save changed
+        # (communication/notifications.py, communication/realtime.py)
+        instance._loaded_status = instance.__dict__.get('status')
+        instance._loaded_assigned_to_id = instance.__dict__.get('assigned_to_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # The receivers have compared against the old values; the saved ones are current now
+        self._loaded_status = self.status
+        self._loaded_assigned_to_id = self.assigned_to_id
\ No newline at end of file
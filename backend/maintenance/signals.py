@@ -1,8 +1,12 @@
-import os
+import logging
+
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.apps import apps
 
+logger = logging.getLogger(__name__)
+
+
 @receiver(post_save, sender='maintenance.MaintenanceTicket')
 def ai_triage_analysis(sender, instance, created, **kwargs):
     """
@@ -43,4 +47,4 @@ def ai_triage_analysis(sender, instance, created, **kwargs):
     MaintenanceTicket.objects.filter(pk=instance.pk).update(
         priority=new_priority
     )
-    print(f"🤖 Keyword Triage Complete: Priority set to {new_priority}")
\ No newline at end of file
+    logger.info("Keyword triage set ticket #%s to %s", instance.pk, new_priority, extra={'ticket_id': instance.pk})
\ No newline at end of file
@@ -1,3 +1,5 @@
+import logging
+
 from rest_framework import viewsets, permissions
 from rest_framework.exceptions import ValidationError
 from rest_framework.decorators import api_view, permission_classes as perms
@@ -8,12 +10,14 @@ from django.conf import settings
 from django.db.models import Count, Q
 
 from core.models import User
-from core.mixins import OrganizationQuerySetMixin
+from core.mixins import ExportMixin, OrganizationQuerySetMixin
 from .models import MaintenanceTicket
 from .serializers import MaintenanceTicketSerializer
 from .ai_agent import analyze_maintenance_image
 from tenants.models import Tenant
 
+logger = logging.getLogger(__name__)
+
 
 # ═══════════════════════════════════════════════════
 # AI CATEGORY DETECTION (Keyword-based, fast & free)
@@ -69,7 +73,8 @@ def auto_assign_technician(ticket):
         chosen = techs.first()
         ticket.assigned_to = chosen
         ticket.save()
-        print(f"🤖 Auto-assigned Ticket #{ticket.id} ({category}) → {chosen.get_full_name() or chosen.username} (workload: {chosen.active_tickets})")
+        logger.info("Auto-assigned ticket #%s (%s) to %s, workload %s", ticket.id, category, chosen.username, chosen.active_tickets,
+                    extra={'ticket_id': ticket.id, 'technician_id': chosen.id})
         return chosen
 
     # Fallback: Find any GENERAL technician in the org
@@ -87,7 +92,8 @@ def auto_assign_technician(ticket):
         chosen = general_techs.first()
         ticket.assigned_to = chosen
         ticket.save()
-        print(f"🤖 Fallback-assigned Ticket #{ticket.id} → {chosen.get_full_name() or chosen.username} (GENERAL)")
+        logger.info("Fallback-assigned ticket #%s to %s (GENERAL)", ticket.id, chosen.username,
+                    extra={'ticket_id': ticket.id, 'technician_id': chosen.id})
         return chosen
 
     # Last fallback: Any technician in the org
@@ -103,17 +109,25 @@ def auto_assign_technician(ticket):
     if any_tech:
         ticket.assigned_to = any_tech
         ticket.save()
-        print(f"🤖 Last-resort assigned Ticket #{ticket.id} → {any_tech.get_full_name() or any_tech.username}")
+        logger.info("Last-resort assigned ticket #%s to %s", ticket.id, any_tech.username,
+                    extra={'ticket_id': ticket.id, 'technician_id': any_tech.id})
         return any_tech
 
-    print(f"⚠️ No technicians available for Ticket #{ticket.id}")
+    logger.warning("No technicians available for ticket #%s", ticket.id, extra={'ticket_id': ticket.id})
     return None
 
 
-class MaintenanceViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
+class MaintenanceViewSet(ExportMixin, OrganizationQuerySetMixin, viewsets.ModelViewSet):
     queryset = MaintenanceTicket.objects.all()
     serializer_class = MaintenanceTicketSerializer
     permission_classes = [permissions.IsAuthenticated]
+    export_name = 'tickets'
+    export_fields = [
+        ('ID', 'id'), ('Created', 'created_at'), ('Title', 'title'), ('Status', 'status'), ('Priority', 'priority'),
+        ('Category', 'ai_category'), ('Source', 'source'), ('Property', 'unit__property__name'),
+        ('Unit', 'unit__unit_number'), ('Tenant', 'tenant__name'), ('Assigned to', 'assigned_to__username'),
+        ('Updated', 'updated_at'),
+    ]
 
     def get_queryset(self):
         user = self.request.user
@@ -165,12 +179,10 @@ class MaintenanceViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
 
         # ═══ STEP 1: AI Image Analysis ═══
         if ticket.image:
-            print(f"🤖 AI is analyzing Ticket #{ticket.id}...")
-            
             ai_result = analyze_maintenance_image(ticket.image.name)
             
             if ai_result:
-                print(f"✅ AI Found: {ai_result}")
+                logger.info("AI triage of ticket #%s: %s", ticket.id, ai_result.get('priority'), extra={'ticket_id': ticket.id})
                 
                 ticket.priority = ai_result.get('priority', ticket.priority)
                 
@@ -185,14 +197,13 @@ class MaintenanceViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
         category = detect_category(ticket.title, ticket.description)
         ticket.ai_category = category
         ticket.save()
-        print(f"🏷️ Category detected: {category} for Ticket #{ticket.id}")
+        logger.debug("Ticket #%s category: %s", ticket.id, category)
 
         # ═══ STEP 3: Auto-assign Technician ═══
         assigned = auto_assign_technician(ticket)
 
         # ═══ STEP 4: Emergency Alert ═══
         if ticket.priority in ['HIGH', 'EMERGENCY']:
-            print("🚨 HIGH PRIORITY DETECTED - SENDING EMAIL ALERT")
             
             assigned_info = f"Assigned to: {assigned.get_full_name() or assigned.username}" if assigned else "⚠️ NOT ASSIGNED — No technician available!"
             
@@ -220,9 +231,9 @@ class MaintenanceViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
                     [user.email],
                     fail_silently=False,
                 )
-                print("📧 Email Alert Sent!")
-            except Exception as e:
-                print(f"❌ Failed to send email alert: {e}")
+                logger.info("Sent %s alert for ticket #%s", ticket.priority, ticket.id, extra={'ticket_id': ticket.id})
+            except Exception:
+                logger.exception("Failed to send the alert for ticket #%s", ticket.id, extra={'ticket_id': ticket.id})
 
     def perform_update(self, serializer):
         user = self.request.user
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Property, Unit
+from .rules import reindex_property_rules
 
 @admin.register(Property)
 class PropertyAdmin(admin.ModelAdmin):
@@ -7,6 +8,11 @@ class PropertyAdmin(admin.ModelAdmin):
     list_filter = ('property_type', 'city', 'organization')
     search_fields = ('name', 'address')
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if not change or 'rules_and_regulations' in form.changed_data:
+            reindex_property_rules(obj)
+
 @admin.register(Unit)
 class UnitAdmin(admin.ModelAdmin):
     list_display = ('unit_number', 'property', 'unit_type', 'status', 'yearly_rent')
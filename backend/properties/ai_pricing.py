@@ -1,17 +1,13 @@
-import google.generativeai as genai
-import os
 import json
-import time
+import logging
 
+import ai
 from .market_data import get_market_data
 
-GENAI_API_KEY = os.environ.get("GENAI_API_KEY")
+logger = logging.getLogger(__name__)
 
-if GENAI_API_KEY:
-    genai.configure(api_key=GENAI_API_KEY)
 
-
-def analyze_rent_price(unit, retry=False):
+def analyze_rent_price(unit):
     """
     Smart Rent Pricing Engine — Uses Gemini AI + Dubai market data
     to recommend optimal rent for a unit.
@@ -46,14 +42,12 @@ def analyze_rent_price(unit, retry=False):
     }
 
     # 4. If no API key, return market-data-only response
-    if not GENAI_API_KEY:
-        print("⚠️ No Gemini API key — returning market data only")
+    if not ai.is_configured(ai.GEMINI):
+        logger.info("Smart pricing without Gemini: market data only")
         return build_fallback_response(unit_info, market_info)
 
     # 5. Call Gemini AI
     try:
-        model = genai.GenerativeModel('gemini-flash-latest')
-
         prompt = f"""
 You are an expert Dubai real estate rental analyst. Analyze this unit and provide a smart rent recommendation.
 
@@ -82,13 +76,11 @@ Respond ONLY with valid JSON in this exact format (no markdown, no backticks):
 }}
 """
 
-        response = model.generate_content(prompt)
-        text = response.text.strip()
+        text = ai.generate_content(prompt, task='pricing').strip()
         
         # Clean JSON
         text = text.replace("```json", "").replace("```", "").strip()
-        
-        print(f"🤖 AI Pricing Response: {text}")
+        logger.debug("Smart pricing response for unit #%s: %s", unit.id, text[:500])
 
         ai_result = json.loads(text)
 
@@ -109,16 +101,12 @@ Respond ONLY with valid JSON in this exact format (no markdown, no backticks):
         }
 
     except json.JSONDecodeError as e:
-        print(f"❌ AI returned invalid JSON: {e}")
+        logger.warning("Smart pricing for unit #%s: invalid JSON from the model (%s)", unit.id, e)
         return build_fallback_response(unit_info, market_info)
 
     except Exception as e:
-        if "429" in str(e) and not retry:
-            print("⚠️ Quota exceeded. Retrying in 10s...")
-            time.sleep(10)
-            return analyze_rent_price(unit, retry=True)
-
-        print(f"❌ AI Pricing Failed: {e}")
+        # Rate limits & retries are handled by the shared AI client
+        logger.warning("Smart pricing for unit #%s failed: %s", unit.id, e)
         return build_fallback_response(unit_info, market_info)
 
 
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Organization
+from properties.models import Property
+from properties.rules import reindex_property_rules
+
+
+class Command(BaseCommand):
+    help = "Re-parse every property's rules into RuleSections (run after changing the rules parser)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--organization', type=int, help="Only re-parse this organization's properties.")
+
+    def handle(self, *args, **options):
+        properties = Property.objects.order_by('id')
+        if options['organization']:
+            if not Organization.objects.filter(id=options['organization']).exists():
+                raise CommandError(f"Organization {options['organization']} not found.")
+            properties = properties.filter(organization_id=options['organization'])
+
+        count = 0
+        for prop in properties.iterator():
+            reindex_property_rules(prop)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Re-parsed the rules of {count} properties."))
@@ -0,0 +1,143 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:13
+
+import re
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+# A copy of properties.rules.parse_rules() as of this migration, so later parser
+# changes don't change what it does. Re-parse existing rulebooks with the
+# current parser with `manage.py reindex_rules`.
+
+TOPIC_KEYWORDS = {
+    'PETS': ['pet', 'dog', 'cat', 'animal', 'bird'],
+    'PARKING': ['parking', 'park', 'parked', 'car', 'vehicle', 'garage', 'bay'],
+    'GYM': ['gym', 'fitness', 'workout'],
+    'POOL': ['pool', 'swim', 'swimming', 'jacuzzi'],
+    'VISITORS': ['visitor', 'guest', 'visit', 'visiting'],
+    'NOISE': ['noise', 'noisy', 'quiet', 'music', 'party', 'parties', 'loud'],
+    'WASTE': ['garbage', 'trash', 'waste', 'recycle', 'recycling', 'recyclable', 'bin', 'rubbish'],
+    'MOVING': ['move in', 'move out', 'moving', 'mover', 'furniture', 'delivery', 'deliveries', 'delivering'],
+    'SMOKING': ['smoke', 'smoking', 'smoker', 'shisha', 'vape', 'vaping', 'cigarette'],
+    'SECURITY': ['security', 'access card', 'key', 'fob', 'cctv', 'guard'],
+    'RENOVATION': ['renovation', 'renovate', 'renovating', 'alteration', 'drill', 'drilling', 'paint', 'painting', 'contractor'],
+    'PAYMENTS': ['rent', 'cheque', 'payment', 'fee', 'deposit', 'fine'],
+}
+
+# Whole words only ('cat' must not match "location"), plurals included
+TOPIC_PATTERNS = {
+    topic: re.compile(r"\b(?:" + '|'.join(re.escape(kw) for kw in keywords) + r")(?:s|es)?\b")
+    for topic, keywords in TOPIC_KEYWORDS.items()
+}
+
+_HEADING_RE = re.compile(r"^\s*(?:#+\s*|\d+[.)]\s*|[-*]\s*)?(?P<title>[A-Za-z][\w &/'-]{1,60}?)\s*:?\s*$")
+# 'Parking: one bay per unit.' — a short title, a colon, then the rule itself
+_INLINE_HEADING_RE = re.compile(r"^\s*(?:#+\s*|\d+[.)]\s*|[-*]\s*)?(?P<title>[A-Za-z][\w&/'-]*(?: [\w&/'-]+){0,3})\s*:\s+(?P<body>\S.*)$")
+
+
+def detect_topic(text):
+    """Best-matching topic for a piece of text ('GENERAL' if nothing matches)."""
+    text = text.lower()
+    scores = {topic: len(set(pattern.findall(text))) for topic, pattern in TOPIC_PATTERNS.items()}
+    best = max(scores, key=scores.get)
+    return best if scores[best] else 'GENERAL'
+
+
+def _is_heading(line):
+    """Short standalone lines like 'PETS', 'Gym Hours:', 'Gym Hours', '## Parking', '3. Visitors'."""
+    stripped = line.strip()
+    if not stripped or len(stripped) > 60 or stripped.endswith('.'):
+        return False
+    if not _HEADING_RE.match(stripped):
+        return False
+    if stripped.isupper() or stripped.endswith(':') or stripped.startswith('#') or stripped[0].isdigit():
+        return True
+    words = stripped.split()
+    return len(words) <= 4 and all(word[0].isupper() or word in ('&', '/', '-') for word in words)
+
+
+def _clean_heading(text):
+    return text.strip().lstrip('#').strip().rstrip(':').strip()
+
+
+def parse_rules(text):
+    """
+    Split a rulebook into [(topic, heading, body), ...].
+    A section starts at a heading line ('PETS', '## Parking'), at an inline
+    heading ('Parking: one bay per unit.') and after a blank line, so a heading
+    never swallows the unrelated paragraphs that follow it.
+    """
+    if not text or not text.strip():
+        return []
+
+    sections = []
+    heading, body = '', []
+
+    def flush():
+        content = '\n'.join(body).strip()
+        if content:
+            sections.append((detect_topic(f"{heading} {content}"), heading, content))
+
+    for line in text.splitlines():
+        inline = _INLINE_HEADING_RE.match(line)
+        if _is_heading(line):
+            flush()
+            heading, body = _clean_heading(line), []
+        elif inline:
+            flush()
+            heading, body = _clean_heading(inline['title']), [inline['body'].rstrip()]
+        elif not line.strip():
+            if body:  # a blank line right under a heading still belongs to it
+                flush()
+                heading, body = '', []
+        else:
+            body.append(line.rstrip())
+    flush()
+    return sections
+
+
+def parse_existing_rules(apps, schema_editor):
+    from django.contrib.postgres.search import SearchVector
+
+    Property = apps.get_model('properties', 'Property')
+    RuleSection = apps.get_model('properties', 'RuleSection')
+    sections = []
+    for prop in Property.objects.exclude(rules_and_regulations__isnull=True).exclude(rules_and_regulations=''):
+        sections += [
+            RuleSection(property=prop, topic=topic, heading=heading, body=body, position=position)
+            for position, (topic, heading, body) in enumerate(parse_rules(prop.rules_and_regulations))
+        ]
+    RuleSection.objects.bulk_create(sections, batch_size=500)
+    RuleSection.objects.update(
+        search_vector=SearchVector('heading', weight='A', config='english')
+        + SearchVector('body', weight='B', config='english')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0003_property_rules_and_regulations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RuleSection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(choices=[('PETS', 'Pets'), ('PARKING', 'Parking'), ('GYM', 'Gym'), ('POOL', 'Pool'), ('VISITORS', 'Visitors'), ('NOISE', 'Noise'), ('WASTE', 'Waste & Recycling'), ('MOVING', 'Moving & Deliveries'), ('SMOKING', 'Smoking'), ('SECURITY', 'Security & Access'), ('RENOVATION', 'Renovations'), ('PAYMENTS', 'Payments & Fees'), ('GENERAL', 'General')], default='GENERAL', max_length=20)),
+                ('heading', models.CharField(blank=True, max_length=255)),
+                ('body', models.TextField()),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(blank=True, null=True)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rule_sections', to='properties.property')),
+            ],
+            options={
+                'ordering': ['property', 'position'],
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='rule_section_search_gin'), models.Index(fields=['property', 'topic'], name='properties__propert_a55cc2_idx')],
+            },
+        ),
+        migrations.RunPython(parse_existing_rules, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:33
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY: no write lock on live tables, can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('properties', '0004_rulesection'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='unit',
+            index=models.Index(fields=['property', 'status'], name='unit_property_status'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_organization(apps, schema_editor):
+    Property = apps.get_model('properties', 'Property')
+    Unit = apps.get_model('properties', 'Unit')
+    Unit.objects.update(organization_id=models.Subquery(
+        Property.objects.filter(pk=models.OuterRef('property_id')).values('organization_id')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_user_managed_property'),
+        ('properties', '0005_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='unit',
+            name='organization',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='units', to='core.organization'),
+        ),
+        migrations.RunPython(copy_organization, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='unit',
+            name='organization',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='units', to='core.organization'),
+        ),
+        migrations.AddIndex(
+            model_name='unit',
+            index=models.Index(fields=['organization', 'status'], name='unit_org_status'),
+        ),
+    ]
@@ -1,4 +1,6 @@
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 
 class Property(models.Model):
     organization = models.ForeignKey('core.Organization', on_delete=models.CASCADE, related_name='properties')
@@ -27,6 +29,22 @@ class Property(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        previous_org = None
+        if self.pk:
+            previous_org = Property.objects.filter(pk=self.pk).values_list('organization_id', flat=True).first()
+        # Read by the post_save receivers (communication/signals.py): update() below skips the
+        # Unit and Lease signals, so they refresh the moved rows' context and index instead
+        moved = previous_org is not None and previous_org != self.organization_id
+        self._moved_from_organization_id = previous_org if moved else None
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if moved:
+                # Units and leases carry a copy of the organization (see Unit.organization)
+                from tenants.models import Lease
+                self.units.update(organization_id=self.organization_id)
+                Lease.objects.filter(unit__property=self).update(organization_id=self.organization_id)
+
 class Unit(models.Model):
     UNIT_TYPES = [
         ('1BHK', '1 Bedroom'),
@@ -47,6 +65,12 @@ class Unit(models.Model):
     ]
 
     property = models.ForeignKey(Property, related_name='units', on_delete=models.CASCADE)
+    # Copy of property.organization, kept in sync by save(): org-scoped queries
+    # filter on it directly instead of joining through Property.
+    organization = models.ForeignKey(
+        'core.Organization', on_delete=models.CASCADE, related_name='units',
+        editable=False, db_index=False,  # leading column of the indexes below
+    )
     unit_number = models.CharField(max_length=50)
     unit_type = models.CharField(max_length=20, choices=UNIT_TYPES)
     
@@ -58,5 +82,57 @@ class Unit(models.Model):
     
     status = models.CharField(max_length=20, choices=UNIT_STATUS, default='VACANT')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['property', 'status'], name='unit_property_status'),
+            models.Index(fields=['organization', 'status'], name='unit_org_status'),
+        ]
+
+    def __str__(self):
+        return f"{self.property.name} - {self.unit_number}"
+
+    def save(self, *args, **kwargs):
+        self.organization_id = self.property.organization_id
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'property' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'organization'}
+        super().save(*args, **kwargs)
+
+class RuleSection(models.Model):
+    """
+    One topic-tagged section of a property's rules_and_regulations, with a
+    full-text index so the chatbot can fetch only the relevant sections.
+    Rebuilt by properties.rules.reindex_property_rules() whenever the rules are saved.
+    """
+    TOPIC_CHOICES = [
+        ('PETS', 'Pets'),
+        ('PARKING', 'Parking'),
+        ('GYM', 'Gym'),
+        ('POOL', 'Pool'),
+        ('VISITORS', 'Visitors'),
+        ('NOISE', 'Noise'),
+        ('WASTE', 'Waste & Recycling'),
+        ('MOVING', 'Moving & Deliveries'),
+        ('SMOKING', 'Smoking'),
+        ('SECURITY', 'Security & Access'),
+        ('RENOVATION', 'Renovations'),
+        ('PAYMENTS', 'Payments & Fees'),
+        ('GENERAL', 'General'),
+    ]
+
+    property = models.ForeignKey(Property, related_name='rule_sections', on_delete=models.CASCADE)
+    topic = models.CharField(max_length=20, choices=TOPIC_CHOICES, default='GENERAL')
+    heading = models.CharField(max_length=255, blank=True)
+    body = models.TextField()
+    position = models.PositiveIntegerField(default=0)
+    search_vector = SearchVectorField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['property', 'position']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='rule_section_search_gin'),
+            models.Index(fields=['property', 'topic']),
+        ]
+
     def __str__(self):
-        return f"{self.property.name} - {self.unit_number}"
\ No newline at end of file
+        return f"{self.property.name} — {self.heading or self.get_topic_display()}"
@@ -0,0 +1,161 @@
+"""
+Building rules knowledge base.
+
+`Property.rules_and_regulations` is free text written by managers. It is parsed
+into topic-tagged sections (RuleSection rows with a tsvector + GIN index) so the
+chatbot can pull only the sections relevant to a question instead of pasting the
+whole rulebook into every prompt.
+"""
+
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import transaction
+from django.db.models import Case, FloatField, Q, Value, When
+
+TOPIC_KEYWORDS = {
+    'PETS': ['pet', 'dog', 'cat', 'animal', 'bird'],
+    'PARKING': ['parking', 'park', 'parked', 'car', 'vehicle', 'garage', 'bay'],
+    'GYM': ['gym', 'fitness', 'workout'],
+    'POOL': ['pool', 'swim', 'swimming', 'jacuzzi'],
+    'VISITORS': ['visitor', 'guest', 'visit', 'visiting'],
+    'NOISE': ['noise', 'noisy', 'quiet', 'music', 'party', 'parties', 'loud'],
+    'WASTE': ['garbage', 'trash', 'waste', 'recycle', 'recycling', 'recyclable', 'bin', 'rubbish'],
+    'MOVING': ['move in', 'move out', 'moving', 'mover', 'furniture', 'delivery', 'deliveries', 'delivering'],
+    'SMOKING': ['smoke', 'smoking', 'smoker', 'shisha', 'vape', 'vaping', 'cigarette'],
+    'SECURITY': ['security', 'access card', 'key', 'fob', 'cctv', 'guard'],
+    'RENOVATION': ['renovation', 'renovate', 'renovating', 'alteration', 'drill', 'drilling', 'paint', 'painting', 'contractor'],
+    'PAYMENTS': ['rent', 'cheque', 'payment', 'fee', 'deposit', 'fine'],
+}
+
+# Whole words only ('cat' must not match "location"), plurals included
+TOPIC_PATTERNS = {
+    topic: re.compile(r"\b(?:" + '|'.join(re.escape(kw) for kw in keywords) + r")(?:s|es)?\b")
+    for topic, keywords in TOPIC_KEYWORDS.items()
+}
+
+_HEADING_RE = re.compile(r"^\s*(?:#+\s*|\d+[.)]\s*|[-*]\s*)?(?P<title>[A-Za-z][\w &/'-]{1,60}?)\s*:?\s*$")
+# 'Parking: one bay per unit.' — a short title, a colon, then the rule itself
+_INLINE_HEADING_RE = re.compile(r"^\s*(?:#+\s*|\d+[.)]\s*|[-*]\s*)?(?P<title>[A-Za-z][\w&/'-]*(?: [\w&/'-]+){0,3})\s*:\s+(?P<body>\S.*)$")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def detect_topic(text):
+    """Best-matching topic for a piece of text ('GENERAL' if nothing matches)."""
+    text = text.lower()
+    scores = {topic: len(set(pattern.findall(text))) for topic, pattern in TOPIC_PATTERNS.items()}
+    best = max(scores, key=scores.get)
+    return best if scores[best] else 'GENERAL'
+
+
+def detect_topics(text):
+    """All topics mentioned in a question."""
+    text = text.lower()
+    return [topic for topic, pattern in TOPIC_PATTERNS.items() if pattern.search(text)]
+
+
+def _is_heading(line):
+    """Short standalone lines like 'PETS', 'Gym Hours:', 'Gym Hours', '## Parking', '3. Visitors'."""
+    stripped = line.strip()
+    if not stripped or len(stripped) > 60 or stripped.endswith('.'):
+        return False
+    if not _HEADING_RE.match(stripped):
+        return False
+    if stripped.isupper() or stripped.endswith(':') or stripped.startswith('#') or stripped[0].isdigit():
+        return True
+    words = stripped.split()
+    return len(words) <= 4 and all(word[0].isupper() or word in ('&', '/', '-') for word in words)
+
+
+def _clean_heading(text):
+    return text.strip().lstrip('#').strip().rstrip(':').strip()
+
+
+def parse_rules(text):
+    """
+    Split a rulebook into [(topic, heading, body), ...].
+    A section starts at a heading line ('PETS', '## Parking'), at an inline
+    heading ('Parking: one bay per unit.') and after a blank line, so a heading
+    never swallows the unrelated paragraphs that follow it.
+    """
+    if not text or not text.strip():
+        return []
+
+    sections = []
+    heading, body = '', []
+
+    def flush():
+        content = '\n'.join(body).strip()
+        if content:
+            sections.append((detect_topic(f"{heading} {content}"), heading, content))
+
+    for line in text.splitlines():
+        inline = _INLINE_HEADING_RE.match(line)
+        if _is_heading(line):
+            flush()
+            heading, body = _clean_heading(line), []
+        elif inline:
+            flush()
+            heading, body = _clean_heading(inline['title']), [inline['body'].rstrip()]
+        elif not line.strip():
+            if body:  # a blank line right under a heading still belongs to it
+                flush()
+                heading, body = '', []
+        else:
+            body.append(line.rstrip())
+    flush()
+    return sections
+
+
+def reindex_property_rules(prop):
+    """Rebuild the RuleSection rows (and their search vectors) for one property."""
+    from .models import RuleSection
+
+    with transaction.atomic():
+        RuleSection.objects.filter(property=prop).delete()
+        RuleSection.objects.bulk_create([
+            RuleSection(property=prop, topic=topic, heading=heading, body=body, position=position)
+            for position, (topic, heading, body) in enumerate(parse_rules(prop.rules_and_regulations))
+        ])
+        RuleSection.objects.filter(property=prop).update(
+            search_vector=SearchVector('heading', weight='A', config='english')
+            + SearchVector('body', weight='B', config='english')
+        )
+
+
+def _rule_search_queryset(property_ids, question, limit):
+    from .models import RuleSection
+
+    words = [w for w in _WORD_RE.findall(question.lower()) if len(w) > 1]
+    topics = detect_topics(question)
+    if not words and not topics:
+        return RuleSection.objects.none()
+
+    topic_boost = Case(When(topic__in=topics, then=Value(0.5)), default=Value(0.0), output_field=FloatField())
+    condition = Q(topic__in=topics)
+    score = topic_boost
+    if words:
+        query = SearchQuery(' | '.join(words), search_type='raw', config='english')
+        condition |= Q(search_vector=query)
+        score = SearchRank('search_vector', query) + topic_boost
+
+    return (
+        RuleSection.objects.filter(property_id__in=property_ids)
+        .filter(condition)
+        .select_related('property')
+        .annotate(score=score)
+        .order_by('-score', 'position')[:limit]
+    )
+
+
+def search_rules(property_ids, question, limit=3):
+    """
+    Rule sections relevant to `question`: full-text matches (any word) ranked by
+    ts_rank, plus sections whose topic the question mentions (e.g. 'dog' → PETS).
+    """
+    return list(_rule_search_queryset(property_ids, question, limit))
+
+
+async def asearch_rules(property_ids, question, limit=3):
+    """Async search_rules()."""
+    return [section async for section in _rule_search_queryset(property_ids, question, limit)]
@@ -1,3 +1,51 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from .rules import detect_topic, detect_topics, parse_rules
+
+
+class DetectTopicTests(SimpleTestCase):
+    def test_keywords_match_whole_words_only(self):
+        for text in ("What is the location?", "When do I vacate?", "monkey", "coffee machine", "current tenants"):
+            with self.subTest(text=text):
+                self.assertEqual(detect_topics(text), [])
+        self.assertEqual(detect_topics("I lost my access card"), ['SECURITY'])
+
+    def test_plurals_and_phrases(self):
+        self.assertEqual(detect_topics("Are cats allowed?"), ['PETS'])
+        self.assertEqual(detect_topics("Can my guests use the pool?"), ['POOL', 'VISITORS'])
+        self.assertEqual(detect_topics("When can I move in?"), ['MOVING'])
+
+    def test_best_topic(self):
+        self.assertEqual(detect_topic("Dogs and cats must be on a leash"), 'PETS')
+        self.assertEqual(detect_topic("Be kind to your neighbours"), 'GENERAL')
+
+
+class ParseRulesTests(SimpleTestCase):
+    def test_empty(self):
+        self.assertEqual(parse_rules(''), [])
+        self.assertEqual(parse_rules(None), [])
+
+    def test_heading_lines(self):
+        text = "PETS\nCats and dogs on a leash.\n\n## Gym Hours\n\nOpen 6:00 to 22:00."
+        self.assertEqual(parse_rules(text), [
+            ('PETS', 'PETS', 'Cats and dogs on a leash.'),
+            ('GYM', 'Gym Hours', 'Open 6:00 to 22:00.'),
+        ])
+
+    def test_inline_headings_start_sections(self):
+        text = "Gym Hours:\nThe gym opens at 6:00.\nParking: one bay per unit.\nVisitors: register at reception."
+        self.assertEqual(parse_rules(text), [
+            ('GYM', 'Gym Hours', 'The gym opens at 6:00.'),
+            ('PARKING', 'Parking', 'one bay per unit.'),
+            ('VISITORS', 'Visitors', 'register at reception.'),
+        ])
+
+    def test_blank_line_ends_a_headed_section(self):
+        text = "GYM\nThe gym opens at 6:00.\n\nCars must use the basement car park."
+        sections = parse_rules(text)
+        self.assertEqual(sections[0], ('GYM', 'GYM', 'The gym opens at 6:00.'))
+        self.assertEqual(sections[1][:2], ('PARKING', ''))
+
+    def test_paragraphs_without_headings(self):
+        text = "No smoking in common areas.\n\nRecycling bins are in the basement."
+        self.assertEqual([topic for topic, _, _ in parse_rules(text)], ['SMOKING', 'WASTE'])
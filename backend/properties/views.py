@@ -1,28 +1,24 @@
+import logging
+
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
+from core.mixins import OrganizationQuerySetMixin
 from .models import Property, Unit
 from .serializers import PropertySerializer, UnitSerializer
 from .ai_pricing import analyze_rent_price
 
+logger = logging.getLogger(__name__)
+
 
-class PropertyViewSet(viewsets.ModelViewSet):
+class PropertyViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
+    queryset = Property.objects.order_by('-created_at')
     serializer_class = PropertySerializer
     permission_classes = [permissions.IsAuthenticated]
 
-    def get_queryset(self):
-        if self.request.user.is_superuser:
-            return Property.objects.all().order_by('-created_at')
-
-        user = self.request.user
-        if hasattr(user, 'organization') and user.organization:
-            return Property.objects.filter(organization=user.organization).order_by('-created_at')
-        
-        return Property.objects.none()
-
     def perform_create(self, serializer):
         user = self.request.user
         if not hasattr(user, 'organization') or not user.organization:
@@ -30,19 +26,13 @@ class PropertyViewSet(viewsets.ModelViewSet):
         serializer.save(organization=user.organization)
 
 
-class UnitViewSet(viewsets.ModelViewSet):
+class UnitViewSet(OrganizationQuerySetMixin, viewsets.ModelViewSet):
+    queryset = Unit.objects.order_by('unit_number')
     serializer_class = UnitSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        if self.request.user.is_superuser:
-            return Unit.objects.all().order_by('unit_number')
-
-        user = self.request.user
-        if not hasattr(user, 'organization') or not user.organization:
-            return Unit.objects.none()
-
-        queryset = Unit.objects.filter(property__organization=user.organization).order_by('unit_number')
+        queryset = super().get_queryset()
         
         property_id = self.request.query_params.get('property_id')
         if property_id:
@@ -76,14 +66,14 @@ def smart_pricing(request, unit_id):
         if user.is_superuser:
             unit = Unit.objects.get(id=unit_id)
         elif hasattr(user, 'organization') and user.organization:
-            unit = Unit.objects.get(id=unit_id, property__organization=user.organization)
+            unit = Unit.objects.get(id=unit_id, organization=user.organization)
         else:
             return Response({"error": "No organization found."}, status=403)
     except Unit.DoesNotExist:
         return Response({"error": "Unit not found or access denied."}, status=404)
 
-    print(f"🧠 Smart Pricing requested for Unit #{unit.unit_number} ({unit.property.name})")
-    
+    logger.info("Smart pricing requested for unit #%s", unit.id, extra={'unit_id': unit.id})
+
     result = analyze_rent_price(unit)
     
     return Response(result)
\ No newline at end of file
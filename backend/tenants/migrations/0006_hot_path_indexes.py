@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:33
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY: no write lock on live tables, can't run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('properties', '0005_hot_path_indexes'),
+        ('tenants', '0005_tenant_user'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='lease',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['tenant'], name='lease_active_tenant'),
+        ),
+        AddIndexConcurrently(
+            model_name='lease',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['unit'], name='lease_active_unit'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_organization(apps, schema_editor):
+    Unit = apps.get_model('properties', 'Unit')
+    Lease = apps.get_model('tenants', 'Lease')
+    Tenant = apps.get_model('tenants', 'Tenant')
+    Lease.objects.update(organization_id=models.Subquery(
+        Unit.objects.filter(pk=models.OuterRef('unit_id')).values('organization_id')[:1]
+    ))
+    # A tenant belongs to the organization of their current (else latest) lease
+    Tenant.objects.update(organization_id=models.Subquery(
+        Lease.objects.filter(tenant_id=models.OuterRef('pk'))
+        .order_by('-is_active', '-start_date').values('organization_id')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_user_managed_property'),
+        ('properties', '0006_unit_organization'),
+        ('tenants', '0006_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lease',
+            name='organization',
+            field=models.ForeignKey(db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='leases', to='core.organization'),
+        ),
+        migrations.AddField(
+            model_name='tenant',
+            name='organization',
+            field=models.ForeignKey(blank=True, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tenants', to='core.organization'),
+        ),
+        migrations.RunPython(copy_organization, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='lease',
+            name='organization',
+            field=models.ForeignKey(db_index=False, editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='leases', to='core.organization'),
+        ),
+        migrations.AddIndex(
+            model_name='lease',
+            index=models.Index(fields=['organization', '-start_date'], name='lease_org_start'),
+        ),
+        migrations.AddIndex(
+            model_name='tenant',
+            index=models.Index(fields=['organization', '-created_at'], name='tenant_org_created'),
+        ),
+    ]
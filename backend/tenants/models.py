@@ -1,9 +1,13 @@
+import logging
+
 from django.db import models
 from django.conf import settings 
 from properties.models import Unit
 from django.db.models.signals import post_delete  # 👈 Import for Signals
 from django.dispatch import receiver             # 👈 Import for Signals
 
+logger = logging.getLogger(__name__)
+
 class Tenant(models.Model):
     # Link to the standard Django User (for Login)
     user = models.OneToOneField(
@@ -22,15 +26,32 @@ class Tenant(models.Model):
     emirates_id = models.CharField(max_length=50, blank=True, null=True)
     passport_number = models.CharField(max_length=50, blank=True, null=True)
     ejari_number = models.CharField(max_length=50, blank=True, null=True)
+
+    # The organization managing this tenant: set when an admin creates the
+    # tenant, otherwise from their first lease (see Lease.save).
+    organization = models.ForeignKey(
+        'core.Organization', on_delete=models.SET_NULL, related_name='tenants',
+        null=True, blank=True, editable=False, db_index=False,
+    )
     
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['organization', '-created_at'], name='tenant_org_created'),
+        ]
+
     def __str__(self):
         return self.name
 
 class Lease(models.Model):
     tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, related_name='leases')
     unit = models.ForeignKey(Unit, on_delete=models.CASCADE, related_name='leases')
+    # Copy of unit.organization, kept in sync by save()
+    organization = models.ForeignKey(
+        'core.Organization', on_delete=models.CASCADE, related_name='leases',
+        editable=False, db_index=False,
+    )
     
     start_date = models.DateField()
     end_date = models.DateField()
@@ -46,9 +67,25 @@ class Lease(models.Model):
     is_active = models.BooleanField(default=True)
     contract_file = models.FileField(upload_to='leases/contracts/', blank=True, null=True)
 
+    class Meta:
+        # Only active leases are looked up by tenant / unit on the hot paths
+        indexes = [
+            models.Index(fields=['tenant'], name='lease_active_tenant', condition=models.Q(is_active=True)),
+            models.Index(fields=['unit'], name='lease_active_unit', condition=models.Q(is_active=True)),
+            models.Index(fields=['organization', '-start_date'], name='lease_org_start'),
+        ]
+
     def __str__(self):
         return f"{self.tenant.name} - {self.unit.unit_number}"
 
+    def save(self, *args, **kwargs):
+        self.organization_id = self.unit.organization_id
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'unit' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'organization'}
+        super().save(*args, **kwargs)
+        Tenant.objects.filter(pk=self.tenant_id, organization__isnull=True).update(organization_id=self.organization_id)
+
 # 👇 THE FIX: AUTOMATICALLY FREE UP THE UNIT
 # When a Lease is deleted (e.g. Tenant is deleted), this runs immediately.
 @receiver(post_delete, sender=Lease)
@@ -57,6 +94,6 @@ def release_unit_on_lease_delete(sender, instance, **kwargs):
     When a Lease is deleted, mark the Unit as VACANT.
     """
     if instance.unit:
-        print(f"🔓 Lease deleted. Making Unit {instance.unit.unit_number} VACANT again.")
+        logger.info("Lease #%s deleted, unit #%s is vacant again", instance.pk, instance.unit_id, extra={'unit_id': instance.unit_id})
         instance.unit.status = 'VACANT'
         instance.unit.save()
\ No newline at end of file
@@ -1,3 +1,48 @@
+from datetime import date, timedelta
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import Organization, User
+from finance.models import Cheque
+from properties.models import Property, Unit
+from .models import Lease, Tenant
+
+
+class MyTenantProfileAlertsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner', role='OWNER')
+        org = Organization.objects.create(name='Org', owner=owner)
+        building = Property.objects.create(organization=org, name='Marina Tower', address='Dubai Marina')
+        unit = Unit.objects.create(property=building, organization=org, unit_number='1204', unit_type='1BHK', yearly_rent=80000)
+        cls.user = User.objects.create_user('tenant', role='TENANT')
+        tenant = Tenant.objects.create(user=cls.user, name='Tenant', phone='050', email='tenant@example.com', organization=org)
+        lease = Lease.objects.create(
+            tenant=tenant, unit=unit, organization=org, start_date=date(2026, 1, 1),
+            end_date=date(2026, 12, 31), rent_amount=80000, payment_frequency='4_CHEQUES',
+        )
+        today = date.today()
+        cheque = dict(organization=org, tenant=tenant, lease=lease, amount=20000)
+        cls.due = Cheque.objects.create(cheque_number='001', cheque_date=today + timedelta(days=3), **cheque)
+        Cheque.objects.create(cheque_number='002', cheque_date=today + timedelta(days=60), **cheque)
+        cls.bounced = Cheque.objects.create(cheque_number='003', cheque_date=today - timedelta(days=30), status='BOUNCED', **cheque)
+
+    def alerts(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get('/api/me/')
+        self.assertEqual(response.status_code, 200)
+        return [(alert['type'], alert['message']) for alert in response.data['notifications']]
+
+    def test_alerts_reflect_current_cheques(self):
+        self.assertEqual(self.alerts(), [
+            ('BOUNCED', "AED 20,000 — Cheque #003"),
+            ('PAYMENT_DUE', "AED 20,000 — Cheque #001"),
+        ])
 
-# Create your tests here.
+    def test_alerts_clear_when_cheques_move_on(self):
+        for cheque, status in ((self.due, 'DEPOSITED'), (self.bounced, 'CLEARED')):
+            cheque.status = status
+            cheque.save()
+        self.assertEqual(self.alerts(), [])
@@ -3,13 +3,15 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.http import HttpResponse
 from dateutil.relativedelta import relativedelta
 from django.utils import timezone
 import datetime
-import traceback
+import logging
 
+from core.mixins import ExportMixin, OrganizationQuerySetMixin
 from .models import Tenant, Lease
 from .serializers import TenantSerializer, LeaseSerializer
 from .ejari_generator import generate_ejari_pdf
@@ -18,40 +20,34 @@ from properties.serializers import UnitSerializer
 from maintenance.models import MaintenanceTicket
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
-class TenantViewSet(viewsets.ModelViewSet):
+class TenantViewSet(ExportMixin, OrganizationQuerySetMixin, viewsets.ModelViewSet):
+    queryset = Tenant.objects.order_by('-created_at')
     serializer_class = TenantSerializer
     permission_classes = [IsAuthenticated]
+    export_name = 'tenants'
+    export_fields = [
+        ('ID', 'id'), ('Name', 'name'), ('Email', 'email'), ('Phone', 'phone'), ('Nationality', 'nationality'),
+        ('Emirates ID', 'emirates_id'), ('Passport', 'passport_number'), ('Ejari', 'ejari_number'),
+        ('Created', 'created_at'),
+    ]
 
-    def get_queryset(self):
-        user = self.request.user
-        if user.is_superuser:
-            return Tenant.objects.all().order_by('-created_at')
-        
-        if hasattr(user, 'organization') and user.organization:
-            return Tenant.objects.filter(
-                leases__unit__property__organization=user.organization
-            ).distinct().order_by('-created_at')
-        
-        return Tenant.objects.none()
+    def perform_create(self, serializer):
+        serializer.save(organization=getattr(self.request.user, 'organization', None))
 
 
-class LeaseViewSet(viewsets.ModelViewSet):
+class LeaseViewSet(ExportMixin, OrganizationQuerySetMixin, viewsets.ModelViewSet):
+    queryset = Lease.objects.order_by('-start_date')
     serializer_class = LeaseSerializer
     permission_classes = [IsAuthenticated]
-    
-    def get_queryset(self):
-        user = self.request.user
-        if user.is_superuser:
-            return Lease.objects.all().order_by('-start_date')
-        
-        if hasattr(user, 'organization') and user.organization:
-            return Lease.objects.filter(
-                unit__property__organization=user.organization
-            ).order_by('-start_date')
-        
-        return Lease.objects.none()
+    export_name = 'leases'
+    export_fields = [
+        ('ID', 'id'), ('Tenant', 'tenant__name'), ('Tenant email', 'tenant__email'),
+        ('Property', 'unit__property__name'), ('Unit', 'unit__unit_number'), ('Start', 'start_date'),
+        ('End', 'end_date'), ('Rent', 'rent_amount'), ('Payment frequency', 'payment_frequency'), ('Active', 'is_active'),
+    ]
 
     def perform_create(self, serializer):
         lease = serializer.save()
@@ -66,14 +62,12 @@ class LeaseViewSet(viewsets.ModelViewSet):
         amount_per_cheque = lease.rent_amount / (num_cheques if num_cheques > 0 else 1)
         months_interval = 12 // num_cheques
 
-        org = lease.unit.property.organization if lease.unit and lease.unit.property else None
-        
         for i in range(num_cheques):
             cheque_date = lease.start_date + relativedelta(months=i*months_interval)
             Cheque.objects.create(
                 lease=lease,
                 tenant=lease.tenant,
-                organization=org,
+                organization_id=lease.organization_id,
                 cheque_number=f"AUTO-{lease.id}-{i+1}",
                 bank_name="Pending Bank", 
                 cheque_date=cheque_date,
@@ -96,13 +90,13 @@ def generate_ejari(request, lease_id):
         if user.is_superuser:
             lease = Lease.objects.get(id=lease_id)
         elif hasattr(user, 'organization') and user.organization:
-            lease = Lease.objects.get(id=lease_id, unit__property__organization=user.organization)
+            lease = Lease.objects.get(id=lease_id, organization=user.organization)
         else:
             return Response({"error": "No organization found."}, status=403)
     except Lease.DoesNotExist:
         return Response({"error": "Lease not found or access denied."}, status=404)
 
-    print(f"📄 Generating Ejari contract for Lease #{lease.id} — {lease.tenant.name}")
+    logger.info("Generating Ejari contract for lease #%s", lease.id, extra={'lease_id': lease.id})
 
     pdf_buffer, ejari_number = generate_ejari_pdf(lease)
 
@@ -186,34 +180,28 @@ class MyTenantProfileView(APIView):
                         "date": next_cheque.cheque_date,
                     }
 
-                # Build notifications
-                notifications = []
-                
-                today = datetime.date.today()
-                upcoming = all_cheques.filter(
-                    status='PENDING', 
-                    cheque_date__lte=today + datetime.timedelta(days=7),
-                    cheque_date__gte=today
-                )
-                for c in upcoming:
-                    days_left = (c.cheque_date - today).days
-                    notifications.append({
-                        "type": "PAYMENT_DUE",
-                        "severity": "HIGH",
-                        "title": f"Payment due in {days_left} day{'s' if days_left != 1 else ''}",
-                        "message": f"AED {float(c.amount):,.0f} — Cheque #{c.cheque_number}",
-                        "date": str(c.cheque_date),
-                    })
-                
-                bounced = all_cheques.filter(status='BOUNCED')
-                for c in bounced:
-                    notifications.append({
-                        "type": "BOUNCED",
-                        "severity": "EMERGENCY",
-                        "title": "Cheque Bounced — Action Required",
-                        "message": f"AED {float(c.amount):,.0f} — Cheque #{c.cheque_number}",
-                        "date": str(c.cheque_date),
-                    })
+                # Alerts from the cheques loaded above (no extra queries), so they
+                # always match the cheques' current status
+                today = timezone.localdate()
+                horizon = today + datetime.timedelta(days=settings.PAYMENT_DUE_NOTICE_DAYS)
+                for c in all_cheques:
+                    if c.status == 'PENDING' and today <= c.cheque_date <= horizon:
+                        days_left = (c.cheque_date - today).days
+                        data["notifications"].append({
+                            "type": "PAYMENT_DUE",
+                            "severity": "HIGH",
+                            "title": f"Payment due in {days_left} day{'s' if days_left != 1 else ''}",
+                            "message": f"AED {float(c.amount):,.0f} — Cheque #{c.cheque_number}",
+                            "date": str(c.cheque_date),
+                        })
+                    elif c.status == 'BOUNCED':
+                        data["notifications"].append({
+                            "type": "BOUNCED",
+                            "severity": "EMERGENCY",
+                            "title": "Cheque Bounced — Action Required",
+                            "message": f"AED {float(c.amount):,.0f} — Cheque #{c.cheque_number}",
+                            "date": str(c.cheque_date),
+                        })
 
             # Maintenance tickets
             tickets = MaintenanceTicket.objects.filter(tenant=tenant).order_by('-created_at')
@@ -235,7 +223,7 @@ class MyTenantProfileView(APIView):
                         "type": "MAINTENANCE_UPDATE",
                         "severity": "MEDIUM",
                         "title": f"'{t.title}' is being worked on",
-                        "message": f"Status: In Progress",
+                        "message": "Status: In Progress",
                         "date": t.updated_at.strftime("%Y-%m-%d"),
                     })
                 elif t.status == 'RESOLVED':
@@ -247,12 +235,12 @@ class MyTenantProfileView(APIView):
                         "date": t.updated_at.strftime("%Y-%m-%d"),
                     })
 
+            # Live state until the tenant app reads the stored feed (/api/notifications/)
             severity_order = {'EMERGENCY': 0, 'HIGH': 1, 'MEDIUM': 2, 'LOW': 3}
             data["notifications"].sort(key=lambda x: severity_order.get(x["severity"], 4))
 
             return Response(data)
 
         except Exception as e:
-            print("🔥 CRITICAL ERROR IN PROFILE VIEW 🔥")
-            traceback.print_exc() 
+            logger.exception("Tenant profile failed for user %s", request.user.pk)
             return Response({"error": str(e)}, status=500)
\ No newline at end of file
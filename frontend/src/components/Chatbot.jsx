@@ -3,6 +3,42 @@ import { useNavigate } from 'react-router-dom';
 import api from '../api/axios';
 import { MessageSquare, X, Send, Bot, User, Loader, Sparkles, ArrowRight } from 'lucide-react';
 
+// POST /api/chat/ with stream: true and relay Server-Sent Events:
+// `token` events as they arrive, then the final `done` (or `error`) payload.
+async function streamChat(payload, onDelta) {
+    const res = await fetch(`${api.defaults.baseURL}chat/`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            Authorization: `Bearer ${localStorage.getItem('access_token')}`,
+        },
+        body: JSON.stringify({ ...payload, stream: true }),
+    });
+    if (!res.ok || !res.headers.get('content-type')?.includes('text/event-stream')) {
+        throw new Error(`Chat stream unavailable (${res.status})`);
+    }
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let result = null;
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        for (const raw of events) {
+            const event = raw.match(/^event: (.*)$/m)?.[1];
+            const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] || '{}');
+            if (event === 'token') onDelta(data.delta);
+            else result = data;
+        }
+    }
+    if (!result) throw new Error('Chat stream ended early');
+    return result;
+}
+
 function Chatbot() {
     const navigate = useNavigate();
     const [isOpen, setIsOpen] = useState(false);
@@ -11,6 +47,9 @@ function Chatbot() {
     ]);
     const [input, setInput] = useState('');
     const [loading, setLoading] = useState(false);
+    const [streaming, setStreaming] = useState(false);
+    // Turns are stored server-side; we only send the conversation id back
+    const [conversationId, setConversationId] = useState(null);
     const messagesEndRef = useRef(null);
     const inputRef = useRef(null);
 
@@ -38,18 +77,39 @@ function Chatbot() {
         setInput('');
         setLoading(true);
 
+        const payload = {
+            message: currentInput,
+            conversation_id: conversationId,
+        };
+        let started = false;
+        const appendDelta = (delta) => {
+            if (!started) {
+                started = true;
+                setStreaming(true);
+                setMessages(prev => [...prev, { text: delta, sender: 'bot' }]);
+            } else {
+                setMessages(prev => [...prev.slice(0, -1), { ...prev[prev.length - 1], text: prev[prev.length - 1].text + delta }]);
+            }
+        };
+
         try {
-            const res = await api.post('chat/', { 
-                message: currentInput,
-                history: messages.slice(-10),
-            });
+            let result;
+            try {
+                result = await streamChat(payload, appendDelta);
+            } catch (streamErr) {
+                if (started) throw streamErr;
+                // Streaming unavailable (expired token, AI not configured...): plain JSON request
+                result = (await api.post('chat/', payload)).data;
+            }
+
+            if (result.conversation_id) setConversationId(result.conversation_id);
 
             const botMessage = { 
-                text: res.data.response, 
+                text: result.response, 
                 sender: 'bot',
-                action: res.data.action || null,
+                action: result.action || null,
             };
-            setMessages(prev => [...prev, botMessage]);
+            setMessages(prev => started ? [...prev.slice(0, -1), botMessage] : [...prev, botMessage]);
 
         } catch (err) {
             console.error("Chat error:", err);
@@ -59,6 +119,7 @@ function Chatbot() {
             }]);
         } finally {
             setLoading(false);
+            setStreaming(false);
         }
     };
 
@@ -152,7 +213,7 @@ function Chatbot() {
                         ))}
 
                         {/* Typing Indicator */}
-                        {loading && (
+                        {loading && !streaming && (
                             <div className="flex justify-start">
                                 <div className="flex items-center gap-2">
                                     <div className="w-6 h-6 rounded-full bg-purple-600 flex items-center justify-center">